@@ -0,0 +1,56 @@
+# benchmarks/check_backends.py
+"""
+Agreement check between the NumPy reference kernels and the compiled
+numba kernels on the benchmark states, in float64 and float32.
+
+Usage (from the repository root):
+    python -m benchmarks.check_backends --size 100000
+"""
+
+import argparse
+import sys
+import numpy as np
+from typing import List, Optional
+from robots.kuka_robots import KUKA_ROBOTS, get_robot_by_name
+from robots.kuka_dynamics import get_link_parameter_arrays
+from robots.rigid_body import build_rigid_body_model
+from robots.kuka_kernels import NUMBA_AVAILABLE, compare_backends
+from benchmarks.run_benchmarks import random_states
+
+# Allowed difference relative to the largest reference magnitude, per dtype
+TOLERANCES = {np.float64: 1e-12, np.float32: 1e-6}
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="NumPy vs numba kernel agreement check")
+    parser.add_argument('--robots', nargs='*', default=list(KUKA_ROBOTS.keys()))
+    parser.add_argument('--size', type=int, default=100000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if not NUMBA_AVAILABLE:
+        print("numba is not installed, only the NumPy backend is available; nothing to compare.")
+        return 0
+
+    failures = 0
+    print(f"{'kernel':<20} {'robot':<11} {'dtype':<8} {'relative diff':>13}  status")
+    for robot_name in args.robots:
+        robot = get_robot_by_name(robot_name)
+        for dtype, tolerance in TOLERANCES.items():
+            states = random_states(robot.dof, args.size, args.seed, dtype)
+            differences = compare_backends(states['q'], states['qd'], states['qdd'],
+                                           get_link_parameter_arrays(robot, dtype),
+                                           build_rigid_body_model(robot, dtype))
+            for kernel, difference in differences.items():
+                ok = difference <= tolerance
+                failures += not ok
+                print(f"{kernel:<20} {robot_name:<11} {np.dtype(dtype).name:<8} {difference:13.3e}  "
+                      f"{'OK' if ok else 'MISMATCH'}")
+
+    if failures:
+        print(f"\n{failures} kernel(s) disagree between backends")
+        return 1
+    print("\nBackends agree")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
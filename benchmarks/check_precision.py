@@ -0,0 +1,95 @@
+# benchmarks/check_precision.py
+"""
+Accuracy of float32 compute mode against float64 on the benchmark states.
+
+Every batch path is evaluated on the same random joint states in both
+dtypes; the error is reported relative to the largest float64 magnitude of
+each output and checked against an error budget.
+
+Usage (from the repository root):
+    python -m benchmarks.check_precision --size 1000000 --budget 1e-5
+"""
+
+import argparse
+import sys
+import numpy as np
+from typing import Any, Dict, List, Optional
+from robots.kuka_robots import KUKA_ROBOTS, get_robot_by_name
+from robots.kuka_dynamics import (calculate_kuka_newton_euler_batch, calculate_kuka_newton_euler_simplified_batch,
+                                  calculate_kuka_lagrange_batch, calculate_kuka_lagrange_simplified_batch,
+                                  calculate_kuka_kinetic_energy_batch, calculate_kuka_potential_energy_batch,
+                                  calculate_kuka_jacobian_batch)
+from robots.kuka_kinematics import calculate_kuka_forward_kinematics
+from benchmarks.run_benchmarks import random_states
+
+# Case name -> (batch function, state inputs)
+PRECISION_CASES = {
+    'newton_euler_batch': (calculate_kuka_newton_euler_batch, ('q', 'qd', 'qdd')),
+    'newton_euler_simplified_batch': (calculate_kuka_newton_euler_simplified_batch, ('q', 'qd', 'qdd')),
+    'lagrange_batch': (calculate_kuka_lagrange_batch, ('q', 'qd', 'qdd')),
+    'lagrange_simplified_batch': (calculate_kuka_lagrange_simplified_batch, ('q', 'qd', 'qdd')),
+    'kinetic_energy_batch': (calculate_kuka_kinetic_energy_batch, ('q', 'qd')),
+    'potential_energy_batch': (calculate_kuka_potential_energy_batch, ('q',)),
+    'jacobian_batch': (calculate_kuka_jacobian_batch, ('q',)),
+    'forward_kinematics_batch': (calculate_kuka_forward_kinematics, ('q',))
+}
+
+def check_precision(robots: List[str], size: int = 100000, seed: int = 0,
+                    budget: float = 1e-5) -> List[Dict[str, Any]]:
+    """
+    Compare float32 against float64 results of every batch path
+
+    Args:
+        robots: Robot model names
+        size: Number of random joint states per robot
+        seed: Seed of the random states (same as the benchmarks)
+        budget: Allowed error relative to the largest float64 magnitude
+
+    Returns:
+        List of dicts with case, robot, max_abs_error, relative_error and passed
+    """
+    results = []
+    for robot_name in robots:
+        states = random_states(get_robot_by_name(robot_name).dof, size, seed)
+        for name, (function, inputs) in PRECISION_CASES.items():
+            args = [states[key] for key in inputs]
+            reference = function(robot_name, *args, dtype=np.float64)
+            single = function(robot_name, *args, dtype=np.float32)
+
+            error = np.abs(single.astype(np.float64) - reference)
+            scale = max(float(np.abs(reference).max()), np.finfo(np.float64).tiny)
+            relative = float(error.max()) / scale
+            results.append({
+                'case': name,
+                'robot': robot_name,
+                'max_abs_error': float(error.max()),
+                'relative_error': relative,
+                'passed': relative <= budget
+            })
+    return results
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="float32 vs float64 accuracy check")
+    parser.add_argument('--robots', nargs='*', default=list(KUKA_ROBOTS.keys()))
+    parser.add_argument('--size', type=int, default=100000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--budget', type=float, default=1e-5,
+                        help="Allowed error relative to the largest float64 magnitude")
+    args = parser.parse_args(argv)
+
+    results = check_precision(args.robots, args.size, args.seed, args.budget)
+    print(f"{'case':<30} {'robot':<11} {'max abs error':>14} {'relative':>11}  status")
+    for row in results:
+        status = "OK" if row['passed'] else "OVER BUDGET"
+        print(f"{row['case']:<30} {row['robot']:<11} {row['max_abs_error']:14.3e} "
+              f"{row['relative_error']:11.3e}  {status}")
+
+    failed = [row for row in results if not row['passed']]
+    if failed:
+        print(f"\n{len(failed)} case(s) exceed the error budget of {args.budget:g}")
+        return 1
+    print(f"\nAll cases within the error budget of {args.budget:g}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,326 @@
+# benchmarks/run_benchmarks.py
+"""
+Benchmark harness for the dynamics, kinematics and export paths.
+
+Times every case across batch sizes and robots, reports throughput and
+peak memory, and stores or compares JSON baselines.
+
+Usage (from the repository root):
+    python -m benchmarks.run_benchmarks --save benchmarks/baseline.json
+    python -m benchmarks.run_benchmarks --compare benchmarks/baseline.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time as clock
+import tracemalloc
+import numpy as np
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+from robots.kuka_robots import KUKA_ROBOTS, get_robot_by_name
+from robots.kuka_dynamics import (calculate_kuka_newton_euler, calculate_kuka_lagrange,
+                                  calculate_kuka_kinetic_energy, calculate_kuka_potential_energy,
+                                  calculate_kuka_jacobian, calculate_kuka_workspace_torques,
+                                  calculate_kuka_workspace_statistics,
+                                  calculate_kuka_newton_euler_batch, calculate_kuka_newton_euler_simplified_batch,
+                                  calculate_kuka_lagrange_batch, calculate_kuka_lagrange_simplified_batch,
+                                  calculate_kuka_kinetic_energy_batch, calculate_kuka_potential_energy_batch,
+                                  calculate_kuka_jacobian_batch, calculate_kuka_rigid_body_torques_batch,
+                                  calculate_kuka_joint_space_dynamics_batch, calculate_kuka_forward_dynamics_batch)
+from robots.kuka_kinematics import calculate_kuka_forward_kinematics, calculate_kuka_tool_pose
+from robots.kuka_ik import solve_kuka_ik_batch
+from robots.drive_train import calculate_kuka_drive_train_batch
+from robots.incremental import DynamicsState
+from robots.gravity_table import calculate_kuka_gravity_torques
+from logic.lagrange import calculate_lagrange
+from utils.export_utils import RobotResultsExporter
+from utils.precision import compute_dtype, SUPPORTED_DTYPES
+from robots.kuka_kernels import get_available_backends, set_kernel_backend, get_kernel_backend
+
+DEFAULT_SIZES = [10**k for k in range(8)]  # 1 .. 10^7
+
+@dataclass
+class BenchmarkCase:
+    """
+    One benchmarked code path
+
+    setup(robot_name, size, states) returns the zero-argument callable that
+    is timed; states holds pregenerated random joint states of that size.
+    """
+    name: str
+    setup: Callable[[str, int, Dict[str, np.ndarray]], Callable[[], Any]]
+    sized: bool = True  # runs across batch sizes, otherwise once at size 1
+    scalar: bool = False  # per-point Python loop, capped by --max-scalar-size
+    per_robot: bool = True
+    max_size: Optional[int] = None  # largest batch size worth running
+
+def random_states(dof: int, size: int, seed: int = 0, dtype=np.float64) -> Dict[str, np.ndarray]:
+    """Reproducible random joint states of shape (size, dof)"""
+    rng = np.random.default_rng(seed)
+    return {
+        'q': rng.uniform(-np.pi, np.pi, (size, dof)).astype(dtype, copy=False),
+        'qd': rng.uniform(-2.0, 2.0, (size, dof)).astype(dtype, copy=False),
+        'qdd': rng.uniform(-5.0, 5.0, (size, dof)).astype(dtype, copy=False)
+    }
+
+def _scalar_loop(function, *names):
+    def setup(robot_name, size, states):
+        rows = list(zip(*(states[name].tolist() for name in names)))
+        return lambda: [function(robot_name, *row) for row in rows]
+    return setup
+
+def _batch_call(function, *names):
+    def setup(robot_name, size, states):
+        arrays = [states[name] for name in names]
+        return lambda: function(robot_name, *arrays)
+    return setup
+
+def _ik(robot_name, size, states):
+    # Reachable targets: tool poses of the random states, solved from a common seed
+    rotations, positions = calculate_kuka_tool_pose(robot_name, states['q'])
+    return lambda: solve_kuka_ik_batch(robot_name, positions, rotations, initial_guess=states['q'][0],
+                                       max_iterations=50)
+
+def _drive_train(robot_name, size, states):
+    # Random accelerations stand in for link torques, only the cost matters here
+    return lambda: calculate_kuka_drive_train_batch(robot_name, states['qd'], states['qdd'], states['qdd'],
+                                                    time_step=1e-3)
+
+def _incremental_rnea(robot_name, size, states):
+    # Perturb the wrist joint of every state, the proximal links stay cached
+    state = DynamicsState.for_robot(robot_name, states['q'], states['qd'], states['qdd'])
+    state.torques()
+    last = state.model.dof - 1
+    angles = states['q'][:, last]
+    def run():
+        state.set_joint(last, angle=angles + 1e-3)
+        return state.torques()
+    return run
+
+def _export(format_type):
+    def setup(robot_name, size, states):
+        exporter = RobotResultsExporter()
+        q, qd, qdd = (states[name][0].tolist() for name in ('q', 'qd', 'qdd'))
+        kinetic = calculate_kuka_kinetic_energy(robot_name, q, qd)
+        potential = calculate_kuka_potential_energy(robot_name, q)
+        data = exporter.create_analysis_report(
+            robot_name,
+            calculate_kuka_newton_euler(robot_name, q, qd, qdd),
+            calculate_kuka_lagrange(robot_name, q, qd, qdd),
+            {'kinetic_energy': kinetic, 'potential_energy': potential, 'total_energy': kinetic + potential})
+        filename = os.path.join(tempfile.gettempdir(), f'kuka_bench.{format_type}')
+        export = getattr(exporter, f'export_to_{format_type}')
+        return lambda: export(robot_name, data, filename)
+    return setup
+
+CASES: List[BenchmarkCase] = [
+    BenchmarkCase('newton_euler', _scalar_loop(calculate_kuka_newton_euler, 'q', 'qd', 'qdd'), scalar=True),
+    BenchmarkCase('lagrange', _scalar_loop(calculate_kuka_lagrange, 'q', 'qd', 'qdd'), scalar=True),
+    BenchmarkCase('kinetic_energy', _scalar_loop(calculate_kuka_kinetic_energy, 'q', 'qd'), scalar=True),
+    BenchmarkCase('potential_energy', _scalar_loop(calculate_kuka_potential_energy, 'q'), scalar=True),
+    BenchmarkCase('jacobian', _scalar_loop(calculate_kuka_jacobian, 'q'), scalar=True),
+    BenchmarkCase('workspace_torques',
+                  lambda robot_name, size, states: lambda: calculate_kuka_workspace_torques(robot_name, size),
+                  scalar=True),
+    BenchmarkCase('workspace_statistics',
+                  lambda robot_name, size, states: lambda: calculate_kuka_workspace_statistics(robot_name, size)),
+    BenchmarkCase('newton_euler_batch', _batch_call(calculate_kuka_newton_euler_batch, 'q', 'qd', 'qdd'),
+                  max_size=10**6),
+    BenchmarkCase('newton_euler_simplified_batch',
+                  _batch_call(calculate_kuka_newton_euler_simplified_batch, 'q', 'qd', 'qdd')),
+    BenchmarkCase('lagrange_batch', _batch_call(calculate_kuka_lagrange_batch, 'q', 'qd', 'qdd'), max_size=10**6),
+    BenchmarkCase('lagrange_simplified_batch',
+                  _batch_call(calculate_kuka_lagrange_simplified_batch, 'q', 'qd', 'qdd')),
+    BenchmarkCase('kinetic_energy_batch', _batch_call(calculate_kuka_kinetic_energy_batch, 'q', 'qd'),
+                  max_size=10**6),
+    BenchmarkCase('potential_energy_batch', _batch_call(calculate_kuka_potential_energy_batch, 'q'),
+                  max_size=10**6),
+    BenchmarkCase('jacobian_batch', _batch_call(calculate_kuka_jacobian_batch, 'q')),
+    BenchmarkCase('forward_kinematics_batch', _batch_call(calculate_kuka_forward_kinematics, 'q')),
+    BenchmarkCase('rigid_body_torques_batch',
+                  _batch_call(calculate_kuka_rigid_body_torques_batch, 'q', 'qd', 'qdd'), max_size=10**6),
+    BenchmarkCase('joint_space_dynamics_batch',
+                  _batch_call(calculate_kuka_joint_space_dynamics_batch, 'q', 'qd'), max_size=10**6),
+    # Random accelerations stand in for applied torques, M is positive definite either way
+    BenchmarkCase('forward_dynamics_batch',
+                  _batch_call(calculate_kuka_forward_dynamics_batch, 'q', 'qd', 'qdd'), max_size=10**6),
+    BenchmarkCase('ik_batch', _ik, max_size=10**5),
+    BenchmarkCase('drive_train_batch', _drive_train),
+    BenchmarkCase('incremental_rnea_batch', _incremental_rnea, max_size=10**6),
+    BenchmarkCase('gravity_table_batch', _batch_call(calculate_kuka_gravity_torques, 'q')),
+    BenchmarkCase('lagrange_symbolic', lambda robot_name, size, states: calculate_lagrange,
+                  sized=False, per_robot=False),
+    BenchmarkCase('export_json', _export('json'), sized=False),
+    BenchmarkCase('export_csv', _export('csv'), sized=False),
+    BenchmarkCase('export_txt', _export('txt'), sized=False)
+]
+
+def time_callable(function: Callable[[], Any], min_time: float = 0.2, max_repeats: int = 5) -> float:
+    """Best-of wall time of function, repeating until min_time has been spent"""
+    best = float('inf')
+    spent = 0.0
+    for _ in range(max_repeats):
+        started = clock.perf_counter()
+        function()
+        elapsed = clock.perf_counter() - started
+        best = min(best, elapsed)
+        spent += elapsed
+        if spent >= min_time:
+            break
+    return best
+
+def peak_memory(function: Callable[[], Any]) -> int:
+    """Peak traced allocation in bytes during one call"""
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def run_benchmarks(cases: List[BenchmarkCase], robots: List[str], sizes: List[int],
+                   max_scalar_size: int = 10**4, measure_memory: bool = True,
+                   seed: int = 0, verbose: bool = True, dtype: str = 'float64') -> List[Dict[str, Any]]:
+    """
+    Run benchmark cases and collect one result row per (case, robot, size)
+
+    Batch paths run in the given compute dtype; per-point Python paths are
+    unaffected by it.
+
+    Returns:
+        List of dicts with case, robot, size, dtype, seconds, throughput and peak_bytes
+    """
+    results = []
+    with compute_dtype(dtype):
+        for robot_name in robots:
+            dof = get_robot_by_name(robot_name).dof
+            for size in sizes:
+                states = None
+                for case in cases:
+                    if not case.per_robot and robot_name != robots[0]:
+                        continue
+                    if not case.sized and size != sizes[0]:
+                        continue
+                    if case.scalar and size > max_scalar_size:
+                        continue
+                    if case.max_size is not None and size > case.max_size:
+                        continue
+                    n = size if case.sized else 1
+                    if states is None or len(states['q']) != n:
+                        states = random_states(dof, n, seed, SUPPORTED_DTYPES[dtype])
+
+                    function = case.setup(robot_name, n, states)
+                    seconds = time_callable(function)
+                    row = {
+                        'case': case.name,
+                        'robot': robot_name if case.per_robot else '-',
+                        'size': n,
+                        'dtype': dtype,
+                        'backend': get_kernel_backend(),
+                        'seconds': seconds,
+                        'throughput': n / seconds if seconds > 0 else float('inf'),
+                        'peak_bytes': peak_memory(function) if measure_memory else None
+                    }
+                    results.append(row)
+                    if verbose:
+                        print(format_row(row), flush=True)
+    return results
+
+def format_row(row: Dict[str, Any]) -> str:
+    peak = '-' if row['peak_bytes'] is None else f"{row['peak_bytes'] / 1e6:10.2f} MB"
+    return (f"{row['case']:<30} {row['robot']:<11} {row['size']:>9} "
+            f"{row['seconds'] * 1e3:12.3f} ms {row['throughput']:14.1f} /s {peak}")
+
+def save_baseline(results: List[Dict[str, Any]], filename: str):
+    """Store benchmark results with some machine context as a JSON baseline"""
+    baseline = {
+        'created': datetime.now().isoformat(),
+        'python': sys.version.split()[0],
+        'numpy': np.__version__,
+        'machine': platform.platform(),
+        'results': results
+    }
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump(baseline, f, indent=2)
+
+def compare_to_baseline(results: List[Dict[str, Any]], filename: str,
+                        tolerance: float = 0.25) -> List[str]:
+    """
+    Flag cases that got slower than a saved baseline
+
+    Args:
+        results: Fresh benchmark results
+        filename: Baseline JSON written by save_baseline
+        tolerance: Allowed relative slowdown before a case is flagged
+
+    Returns:
+        Human-readable regression messages, empty when nothing regressed
+    """
+    with open(filename, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+
+    def key(row):
+        return (row['case'], row['robot'], row['size'], row.get('dtype', 'float64'),
+                row.get('backend', 'numpy'))
+
+    reference = {key(row): row for row in baseline['results']}
+    regressions = []
+    for row in results:
+        old = reference.get(key(row))
+        if old is None:
+            continue
+        if row['seconds'] > old['seconds'] * (1 + tolerance):
+            regressions.append(
+                f"{row['case']} [{row['robot']}, n={row['size']}, {row.get('dtype', 'float64')}, {row.get('backend', 'numpy')}]: "
+                f"{old['seconds'] * 1e3:.3f} ms -> {row['seconds'] * 1e3:.3f} ms "
+                f"({row['seconds'] / old['seconds']:.2f}x)")
+    return regressions
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="KUKA Dynamics Studio benchmarks")
+    parser.add_argument('--cases', nargs='*', help="Case names to run (default: all)")
+    parser.add_argument('--robots', nargs='*', default=list(KUKA_ROBOTS.keys()))
+    parser.add_argument('--max-size', type=int, default=10**7)
+    parser.add_argument('--max-scalar-size', type=int, default=10**4,
+                        help="Largest batch size for per-point Python paths")
+    parser.add_argument('--no-memory', action='store_true', help="Skip peak memory measurement")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--dtype', choices=list(SUPPORTED_DTYPES), default='float64',
+                        help="Compute dtype of the batch paths")
+    parser.add_argument('--backend', choices=['auto'] + get_available_backends(), default='auto',
+                        help="Kernel backend of the batch paths")
+    parser.add_argument('--save', help="Write results as a JSON baseline")
+    parser.add_argument('--compare', help="Compare against a JSON baseline")
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    set_kernel_backend(args.backend)
+    cases = [case for case in CASES if not args.cases or case.name in args.cases]
+    sizes = [size for size in DEFAULT_SIZES if size <= args.max_size]
+
+    print(f"Kernel backend: {get_kernel_backend()}, compute dtype: {args.dtype}")
+    print(f"{'case':<30} {'robot':<11} {'size':>9} {'time':>15} {'throughput':>17} {'peak memory':>13}")
+    results = run_benchmarks(cases, args.robots, sizes, args.max_scalar_size,
+                             not args.no_memory, args.seed, dtype=args.dtype)
+
+    if args.save:
+        save_baseline(results, args.save)
+        print(f"Baseline saved to {args.save}")
+
+    if args.compare:
+        regressions = compare_to_baseline(results, args.compare, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) against {args.compare}:")
+            for message in regressions:
+                print(f"  {message}")
+            return 1
+        print(f"\nNo regressions against {args.compare}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+# graphics/charts.py
+"""
+Chart drawing on plain matplotlib axes.
+
+Nothing here depends on Qt, so the same charts are drawn inside the
+PlotWidget and on Agg figures for headless reports (graphics/report.py).
+"""
+
+import numpy as np
+from graphics.decimation import decimate_min_max
+
+JOINT_COLORS = ['blue', 'red', 'green', 'orange', 'purple', 'brown']
+
+def draw_robot_specs_comparison(ax):
+    """Plot robot specifications comparison chart"""
+    try:
+        from robots.kuka_robots import get_available_robots, get_robot_by_name
+
+        # Get robot data (built-in and registry models)
+        robot_names = get_available_robots()
+        robots = [get_robot_by_name(name) for name in robot_names]
+        max_payloads = [robot.max_payload for robot in robots]
+        reaches = [robot.reach for robot in robots]
+        max_speeds = [robot.max_speed for robot in robots]
+
+        # Create bar chart
+        x = range(len(robot_names))
+        width = 0.25
+
+        # Plot payload comparison
+        bars1 = ax.bar([i - width for i in x], max_payloads, width,
+                      label='Max Payload (kg)', color='#ff0000', alpha=0.8)
+
+        # Plot reach comparison
+        bars2 = ax.bar(x, reaches, width,
+                      label='Reach (m)', color='#0080ff', alpha=0.8)
+
+        # Plot speed comparison (scaled down for better visualization)
+        scaled_speeds = [speed/10 for speed in max_speeds]  # Scale down by 10
+        bars3 = ax.bar([i + width for i in x], scaled_speeds, width,
+                      label='Max Speed (rad/s ÷ 10)', color='#000000', alpha=0.8)
+
+        # Customize the plot
+        ax.set_xlabel('KUKA Robot Models', color='#000000')
+        ax.set_ylabel('Values', color='#000000')
+        ax.set_title('Robot Specifications Comparison', fontsize=12, fontweight='bold', color='#000000')
+        ax.set_xticks(x)
+        ax.set_xticklabels([name.replace(' ', '\n') for name in robot_names], rotation=0, color='#000000')
+        ax.legend(facecolor='#f0f0f0', edgecolor='#696969', labelcolor='#000000')
+        ax.grid(True, alpha=0.3, color='#696969')
+        ax.set_facecolor('#ffffff')
+        ax.tick_params(colors='#000000')
+
+        # Add value labels on bars
+        for bars in [bars1, bars2, bars3]:
+            for bar in bars:
+                height = bar.get_height()
+                ax.text(bar.get_x() + bar.get_width()/2., height,
+                       f'{height:.1f}', ha='center', va='bottom', fontsize=9, color='#000000', weight='bold')
+
+    except ImportError:
+        # Fallback if robot data is not available
+        ax.text(0.5, 0.5, 'Robot data not available',
+               ha='center', va='center', transform=ax.transAxes,
+               fontsize=12, color='#000000')
+        ax.set_title('Robot Specifications', fontsize=12, fontweight='bold', color='#000000')
+        ax.set_facecolor('#ffffff')
+
+def style_workspace_axes(ax):
+    """Labels and styling of the combined Newton-Euler / Lagrange torque axes"""
+    ax.set_xlabel('Time (s)')
+    ax.set_ylabel('Torque (Nm)')
+    ax.set_title('KUKA Robot - Combined Torque Analysis', fontsize=12, fontweight='bold')
+    ax.legend(bbox_to_anchor=(1.05, 1), loc='upper left')
+    ax.grid(True, alpha=0.3)
+    ax.set_facecolor('#f8f9fa')
+
+def draw_workspace_torques(ax, time, newton_euler_torques, lagrange_torques, pixels: int = 1000):
+    """
+    Newton-Euler (solid) and Lagrange (dashed) torques of every joint,
+    min/max-decimated to the given width
+    """
+    for i in range(newton_euler_torques.shape[1]):
+        ax.plot(*decimate_min_max(time, newton_euler_torques[:, i], pixels), label=f'NE Joint {i+1}',
+                color=JOINT_COLORS[i % len(JOINT_COLORS)], linewidth=2, linestyle='-')
+    for i in range(lagrange_torques.shape[1]):
+        ax.plot(*decimate_min_max(time, lagrange_torques[:, i], pixels), label=f'LG Joint {i+1}',
+                color=JOINT_COLORS[i % len(JOINT_COLORS)], linewidth=2, linestyle='--')
+    style_workspace_axes(ax)
+
+def draw_torque_statistics(ax, peak, rms, percentile, limits=None, percentile_label: str = 'p99'):
+    """
+    Per-joint peak, RMS and percentile of |τ| as grouped bars, with the
+    torque limits as markers
+    """
+    x = np.arange(len(peak))
+    width = 0.25
+    ax.bar(x - width, peak, width, label='Peak |τ| (Nm)', color='#ff0000', alpha=0.8)
+    ax.bar(x, percentile, width, label=f'{percentile_label} |τ| (Nm)', color='#0080ff', alpha=0.8)
+    ax.bar(x + width, rms, width, label='RMS τ (Nm)', color='#000000', alpha=0.8)
+    if limits is not None:
+        ax.scatter(x, limits, marker='_', s=600, color='#696969', label='Torque limit', zorder=3)
+    ax.set_xticks(x)
+    ax.set_xticklabels([f'Joint {i+1}' for i in x])
+    ax.set_ylabel('Torque (Nm)', color='#000000')
+    ax.set_title('Joint Torque Statistics', fontsize=12, fontweight='bold', color='#000000')
+    ax.legend(facecolor='#f0f0f0', edgecolor='#696969', labelcolor='#000000')
+    ax.grid(True, alpha=0.3, color='#696969')
+    ax.set_facecolor('#ffffff')
@@ -0,0 +1,140 @@
+# graphics/decimation.py
+
+import numpy as np
+from typing import List, Tuple
+
+
+def _reduce_min_max(lo_idx: np.ndarray, hi_idx: np.ndarray, y: np.ndarray,
+                    factor: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Merge groups of `factor` consecutive buckets into one, keeping the
+    sample indices of the minimum and maximum of each group.
+
+    Args:
+        lo_idx: Sample indices of the per-bucket minima
+        hi_idx: Sample indices of the per-bucket maxima
+        y: Raw sample values
+        factor: Number of buckets merged into one
+
+    Returns:
+        Tuple of (min_indices, max_indices) for the merged buckets
+    """
+    pad = (-len(lo_idx)) % factor
+    if pad:
+        # Repeat the last bucket so the trailing group is complete
+        lo_idx = np.concatenate([lo_idx, np.repeat(lo_idx[-1], pad)])
+        hi_idx = np.concatenate([hi_idx, np.repeat(hi_idx[-1], pad)])
+
+    lo_idx = lo_idx.reshape(-1, factor)
+    hi_idx = hi_idx.reshape(-1, factor)
+    rows = np.arange(lo_idx.shape[0])
+
+    lo_idx = lo_idx[rows, np.argmin(y[lo_idx], axis=1)]
+    hi_idx = hi_idx[rows, np.argmax(y[hi_idx], axis=1)]
+    return lo_idx, hi_idx
+
+
+class LODPyramid:
+    """
+    Multi-resolution min/max pyramid of a single trace.
+
+    Level 0 is the raw signal; level k stores, for every bucket of
+    factor**k consecutive samples, the indices of its minimum and maximum.
+    Queries pick the coarsest level that still gives at least one bucket
+    per pixel, so peaks survive decimation at every zoom level.
+    """
+
+    def __init__(self, x, y, factor: int = 4, min_buckets: int = 512):
+        """
+        Args:
+            x: Monotonically increasing sample positions (e.g. time)
+            y: Sample values
+            factor: Bucket growth factor between two pyramid levels
+            min_buckets: Stop building levels once a level has fewer buckets
+        """
+        self.x = np.asarray(x, dtype=float)
+        self.y = np.asarray(y, dtype=float)
+        if self.x.shape != self.y.shape or self.x.ndim != 1:
+            raise ValueError("x and y must be 1-D arrays of the same length")
+
+        self.factor = factor
+        self.bucket_sizes: List[int] = [1]
+        self.levels: List[Tuple[np.ndarray, np.ndarray]] = []
+
+        lo_idx = hi_idx = np.arange(len(self.y))
+        self.levels.append((lo_idx, hi_idx))
+
+        bucket_size = 1
+        while len(lo_idx) > min_buckets:
+            lo_idx, hi_idx = _reduce_min_max(lo_idx, hi_idx, self.y, factor)
+            bucket_size *= factor
+            self.levels.append((lo_idx, hi_idx))
+            self.bucket_sizes.append(bucket_size)
+
+    def __len__(self) -> int:
+        return len(self.y)
+
+    def query(self, x_min: float = None, x_max: float = None,
+              pixels: int = 1000) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get a decimated view of the trace for a visible x range.
+
+        Args:
+            x_min: Left edge of the visible range (None for the start)
+            x_max: Right edge of the visible range (None for the end)
+            pixels: Visible width in pixels
+
+        Returns:
+            Tuple of (x, y) arrays with at most about 2 * pixels points
+        """
+        n = len(self.y)
+        if n == 0:
+            return self.x, self.y
+
+        # One sample outside each edge keeps the line continuous while panning
+        start = 0 if x_min is None else max(np.searchsorted(self.x, x_min, side='left') - 1, 0)
+        stop = n if x_max is None else min(np.searchsorted(self.x, x_max, side='right') + 1, n)
+        if stop <= start:
+            return self.x[:0], self.y[:0]
+
+        pixels = max(int(pixels), 1)
+        visible = stop - start
+        if visible <= 2 * pixels:
+            return self.x[start:stop], self.y[start:stop]
+
+        # Coarsest level that still has at least one bucket per pixel
+        target = visible / pixels
+        level = 0
+        for k, size in enumerate(self.bucket_sizes):
+            if size <= target:
+                level = k
+
+        size = self.bucket_sizes[level]
+        lo_idx, hi_idx = self.levels[level]
+        first = start // size
+        last = -(-stop // size)
+        lo_idx = lo_idx[first:last]
+        hi_idx = hi_idx[first:last]
+
+        group = -(-len(lo_idx) // pixels)
+        if group > 1:
+            lo_idx, hi_idx = _reduce_min_max(lo_idx, hi_idx, self.y, group)
+
+        # Emit min and max of every bucket in time order
+        idx = np.sort(np.stack([lo_idx, hi_idx], axis=1), axis=1).ravel()
+        return self.x[idx], self.y[idx]
+
+
+def decimate_min_max(x, y, pixels: int = 1000) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    One-shot min/max decimation of a trace to a given pixel width
+
+    Args:
+        x: Monotonically increasing sample positions
+        y: Sample values
+        pixels: Target width in pixels
+
+    Returns:
+        Tuple of (x, y) arrays with peaks preserved
+    """
+    return LODPyramid(x, y).query(pixels=pixels)
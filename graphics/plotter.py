@@ -1,7 +1,8 @@
 from PyQt5.QtWidgets import QWidget, QVBoxLayout
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
-import numpy as np
+from graphics.decimation import LODPyramid, decimate_min_max
+from graphics.charts import JOINT_COLORS, draw_robot_specs_comparison, style_workspace_axes
 
 class PlotWidget(QWidget):
     def __init__(self, parent=None):
@@ -14,6 +15,11 @@ class PlotWidget(QWidget):
         layout.addWidget(self.canvas)
         self.setLayout(layout)
 
+        # (line, pyramid) pairs redrawn at the visible resolution on zoom/pan
+        self._lod_lines = []
+        self._time_cursor = None
+        self._live_lines = []
+
     def plot_torque(self, time, torque):
         self.figure.clear()
         
@@ -79,33 +85,97 @@ class PlotWidget(QWidget):
         ax2 = self.figure.add_subplot(2, 1, 2)
         
         # Plot combined torques (top)
-        colors = ['blue', 'red', 'green', 'orange', 'purple', 'brown']
+        colors = JOINT_COLORS
+        
+        # Long traces are drawn through min/max pyramids so only about two
+        # points per pixel reach matplotlib, whatever the trace length
+        self._lod_lines = []
         
         # Plot Newton-Euler torques
         for i in range(newton_euler_torques.shape[1]):
-            ax1.plot(time, newton_euler_torques[:, i], 
-                    label=f'NE Joint {i+1}', 
-                    color=colors[i % len(colors)], linewidth=2, linestyle='-')
+            self.plot_lod_line(ax1, time, newton_euler_torques[:, i], 
+                              label=f'NE Joint {i+1}', 
+                              color=colors[i % len(colors)], linewidth=2, linestyle='-')
         
         # Plot Lagrange torques with dashed lines
         for i in range(lagrange_torques.shape[1]):
-            ax1.plot(time, lagrange_torques[:, i], 
-                    label=f'LG Joint {i+1}', 
-                    color=colors[i % len(colors)], linewidth=2, linestyle='--')
+            self.plot_lod_line(ax1, time, lagrange_torques[:, i], 
+                              label=f'LG Joint {i+1}', 
+                              color=colors[i % len(colors)], linewidth=2, linestyle='--')
         
-        ax1.set_xlabel('Time (s)')
-        ax1.set_ylabel('Torque (Nm)')
-        ax1.set_title('KUKA Robot - Combined Torque Analysis', fontsize=12, fontweight='bold')
-        ax1.legend(bbox_to_anchor=(1.05, 1), loc='upper left')
-        ax1.grid(True, alpha=0.3)
-        ax1.set_facecolor('#f8f9fa')
+        ax1.callbacks.connect('xlim_changed', self.update_lod_lines)
+        style_workspace_axes(ax1)
         
         # Bottom plot: Robot specifications comparison
         self.plot_robot_specs_comparison(ax2)
         
         self.figure.tight_layout()
+        self.update_lod_lines(ax1)
         self.canvas.draw()
     
+    def plot_lod_line(self, ax, x, y, **kwargs):
+        """Plot a trace through a level-of-detail pyramid"""
+        pyramid = LODPyramid(x, y)
+        line, = ax.plot(*pyramid.query(pixels=self.axes_pixel_width(ax)), **kwargs)
+        self._lod_lines.append((line, pyramid))
+        return line
+    
+    def update_lod_lines(self, ax):
+        """Re-decimate level-of-detail lines for the visible x range of an axes"""
+        x_min, x_max = ax.get_xlim()
+        pixels = self.axes_pixel_width(ax)
+        for line, pyramid in self._lod_lines:
+            if line.axes is ax:
+                line.set_data(*pyramid.query(x_min, x_max, pixels))
+        self.canvas.draw_idle()
+    
+    def set_time_cursor(self, t):
+        """Move the vertical time cursor on the top (time-based) axes"""
+        if not self.figure.axes:
+            return
+        ax = self.figure.axes[0]
+        if self._time_cursor is None or self._time_cursor.axes is not ax:
+            self._time_cursor = ax.axvline(t, color='#000000', linewidth=1, alpha=0.7)
+        else:
+            self._time_cursor.set_xdata([t, t])
+        self.canvas.draw_idle()
+    
+    def axes_pixel_width(self, ax):
+        """Width of an axes on screen in pixels"""
+        return max(int(ax.get_window_extent().width), 1)
+    
+    def plot_live_torques(self, time, torques, window=10.0):
+        """
+        Update the rolling live torque plot
+        
+        Artists are created once and only their data is replaced on later
+        calls, so the plot can be refreshed at a fixed rate.
+        """
+        if not self._live_lines or self._live_lines[0].axes not in self.figure.axes:
+            self.figure.clear()
+            ax = self.figure.add_subplot(1, 1, 1)
+            colors = ['blue', 'red', 'green', 'orange', 'purple', 'brown']
+            self._live_lines = [ax.plot([], [], label=f'Joint {i+1}', color=colors[i % len(colors)],
+                                        linewidth=1.5)[0]
+                                for i in range(torques.shape[1])]
+            ax.set_xlabel('Time (s)')
+            ax.set_ylabel('Torque (Nm)')
+            ax.set_title('Live Joint Torques', fontsize=12, fontweight='bold')
+            ax.legend(loc='upper left')
+            ax.grid(True, alpha=0.3)
+            ax.set_facecolor('#f8f9fa')
+            self.figure.tight_layout()
+        
+        ax = self._live_lines[0].axes
+        if len(time):
+            pixels = self.axes_pixel_width(ax)
+            for i, line in enumerate(self._live_lines):
+                line.set_data(*decimate_min_max(time, torques[:, i], pixels))
+            ax.set_xlim(max(time[-1] - window, time[0]), max(time[-1], time[0] + 1e-6))
+            ax.relim()
+            ax.autoscale_view(scalex=False)
+        self.canvas.draw_idle()
+    
     def plot_combined_analysis(self, time, newton_euler_torque, lagrange_tau1, lagrange_tau2):
         """Plot both Newton-Euler and Lagrange results together"""
         self.figure.clear()
@@ -143,54 +213,4 @@ class PlotWidget(QWidget):
 
     def plot_robot_specs_comparison(self, ax):
         """Plot robot specifications comparison chart"""
-        try:
-            from robots.kuka_robots import KUKA_ROBOTS
-            
-            # Get robot data
-            robot_names = list(KUKA_ROBOTS.keys())
-            max_payloads = [robot.max_payload for robot in KUKA_ROBOTS.values()]
-            reaches = [robot.reach for robot in KUKA_ROBOTS.values()]
-            max_speeds = [robot.max_speed for robot in KUKA_ROBOTS.values()]
-            
-            # Create bar chart
-            x = range(len(robot_names))
-            width = 0.25
-            
-            # Plot payload comparison
-            bars1 = ax.bar([i - width for i in x], max_payloads, width, 
-                          label='Max Payload (kg)', color='#ff0000', alpha=0.8)
-            
-            # Plot reach comparison
-            bars2 = ax.bar(x, reaches, width, 
-                          label='Reach (m)', color='#0080ff', alpha=0.8)
-            
-            # Plot speed comparison (scaled down for better visualization)
-            scaled_speeds = [speed/10 for speed in max_speeds]  # Scale down by 10
-            bars3 = ax.bar([i + width for i in x], scaled_speeds, width, 
-                          label='Max Speed (rad/s ÷ 10)', color='#000000', alpha=0.8)
-            
-            # Customize the plot
-            ax.set_xlabel('KUKA Robot Models', color='#000000')
-            ax.set_ylabel('Values', color='#000000')
-            ax.set_title('Robot Specifications Comparison', fontsize=12, fontweight='bold', color='#000000')
-            ax.set_xticks(x)
-            ax.set_xticklabels([name.replace(' ', '\n') for name in robot_names], rotation=0, color='#000000')
-            ax.legend(facecolor='#f0f0f0', edgecolor='#696969', labelcolor='#000000')
-            ax.grid(True, alpha=0.3, color='#696969')
-            ax.set_facecolor('#ffffff')
-            ax.tick_params(colors='#000000')
-            
-            # Add value labels on bars
-            for bars in [bars1, bars2, bars3]:
-                for bar in bars:
-                    height = bar.get_height()
-                    ax.text(bar.get_x() + bar.get_width()/2., height,
-                           f'{height:.1f}', ha='center', va='bottom', fontsize=9, color='#000000', weight='bold')
-            
-        except ImportError:
-            # Fallback if robot data is not available
-            ax.text(0.5, 0.5, 'Robot data not available', 
-                   ha='center', va='center', transform=ax.transAxes,
-                   fontsize=12, color='#000000')
-            ax.set_title('Robot Specifications', fontsize=12, fontweight='bold', color='#000000')
-            ax.set_facecolor('#ffffff')
+        draw_robot_specs_comparison(ax)
@@ -0,0 +1,233 @@
+# graphics/report.py
+"""
+Headless analysis reports.
+
+Every chart of a report is one job: a worker process computes its data
+through the chunked workspace stream (robots/workspace_stream.py), draws
+it on an Agg figure (no display, no Qt) and saves a PNG. The main process
+then assembles, per robot, the figures and the exporter's text summary
+into an HTML page and/or a PDF.
+
+Charts:
+    torque      per-joint peak, p99 and RMS |τ| against the torque limits
+    workspace   Newton-Euler and Lagrange torques over time (min/max envelope)
+    specs       specifications of all robots (rendered once, shared)
+
+Scenarios are sample-trajectory runs of a given length (SCENARIOS);
+long scenarios stay in constant memory.
+
+Usage (from the repository root):
+    python -m graphics.report --output reports --formats html pdf
+    python -m graphics.report --robots "KR6 R900" --scenarios nominal --workers 4
+"""
+
+import argparse
+import html
+import os
+import sys
+import numpy as np
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.backends.backend_pdf import PdfPages
+from graphics.charts import draw_robot_specs_comparison, draw_workspace_torques, draw_torque_statistics
+from robots.kuka_robots import get_available_robots, get_robot_by_name, get_robot_torque_limits
+from robots.workspace_stream import (stream_kuka_workspace_torques, run_pipeline, StatisticsStage, LimitStage,
+                                     EnvelopeStage)
+from robots.model_registry import model_process_pool, model_slug
+from utils.export_utils import RobotResultsExporter
+from utils.streaming_stats import StreamingStatistics
+
+CHARTS = ('torque', 'workspace', 'specs')
+FIGURE_SIZE = (10, 6)  # inches
+DPI = 100
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    time_points: int
+    duration: float  # seconds
+
+SCENARIOS: Dict[str, Scenario] = {
+    'nominal': Scenario('nominal', 1000, 10.0),
+    'long': Scenario('long', 10**6, 3600.0)
+}
+
+def _scenario_summary(robot_name: str, scenario: Scenario) -> Dict:
+    """Streamed statistics and limit check of one scenario"""
+    limits = np.asarray(get_robot_torque_limits(robot_name), dtype=float)
+    dof = get_robot_by_name(robot_name).dof
+    limits = limits if len(limits) == dof else np.full(dof, np.inf)
+    statistics = StatisticsStage(limits)
+    checks = LimitStage(limits)
+    magnitude = StreamingStatistics(dof)
+    run_pipeline(stream_kuka_workspace_torques(robot_name, time_points=scenario.time_points,
+                                               duration=scenario.duration),
+                 statistics, checks, lambda chunk: magnitude.update(np.abs(chunk.tau['newton_euler'])))
+    return {
+        'statistics': {method: s.summary() for method, s in statistics.statistics.items()},
+        'violations': {method: [int(j) for j in joints] for method, joints in checks.violations().items()},
+        'peak': magnitude.max.tolist(),
+        'p99': magnitude.percentile(99.0).tolist(),
+        'rms': magnitude.rms.tolist(),
+        'limits': limits.tolist()
+    }
+
+def _render(job) -> Tuple[str, Optional[Dict]]:
+    """Draw one chart on an Agg figure and save it; returns (path, scenario summary or None)"""
+    robot_name, scenario, chart, path = job
+    figure = Figure(figsize=FIGURE_SIZE, dpi=DPI)
+    FigureCanvasAgg(figure)
+    ax = figure.add_subplot(1, 1, 1)
+    summary = None
+    if chart == 'specs':
+        draw_robot_specs_comparison(ax)
+    elif chart == 'workspace':
+        envelope = EnvelopeStage()
+        run_pipeline(stream_kuka_workspace_torques(robot_name, time_points=scenario.time_points,
+                                                   duration=scenario.duration), envelope)
+        time, traces = envelope.traces()
+        draw_workspace_torques(ax, time, traces['newton_euler'], traces['lagrange'],
+                               pixels=int(FIGURE_SIZE[0] * DPI))
+    elif chart == 'torque':
+        summary = _scenario_summary(robot_name, scenario)
+        limits = np.asarray(summary['limits'])
+        draw_torque_statistics(ax, summary['peak'], summary['rms'], summary['p99'],
+                               limits if np.all(np.isfinite(limits)) else None)
+    else:
+        raise ValueError(f"Unknown chart {chart}, expected one of {CHARTS}")
+    if chart != 'specs':
+        ax.set_title(f'{ax.get_title()} - {robot_name} ({scenario.name})')
+    figure.tight_layout()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary = f'{path}.{os.getpid()}.tmp.png'
+    figure.savefig(temporary, dpi=DPI)
+    os.replace(temporary, path)
+    return path, summary
+
+def _text_summary(exporter: RobotResultsExporter, robot_name: str, summary: Dict, filename: str) -> str:
+    """The exporter's text report of one scenario"""
+    statistics = summary['statistics']
+    warnings = [f"Joint {j + 1} exceeds its torque limit ({method})"
+                for method, joints in summary['violations'].items() for j in joints]
+    analysis_data = exporter.create_analysis_report(robot_name, statistics['newton_euler']['max'],
+                                                    statistics['lagrange']['max'], warnings=warnings)
+    analysis_data['torque_statistics'] = statistics
+    exporter.export_to_txt(robot_name, analysis_data, filename)
+    with open(filename, 'r', encoding='utf-8') as f:
+        return f.read()
+
+def _write_html(filename: str, robot_name: str, sections: List[Tuple[str, str, List[str]]]):
+    directory = os.path.dirname(filename)
+    parts = [f"<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>{html.escape(robot_name)} report</title>"
+             "<style>body{font-family:Arial,sans-serif;margin:2em}img{max-width:100%}"
+             "pre{background:#f8f9fa;padding:1em}</style></head><body>",
+             f"<h1>KUKA Robot Analysis Report: {html.escape(robot_name)}</h1>"]
+    for title, text, images in sections:
+        parts.append(f"<h2>{html.escape(title)}</h2>")
+        if text:
+            parts.append(f"<pre>{html.escape(text)}</pre>")
+        for image in images:
+            parts.append(f"<img src=\"{html.escape(os.path.relpath(image, directory))}\" alt=\"\">")
+    parts.append("</body></html>\n")
+    with open(filename, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(parts))
+
+def _write_pdf(filename: str, robot_name: str, sections: List[Tuple[str, str, List[str]]]):
+    from matplotlib.image import imread
+    with PdfPages(filename) as pdf:
+        for title, text, images in sections:
+            if text:
+                page = Figure(figsize=(8.27, 11.69))  # A4
+                FigureCanvasAgg(page)
+                page.text(0.05, 0.97, f"{robot_name}: {title}", fontsize=14, fontweight='bold', va='top')
+                page.text(0.05, 0.93, text, fontsize=8, family='monospace', va='top')
+                pdf.savefig(page)
+            for image in images:
+                # Rendered charts are embedded as images, they are not redrawn
+                pixels = imread(image)
+                page = Figure(figsize=(pixels.shape[1] / DPI, pixels.shape[0] / DPI), dpi=DPI)
+                FigureCanvasAgg(page)
+                page.figimage(pixels)
+                pdf.savefig(page)
+
+def generate_reports(output: str, robots: Optional[Sequence[str]] = None,
+                     scenarios: Sequence[str] = ('nominal',), formats: Sequence[str] = ('html',),
+                     workers: Optional[int] = None) -> List[str]:
+    """
+    Render the charts of every robot and scenario in parallel and write one
+    report per robot and format
+
+    Args:
+        output: Report directory (figures go to output/figures)
+        robots: Robot names, all by default
+        scenarios: Keys of SCENARIOS
+        formats: 'html' and/or 'pdf'
+        workers: Render processes, one per CPU by default; 1 renders in this process
+
+    Returns:
+        Report file names
+    """
+    robots = list(robots or get_available_robots())
+    for robot_name in robots:
+        if get_robot_by_name(robot_name) is None:
+            raise ValueError(f"Robot {robot_name} not found")
+    unknown = [s for s in scenarios if s not in SCENARIOS] + [f for f in formats if f not in ('html', 'pdf')]
+    if unknown:
+        raise ValueError(f"Unknown scenarios or formats {unknown}")
+
+    figures = os.path.join(output, 'figures')
+    specs_path = os.path.join(figures, 'specs.png')
+    jobs = [(None, None, 'specs', specs_path)]
+    for robot_name in robots:
+        for name in scenarios:
+            for chart in ('torque', 'workspace'):
+                jobs.append((robot_name, SCENARIOS[name], chart,
+                             os.path.join(figures, f'{model_slug(robot_name)}_{name}_{chart}.png')))
+
+    # Longest scenarios first, so the pool does not end waiting on one of them
+    jobs.sort(key=lambda job: -(job[1].time_points if job[1] else 0))
+    workers = workers or min(len(jobs), os.cpu_count() or 1)
+    if workers <= 1:
+        results = list(map(_render, jobs))
+    else:
+        with model_process_pool(workers) as pool:
+            results = list(pool.map(_render, jobs))
+    summaries = {(job[0], job[1].name): summary for job, (_, summary) in zip(jobs, results) if summary is not None}
+
+    exporter = RobotResultsExporter()
+    reports = []
+    for robot_name in robots:
+        sections = []
+        for name in scenarios:
+            text = _text_summary(exporter, robot_name, summaries[(robot_name, name)],
+                                 os.path.join(output, f'{model_slug(robot_name)}_{name}.txt'))
+            images = [os.path.join(figures, f'{model_slug(robot_name)}_{name}_{chart}.png')
+                      for chart in ('torque', 'workspace')]
+            sections.append((f"Scenario: {name} ({SCENARIOS[name].time_points} time points, "
+                             f"{SCENARIOS[name].duration:g} s)", text, images))
+        sections.append(("Robot Specifications Comparison", "", [specs_path]))
+        if 'html' in formats:
+            reports.append(os.path.join(output, f'{model_slug(robot_name)}.html'))
+            _write_html(reports[-1], robot_name, sections)
+        if 'pdf' in formats:
+            reports.append(os.path.join(output, f'{model_slug(robot_name)}.pdf'))
+            _write_pdf(reports[-1], robot_name, sections)
+    return reports
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Render headless analysis reports")
+    parser.add_argument('--robots', nargs='*', default=get_available_robots())
+    parser.add_argument('--scenarios', nargs='*', choices=sorted(SCENARIOS), default=['nominal'])
+    parser.add_argument('--formats', nargs='*', choices=('html', 'pdf'), default=['html'])
+    parser.add_argument('--output', default='reports')
+    parser.add_argument('--workers', type=int, help="Render processes (default: one per CPU)")
+    args = parser.parse_args(argv)
+
+    for filename in generate_reports(args.output, args.robots, args.scenarios, args.formats, args.workers):
+        print(filename)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -6,15 +6,27 @@ from matplotlib.patches import Rectangle, Circle, FancyBboxPatch
 from matplotlib.lines import Line2D
 from matplotlib.patches import Polygon
 import matplotlib.patches as mpatches
+from robots.kuka_robots import get_robot_by_name, get_robot_torque_limits
+from robots.incremental import KinematicsState
+from robots.kuka_kinematics import VIEW_PLANE_AXES
 
 class RobotVisualizer:
     def __init__(self, figure, canvas):
         self.figure = figure
         self.canvas = canvas
+        # Artists reused across playback frames
+        self.playback_artists = None
+        # Configuration index of the selected robot, shades the reachable region when set
+        self.reachability_index = None
+        # Kinematics and artists of the drawn configuration, updated in place per joint
+        self.kinematics = None
+        self.kinematics_robot = None
+        self.robot_artists = None
         
     def draw_kuka_robot(self, robot_name, joint_angles, show_limits=True):
         """Draw KUKA robot with given joint angles"""
         self.figure.clear()
+        self.playback_artists = None
         
         # Set figure size and style
         self.figure.set_size_inches(8, 6)
@@ -25,10 +37,16 @@ class RobotVisualizer:
         joint_radii = [0.05, 0.04, 0.03, 0.02, 0.02, 0.02]
         
         # Calculate positions
-        positions = self.calculate_robot_positions(joint_angles, link_lengths)
+        if self.kinematics is None or self.kinematics_robot != robot_name:
+            self.kinematics = KinematicsState.for_robot(robot_name, joint_angles, dtype=np.float64)
+            self.kinematics_robot = robot_name
+        else:
+            self.kinematics.set_joint_angles(joint_angles)
+        positions = self.view_positions()
         
         # Draw robot
-        self.draw_robot_links(ax, positions, link_lengths, joint_radii)
+        self.robot_artists = self.draw_robot_links(ax, positions, link_lengths, joint_radii)
+        self.robot_artists['robot_name'] = robot_name
         
         # Draw workspace limits if requested
         if show_limits:
@@ -47,6 +65,100 @@ class RobotVisualizer:
         self.figure.tight_layout()
         self.canvas.draw()
     
+    def update_joint_angle(self, robot_name, joint_angles, joint_idx):
+        """
+        Redraw the robot after joint joint_idx moved to joint_angles[joint_idx]
+        
+        Only the frames distal to the joint are recomputed and only their
+        artists are moved; without a drawn robot of that name this falls
+        back to draw_kuka_robot.
+        """
+        artists = self.robot_artists
+        if artists is None or artists['robot_name'] != robot_name:
+            self.draw_kuka_robot(robot_name, joint_angles)
+            return
+        
+        self.kinematics.set_joint(joint_idx, joint_angles[joint_idx])
+        positions = self.view_positions()
+        links, joints = artists['links'], artists['joints']
+        for i in range(joint_idx, len(links)):
+            links[i].set_data(positions[i:i + 2, 0], positions[i:i + 2, 1])
+        for i in range(joint_idx + 1, len(joints)):
+            joints[i].center = (positions[i, 0], positions[i, 1])
+        x, y = positions[-1]
+        artists['end_effector'].center = (x, y)
+        artists['label'].set_position((x + 0.05, y + 0.05))
+        self.canvas.draw_idle()
+    
+    def view_positions(self):
+        """Joint positions of the drawn configuration in the view plane, shape (dof + 1, 2)"""
+        return self.kinematics.joint_positions()[0][:, VIEW_PLANE_AXES]
+    
+    def start_playback(self, robot_name, show_limits=True):
+        """Set up the axes and artists used for trajectory playback"""
+        self.figure.clear()
+        self.robot_artists = None
+        
+        self.figure.set_size_inches(8, 6)
+        ax = self.figure.add_subplot(111, aspect='equal')
+        
+        colors = ['#2c3e50', '#34495e', '#7f8c8d', '#95a5a6', '#bdc3c7', '#ecf0f1']
+        joint_radii = [0.05, 0.04, 0.03, 0.02, 0.02, 0.02]
+        
+        dof = get_robot_by_name(robot_name).dof
+        
+        links = [ax.plot([], [], color=colors[i % len(colors)], linewidth=8,
+                         solid_capstyle='round', alpha=0.8)[0]
+                 for i in range(dof)]
+        joints = [ax.add_patch(Circle((0, 0), joint_radii[i % len(joint_radii)], facecolor='#e74c3c',
+                                      edgecolor='#c0392b', linewidth=2))
+                  for i in range(dof)]
+        end_effector = ax.add_patch(Circle((0, 0), 0.03, facecolor='#27ae60',
+                                           edgecolor='#229954', linewidth=2))
+        path, = ax.plot([], [], color='#27ae60', linewidth=1, alpha=0.5)
+        
+        if show_limits:
+            self.draw_workspace_limits(ax, robot_name)
+        
+        ax.set_xlim(-1.5, 1.5)
+        ax.set_ylim(-1.5, 1.5)
+        ax.set_title(f'KUKA {robot_name} - Trajectory Playback', fontsize=14, fontweight='bold', color='#000000')
+        ax.set_xlabel('X (m)', color='#000000')
+        ax.set_ylabel('Y (m)', color='#000000')
+        ax.grid(True, alpha=0.3, color='#696969')
+        ax.set_facecolor('#ffffff')
+        ax.tick_params(colors='#000000')
+        
+        self.figure.tight_layout()
+        self.playback_artists = {
+            'robot_name': robot_name,
+            'links': links,
+            'joints': joints,
+            'end_effector': end_effector,
+            'path': path
+        }
+    
+    def draw_playback_frame(self, positions, path=None):
+        """
+        Draw one precomputed playback frame
+        
+        Args:
+            positions: Joint positions of shape (dof + 1, 2), tool flange last
+            path: Optional end-effector path so far, shape (M, 2)
+        """
+        artists = self.playback_artists
+        if artists is None:
+            return
+        
+        for i, (link, joint) in enumerate(zip(artists['links'], artists['joints'])):
+            link.set_data(positions[i:i + 2, 0], positions[i:i + 2, 1])
+            joint.center = (positions[i, 0], positions[i, 1])
+        artists['end_effector'].center = (positions[-1, 0], positions[-1, 1])
+        if path is not None:
+            artists['path'].set_data(path[:, 0], path[:, 1])
+        
+        self.canvas.draw_idle()
+    
     def calculate_robot_positions(self, joint_angles, link_lengths):
         """Calculate positions of robot joints"""
         positions = [(0, 0)]  # Base position
@@ -63,8 +175,9 @@ class RobotVisualizer:
         return positions
     
     def draw_robot_links(self, ax, positions, link_lengths, joint_radii):
-        """Draw robot links and joints"""
+        """Draw robot links and joints, returning their artists"""
         colors = ['#2c3e50', '#34495e', '#7f8c8d', '#95a5a6', '#bdc3c7', '#ecf0f1']
+        artists = {'links': [], 'joints': []}
         
         # Draw links
         for i in range(len(positions) - 1):
@@ -72,24 +185,26 @@ class RobotVisualizer:
             x2, y2 = positions[i + 1]
             
             # Draw link
-            ax.plot([x1, x2], [y1, y2], color=colors[i % len(colors)], 
-                   linewidth=8, solid_capstyle='round', alpha=0.8)
+            link, = ax.plot([x1, x2], [y1, y2], color=colors[i % len(colors)], 
+                           linewidth=8, solid_capstyle='round', alpha=0.8)
+            artists['links'].append(link)
             
             # Draw joint
-            joint = Circle((x1, y1), joint_radii[i], facecolor='#e74c3c', 
+            joint = Circle((x1, y1), joint_radii[i % len(joint_radii)], facecolor='#e74c3c', 
                           edgecolor='#c0392b', linewidth=2)
-            ax.add_patch(joint)
+            artists['joints'].append(ax.add_patch(joint))
         
         # Draw end-effector
-        if positions:
+        if len(positions):
             x, y = positions[-1]
             end_effector = Circle((x, y), 0.03, facecolor='#27ae60', 
                                 edgecolor='#229954', linewidth=2)
-            ax.add_patch(end_effector)
+            artists['end_effector'] = ax.add_patch(end_effector)
             
             # Add end-effector label
-            ax.text(x + 0.05, y + 0.05, 'EE', fontsize=10, fontweight='bold', 
-                   color='#27ae60')
+            artists['label'] = ax.text(x + 0.05, y + 0.05, 'EE', fontsize=10, fontweight='bold', 
+                                       color='#27ae60')
+        return artists
     
     def draw_workspace_limits(self, ax, robot_name):
         """Draw workspace limits for different KUKA robots"""
@@ -111,6 +226,18 @@ class RobotVisualizer:
         ax.text(0, reach + 0.1, f'Workspace\n(Reach: {reach}m)', 
                ha='center', va='bottom', fontsize=10, 
                bbox=dict(boxstyle="round,pad=0.3", facecolor='#3498db', alpha=0.3))
+        
+        if self.reachability_index is not None:
+            self.draw_reachable_workspace(ax, self.reachability_index)
+    
+    def draw_reachable_workspace(self, ax, index, resolution=0.02):
+        """Shade the tool positions reached by the sampled configurations of a configuration index"""
+        centers = index.occupied_cell_centers()
+        # Robot view plane: base x -> x, base z (up) -> y
+        cells = np.unique(np.floor(centers[:, [0, 2]] / resolution).astype(np.int64), axis=0)
+        points = (cells + 0.5) * resolution
+        ax.scatter(points[:, 0], points[:, 1], s=2, marker='s', color='#3498db',
+                   alpha=0.15, linewidths=0, zorder=0, label='Reachable (sampled)')
     
     def draw_safety_warning(self, ax, message):
         """Draw safety warning on the plot"""
@@ -131,15 +258,7 @@ class RobotVisualizer:
     
     def draw_torque_limits(self, ax, robot_name, calculated_torques):
         """Draw torque limits and warnings"""
-        # KUKA robot torque limits (approximate)
-        limits = {
-            'KR3 R540': [50, 50, 20, 20, 10, 10],
-            'KR6 R900': [100, 100, 50, 50, 20, 20],
-            'KR10 R1100': [150, 150, 80, 80, 30, 30],
-            'KR16 R1610': [200, 200, 120, 120, 50, 50]
-        }
-        
-        robot_limits = limits.get(robot_name, [100] * 6)
+        robot_limits = get_robot_torque_limits(robot_name)
         
         # Check for limit violations
         violations = []
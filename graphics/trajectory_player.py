@@ -0,0 +1,115 @@
+# graphics/trajectory_player.py
+
+import time as clock
+import numpy as np
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+class TrajectoryPlayer(QObject):
+    """
+    Wall-clock driven playback of a precomputed trajectory.
+
+    The timer fires at a fixed frame rate; on every tick the trajectory time
+    is derived from elapsed wall-clock time and play speed, and only the
+    frame for that instant is emitted. Frames that fall between two ticks
+    are dropped, so playback never lags behind real time.
+    """
+
+    frame_changed = pyqtSignal(int, float)  # frame index, trajectory time (s)
+    playing_changed = pyqtSignal(bool)
+
+    def __init__(self, fps: int = 30, parent=None):
+        super().__init__(parent)
+        self.timer = QTimer(self)
+        self.timer.setInterval(int(1000 / fps))
+        self.timer.timeout.connect(self._on_tick)
+
+        self.time = np.zeros(0)
+        self.frames = None
+        self.speed = 1.0
+        self.current_index = -1
+        self.current_time = 0.0
+
+        # Wall-clock anchor of the running playback
+        self._clock_start = 0.0
+        self._time_start = 0.0
+
+    def load(self, time, frames):
+        """
+        Load a trajectory for playback
+
+        Args:
+            time: Trajectory time stamps in seconds, shape (N,)
+            frames: Precomputed per-frame data indexed by time step, e.g.
+                joint positions of shape (N, dof + 1, 2)
+        """
+        self.pause()
+        self.time = np.asarray(time, dtype=float)
+        self.frames = frames
+        self.current_index = -1
+        self.seek(self.start_time)
+
+    @property
+    def start_time(self) -> float:
+        return float(self.time[0]) if len(self.time) else 0.0
+
+    @property
+    def end_time(self) -> float:
+        return float(self.time[-1]) if len(self.time) else 0.0
+
+    def is_playing(self) -> bool:
+        return self.timer.isActive()
+
+    def play(self):
+        """Start playback from the current time, restarting at the end"""
+        if not len(self.time):
+            return
+        if self.current_time >= self.end_time:
+            self.seek(self.start_time)
+        self._anchor()
+        self.timer.start()
+        self.playing_changed.emit(True)
+
+    def pause(self):
+        """Stop playback at the current time"""
+        if self.timer.isActive():
+            self.timer.stop()
+            self.playing_changed.emit(False)
+
+    def toggle(self):
+        if self.is_playing():
+            self.pause()
+        else:
+            self.play()
+
+    def set_speed(self, speed: float):
+        """Set play speed as a multiple of real time"""
+        self.speed = max(float(speed), 0.0)
+        self._anchor()
+
+    def seek(self, t: float):
+        """Jump to trajectory time t (seconds)"""
+        if not len(self.time):
+            return
+        self.current_time = float(np.clip(t, self.start_time, self.end_time))
+        self._anchor()
+        self._show(self.current_time)
+
+    def _anchor(self):
+        self._clock_start = clock.perf_counter()
+        self._time_start = self.current_time
+
+    def _on_tick(self):
+        elapsed = clock.perf_counter() - self._clock_start
+        t = self._time_start + elapsed * self.speed
+        if t >= self.end_time:
+            t = self.end_time
+            self.pause()
+        self.current_time = t
+        self._show(t)
+
+    def _show(self, t: float):
+        index = int(np.searchsorted(self.time, t, side='right')) - 1
+        index = min(max(index, 0), len(self.time) - 1)
+        if index != self.current_index:
+            self.current_index = index
+            self.frame_changed.emit(index, float(self.time[index]))
@@ -1,5 +1,8 @@
 # logic/inertia.py
 
+from utils.profiling import profiled
+
+@profiled
 def calculate_inertia_rod(mass: float, length: float) -> float:
     """
     Moment of inertia for a rod rotating around one end.
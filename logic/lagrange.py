@@ -1,6 +1,8 @@
 import numpy as np
 from sympy import symbols, Matrix, diff, simplify, sin, cos, Function
+from utils.profiling import profiled
 
+@profiled
 def calculate_lagrange():
     # Zaman ve değişkenler
     t = symbols('t')
@@ -55,6 +57,7 @@ def calculate_lagrange():
 
     return tau
 
+@profiled
 def calculate_lagrange_numerical(m1=1.0, m2=1.0, l1=1.0, l2=1.0, g=9.81):
     """
     Calculate Lagrange equations with numerical values for plotting
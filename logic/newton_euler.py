@@ -1,7 +1,9 @@
 # logic/newton_euler.py
 
 from logic.inertia import calculate_inertia_rod
+from utils.profiling import profiled
 
+@profiled
 def calculate_newton_euler_torque(mass: float, length: float, angular_acceleration: float) -> float:
     """
     Calculates torque using Newton-Euler formula: τ = I * α
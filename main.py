@@ -1,11 +1,37 @@
 # main.py
 
 import sys
+import argparse
 from PyQt5.QtWidgets import QApplication
 from ui.main_window import MainWindow
+from utils.profiling import enable_profiling, export_profile_jsonl, export_profile_flamegraph
+from utils.precision import SUPPORTED_DTYPES, set_compute_dtype
+from robots.kuka_kernels import get_available_backends, set_kernel_backend
 
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
+    parser = argparse.ArgumentParser(description="KUKA Dynamics Studio")
+    parser.add_argument('--profile', action='store_true', help="Enable hot-path profiling at start-up")
+    parser.add_argument('--profile-jsonl', help="Write profiling statistics as JSONL on exit")
+    parser.add_argument('--profile-flamegraph', help="Write collapsed profiling stacks on exit")
+    parser.add_argument('--compute-dtype', choices=list(SUPPORTED_DTYPES), default='float64',
+                        help="Floating point type of the batch dynamics, kinematics and export paths")
+    parser.add_argument('--kernel-backend', choices=['auto'] + get_available_backends(), default='auto',
+                        help="Dynamics kernel backend (numba is used automatically when installed)")
+    args, qt_args = parser.parse_known_args()
+    
+    set_compute_dtype(args.compute_dtype)
+    set_kernel_backend(args.kernel_backend)
+    
+    if args.profile or args.profile_jsonl or args.profile_flamegraph:
+        enable_profiling()
+    
+    app = QApplication(sys.argv[:1] + qt_args)
     window = MainWindow()
     window.show()
-    sys.exit(app.exec_())
+    exit_code = app.exec_()
+    
+    if args.profile_jsonl:
+        export_profile_jsonl(args.profile_jsonl)
+    if args.profile_flamegraph:
+        export_profile_flamegraph(args.profile_flamegraph)
+    sys.exit(exit_code)
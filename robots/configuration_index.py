@@ -0,0 +1,396 @@
+# robots/configuration_index.py
+"""
+Precomputed spatial index over sampled joint configurations.
+
+Random joint configurations of a robot are pushed through the 3D forward
+kinematics once; their tool positions are bucketed on a uniform grid and
+stored sorted by cell, with a CSR-style cell_start array pointing at the
+first sample of every cell. A lookup touches only the cells around the
+query point, so nearest-configuration and within-radius queries take
+microseconds for millions of samples. The arrays are saved as .npy files
+and memory-mapped at load, so opening an index costs next to nothing.
+
+Build indices ahead of time (from the repository root):
+    python -m robots.configuration_index --robots "KR6 R900" --samples 1000000
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+from .kuka_robots import KukaRobot, get_robot_by_name, get_available_robots
+from .rigid_body import build_rigid_body_model, tool_pose
+from .model_registry import get_model_registry, model_slug
+
+INDEX_VERSION = 1
+DEFAULT_SAMPLES = 1000000
+# Average number of samples per occupied cell the cell size aims for
+SAMPLES_PER_CELL = 8
+_CHUNK = 100000
+# Far-point fallback: occupied cells are searched through a grid this much
+# coarser, or directly when there are at most BRUTE_FORCE_CELLS of them
+COARSE_FACTOR = 8
+BRUTE_FORCE_CELLS = 4096
+
+def _ranges(starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """Concatenation of arange(start, end) for every pair"""
+    counts = ends - starts
+    total = int(counts.sum())
+    if total == 0:
+        return np.empty(0, dtype=np.int64)
+    # Offset of every element within its range, added to its range start
+    offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    return np.repeat(starts, counts) + offsets
+
+def model_fingerprint(robot: KukaRobot) -> str:
+    """Hash of the kinematic model; an index is stale when it changes"""
+    model = build_rigid_body_model(robot)
+    digest = hashlib.sha1()
+    digest.update(','.join(model.joint_types).encode())
+    for array in (model.axes, model.origin_rotations, model.origin_positions, model.tool_xyz):
+        digest.update(np.ascontiguousarray(array, dtype=np.float64).tobytes())
+    return digest.hexdigest()
+
+class ConfigurationIndex:
+    """Grid hash from tool positions to sampled joint configurations"""
+
+    def __init__(self, joint_angles: np.ndarray, positions: np.ndarray, cell_start: np.ndarray,
+                 origin: np.ndarray, cell_size: float, shape: Tuple[int, int, int], meta: Optional[Dict] = None):
+        self.joint_angles = joint_angles  # (M, dof), sorted by cell
+        self.positions = positions  # (M, 3), sorted by cell
+        self.cell_start = cell_start  # (cells + 1,)
+        self.origin = np.asarray(origin, dtype=np.float64)
+        self.cell_size = float(cell_size)
+        self.shape = tuple(int(n) for n in shape)
+        self.meta = meta or {}
+        self._strides = np.array([self.shape[1] * self.shape[2], self.shape[2], 1], dtype=np.int64)
+        self._cubes: Dict[int, np.ndarray] = {}
+        self._occupied = None
+        self._occupied_centers = None
+        self._coarse = None
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    @classmethod
+    def build(cls, joint_angles: np.ndarray, positions: np.ndarray, cell_size: Optional[float] = None,
+              meta: Optional[Dict] = None) -> 'ConfigurationIndex':
+        """
+        Index configurations by their tool positions
+
+        Args:
+            joint_angles: Joint angles, shape (M, dof)
+            positions: Tool positions, shape (M, 3)
+            cell_size: Grid cell size in m; by default sized for SAMPLES_PER_CELL
+            meta: Extra metadata saved with the index
+        """
+        positions = np.asarray(positions)
+        low = positions.min(axis=0).astype(np.float64)
+        extent = positions.max(axis=0) - low
+        if cell_size is None:
+            cell_size = cls._fit_cell_size(positions, low, extent)
+        shape = tuple(int(n) for n in np.floor(extent / cell_size).astype(np.int64) + 1)
+
+        index = cls(None, None, None, low, cell_size, shape, meta)
+        cells = index._cell_ids(index._cell_coords(positions))
+        order = np.argsort(cells, kind='stable')
+        counts = np.bincount(cells, minlength=int(np.prod(shape)))
+        index.joint_angles = np.ascontiguousarray(np.asarray(joint_angles)[order])
+        index.positions = np.ascontiguousarray(positions[order])
+        index.cell_start = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        return index
+
+    @staticmethod
+    def _fit_cell_size(positions: np.ndarray, low: np.ndarray, extent: np.ndarray) -> float:
+        """
+        Cell size at which a query sees about SAMPLES_PER_CELL samples per
+        cell. Sampled workspaces are far from uniform, so the estimate from
+        the bounding box is refined on the occupancy a random sample sees
+        (sum of squared cell counts over sample count).
+        """
+        # Only axes the tool actually moves along count (planar robots are flat)
+        moving = extent > 1e-9
+        dims = max(int(moving.sum()), 1)
+        volume = float(np.prod(extent[moving])) if moving.any() else 1.0
+        cell_size = (volume * SAMPLES_PER_CELL / max(len(positions), 1)) ** (1.0 / dims)
+        subset = positions[:200000]
+        for _ in range(3):
+            coords = np.floor((subset - low) / cell_size).astype(np.int64)
+            _, counts = np.unique(coords, axis=0, return_counts=True)
+            seen = (counts.astype(np.float64)**2).sum() / len(subset) * len(positions) / len(subset)
+            cell_size *= (SAMPLES_PER_CELL / seen) ** (1.0 / dims)
+        return float(cell_size)
+
+    def _cell_coords(self, points: np.ndarray) -> np.ndarray:
+        coords = np.floor((np.asarray(points, dtype=np.float64) - self.origin) / self.cell_size).astype(np.int64)
+        return np.clip(coords, 0, np.array(self.shape) - 1)
+
+    def _cell_ids(self, coords: np.ndarray) -> np.ndarray:
+        return coords @ self._strides
+
+    def _cube(self, ring: int) -> np.ndarray:
+        """Cell offsets within Chebyshev distance ring (along the axes the grid extends in)"""
+        cube = self._cubes.get(ring)
+        if cube is None:
+            axes = [np.arange(-ring, ring + 1) if n > 1 else np.zeros(1, dtype=np.int64) for n in self.shape]
+            cube = self._cubes[ring] = np.stack(np.meshgrid(*axes, indexing='ij'), axis=-1).reshape(-1, 3)
+        return cube
+
+    def _outside_distance(self, points: np.ndarray, centers: np.ndarray, ring: int) -> np.ndarray:
+        """
+        Lower bound on the distance from each point to any cell more than
+        ring cells from its center cell (inf when there is no such cell)
+        """
+        bound = np.full(len(points), np.inf)
+        for axis in range(3):
+            below = centers[:, axis] - ring - 1 >= 0
+            face = self.origin[axis] + (centers[:, axis] - ring) * self.cell_size
+            bound = np.where(below, np.minimum(bound, points[:, axis] - face), bound)
+            above = centers[:, axis] + ring + 1 < self.shape[axis]
+            face = self.origin[axis] + (centers[:, axis] + ring + 1) * self.cell_size
+            bound = np.where(above, np.minimum(bound, face - points[:, axis]), bound)
+        return bound
+
+    def _cell_ranges(self, cells: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Sample indices of the given cells and the position of their cell in cells"""
+        starts = self.cell_start[cells]
+        counts = self.cell_start[cells + 1] - starts
+        return _ranges(starts, starts + counts), np.repeat(np.arange(len(cells)), counts)
+
+    def _coarse_level(self) -> 'ConfigurationIndex':
+        """Index over the occupied cell centers on a COARSE_FACTOR times coarser grid (built on first use)"""
+        if self._coarse is None:
+            centers = self.occupied_cell_centers()
+            self._coarse = ConfigurationIndex.build(self._occupied[:, None], centers,
+                                                    cell_size=self.cell_size * COARSE_FACTOR)
+        return self._coarse
+
+    def _nearest_by_cells(self, point: np.ndarray) -> Tuple[int, float]:
+        """
+        Exact nearest sample for points far from any sample: only cells
+        whose center is within one cell diagonal of the closest occupied
+        cell center can hold it. The closest centers come from a coarser
+        index over the occupied cells, or by brute force when there are few.
+        """
+        centers = self.occupied_cell_centers()
+        if not len(centers):
+            return -1, np.inf
+        diagonal = self.cell_size * np.sqrt(3.0)
+        if len(centers) <= BRUTE_FORCE_CELLS:
+            center_distances = np.linalg.norm(centers - point, axis=1)
+            cells = self._occupied[center_distances <= center_distances.min() + diagonal]
+        else:
+            coarse = self._coarse_level()
+            _, closest = coarse.nearest(point)
+            cells = coarse.joint_angles[coarse.within_radius(point, closest + diagonal), 0]
+        candidates, _ = self._cell_ranges(cells)
+        distances = np.linalg.norm(self.positions[candidates] - point, axis=1)
+        k = int(np.argmin(distances))
+        return int(candidates[k]), float(distances[k])
+
+    def _nearest_in_cube(self, points: np.ndarray, centers: np.ndarray,
+                         ring: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Closest sample per point among the cells within ring of its center cell"""
+        n = len(points)
+        cube = self._cube(ring)
+        coords = (centers[:, None, :] + cube[None]).reshape(-1, 3)
+        owners = np.repeat(np.arange(n), len(cube))
+        inside = np.all((coords >= 0) & (coords < np.array(self.shape)), axis=1)
+        candidates, slot = self._cell_ranges(self._cell_ids(coords[inside]))
+        # Candidates stay grouped by point, in point order
+        owners = owners[inside][slot]
+        distances = np.linalg.norm(self.positions[candidates] - points[owners], axis=1)
+
+        indices = np.full(n, -1, dtype=np.int64)
+        best = np.full(n, np.inf)
+        if candidates.size:
+            found, group_start = np.unique(owners, return_index=True)
+            best[found] = np.minimum.reduceat(distances, group_start)
+            is_best = distances == best[owners]
+            winners, first = np.unique(owners[is_best], return_index=True)
+            indices[winners] = candidates[is_best][first]
+        return indices, best
+
+    def nearest_batch(self, points, max_cube_cells: int = 4096) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Nearest sample (by tool position) for every row of points (M, 3)
+
+        All points are searched at once in the cells around them, doubling
+        the neighbourhood for the points it cannot settle; points still
+        unsettled once a neighbourhood would exceed max_cube_cells (empty
+        regions, points far outside the workspace) fall back to a search
+        over the occupied cells.
+
+        Returns:
+            (sample indices, distances in m); -1 and inf for an empty index
+        """
+        points = np.atleast_2d(np.asarray(points, dtype=np.float64))
+        centers = self._cell_coords(points)
+        indices = np.full(len(points), -1, dtype=np.int64)
+        best = np.full(len(points), np.inf)
+        pending = np.arange(len(points))
+        dims = max(sum(n > 1 for n in self.shape), 1)
+        ring = 1
+        while pending.size and (2 * ring + 1)**dims <= max_cube_cells:
+            found, distances = self._nearest_in_cube(points[pending], centers[pending], ring)
+            indices[pending] = found
+            best[pending] = distances
+            # Settled once nothing outside the searched cells can be closer
+            pending = pending[distances > self._outside_distance(points[pending], centers[pending], ring)]
+            ring *= 2
+        for i in pending:
+            indices[i], best[i] = self._nearest_by_cells(points[i])
+        return indices, best
+
+    def nearest(self, point) -> Tuple[int, float]:
+        """
+        Sample whose tool position is closest to point
+
+        Returns:
+            (sample index, distance in m); (-1, inf) for an empty index
+        """
+        indices, distances = self.nearest_batch(np.asarray(point, dtype=np.float64)[None])
+        return int(indices[0]), float(distances[0])
+
+    def nearest_configuration(self, point) -> Tuple[np.ndarray, float]:
+        """Joint angles of the sample closest to point and its distance"""
+        index, distance = self.nearest(point)
+        return np.array(self.joint_angles[index]), distance
+
+    def within_radius(self, point, radius: float) -> np.ndarray:
+        """Indices of the samples whose tool position lies within radius of point"""
+        point = np.asarray(point, dtype=np.float64)
+        low = self._cell_coords((point - radius)[None])[0]
+        high = self._cell_coords((point + radius)[None])[0]
+        axes = [np.arange(lo, hi + 1) for lo, hi in zip(low, high)]
+        coords = np.stack(np.meshgrid(*axes, indexing='ij'), axis=-1).reshape(-1, 3)
+        candidates, _ = self._cell_ranges(self._cell_ids(coords))
+        distances = np.linalg.norm(self.positions[candidates] - point, axis=1)
+        return candidates[distances <= radius]
+
+    def is_reachable(self, points, tolerance: Optional[float] = None) -> np.ndarray:
+        """
+        Whether a sampled configuration reaches each point within tolerance
+        (one cell size by default); only the cells within tolerance are read
+        """
+        tolerance = self.cell_size if tolerance is None else tolerance
+        points = np.atleast_2d(np.asarray(points, dtype=np.float64))
+        ring = max(int(np.ceil(tolerance / self.cell_size)), 1)
+        _, distances = self._nearest_in_cube(points, self._cell_coords(points), ring)
+        return distances <= tolerance
+
+    def occupied_cell_centers(self) -> np.ndarray:
+        """Centers (K, 3) of the grid cells holding at least one sample"""
+        if self._occupied is None:
+            self._occupied = np.nonzero(np.diff(self.cell_start))[0]
+            coords = np.stack(np.unravel_index(self._occupied, self.shape), axis=1)
+            self._occupied_centers = self.origin + (coords + 0.5) * self.cell_size
+        return self._occupied_centers
+
+    def save(self, directory: str) -> str:
+        """Write the index as .npy arrays plus meta.json (meta last, so partial writes stay invalid)"""
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, 'joint_angles.npy'), self.joint_angles)
+        np.save(os.path.join(directory, 'positions.npy'), self.positions)
+        np.save(os.path.join(directory, 'cell_start.npy'), self.cell_start)
+        meta = dict(self.meta, version=INDEX_VERSION, origin=self.origin.tolist(),
+                    cell_size=self.cell_size, shape=list(self.shape), samples=len(self))
+        temporary = os.path.join(directory, f'meta.json.{os.getpid()}.tmp')
+        with open(temporary, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2)
+        os.replace(temporary, os.path.join(directory, 'meta.json'))
+        return directory
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> 'ConfigurationIndex':
+        """Open a saved index, memory-mapping its arrays by default"""
+        with open(os.path.join(directory, 'meta.json'), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta.get('version') != INDEX_VERSION:
+            raise ValueError(f"{directory} has index version {meta.get('version')}, expected {INDEX_VERSION}")
+        mode = 'r' if mmap else None
+        # Plain ndarray views of the maps skip np.memmap's per-slice overhead
+        arrays = [np.load(os.path.join(directory, f'{name}.npy'), mmap_mode=mode).view(np.ndarray)
+                  for name in ('joint_angles', 'positions', 'cell_start')]
+        return cls(*arrays, meta['origin'], meta['cell_size'], meta['shape'], meta)
+
+def sample_configurations(robot_name: str, samples: int = DEFAULT_SAMPLES,
+                          seed: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Uniformly random joint configurations in [-pi, pi] and their tool positions
+
+    Returns:
+        (joint angles (samples, dof) float32, tool positions (samples, 3) float32)
+    """
+    robot = get_robot_by_name(robot_name)
+    if robot is None:
+        raise ValueError(f"Robot {robot_name} not found")
+
+    model = build_rigid_body_model(robot)
+    rng = np.random.default_rng(seed)
+    joint_angles = rng.uniform(-np.pi, np.pi, (samples, robot.dof)).astype(np.float32)
+    positions = np.empty((samples, 3), dtype=np.float32)
+    for start in range(0, samples, _CHUNK):
+        chunk = joint_angles[start:start + _CHUNK].astype(np.float64)
+        positions[start:start + _CHUNK] = tool_pose(model, chunk)[1]
+    return joint_angles, positions
+
+def default_index_dir(robot_name: str) -> str:
+    return os.path.join(get_model_registry().cache_dir, 'configurations', model_slug(robot_name))
+
+def get_configuration_index(robot_name: str, samples: int = DEFAULT_SAMPLES, seed: int = 0,
+                            directory: Optional[str] = None, build: bool = True) -> Optional[ConfigurationIndex]:
+    """
+    Load the configuration index of a robot, building and saving it first
+    if it is missing or was built for another model, sample count or seed
+
+    Args:
+        robot_name: Name of the KUKA robot model
+        samples: Number of sampled configurations
+        seed: Sampling seed
+        directory: Index directory, defaults to the model cache
+        build: Build a missing index; otherwise return None
+
+    Returns:
+        Memory-mapped ConfigurationIndex, or None
+    """
+    robot = get_robot_by_name(robot_name)
+    if robot is None:
+        raise ValueError(f"Robot {robot_name} not found")
+
+    directory = directory or default_index_dir(robot_name)
+    fingerprint = model_fingerprint(robot)
+    try:
+        index = ConfigurationIndex.load(directory)
+        meta = index.meta
+        if meta.get('fingerprint') == fingerprint and meta.get('samples') == samples and meta.get('seed') == seed:
+            return index
+    except (OSError, ValueError, KeyError):
+        pass
+    if not build:
+        return None
+
+    joint_angles, positions = sample_configurations(robot_name, samples, seed)
+    index = ConfigurationIndex.build(joint_angles, positions,
+                                     meta={'robot': robot_name, 'seed': seed, 'fingerprint': fingerprint})
+    index.save(directory)
+    return ConfigurationIndex.load(directory)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Build configuration indices")
+    parser.add_argument('--robots', nargs='*', default=get_available_robots())
+    parser.add_argument('--samples', type=int, default=DEFAULT_SAMPLES)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    for robot_name in args.robots:
+        index = get_configuration_index(robot_name, args.samples, args.seed)
+        print(f"{robot_name}: {len(index)} samples, cell {index.cell_size * 1e3:.1f} mm, "
+              f"grid {'x'.join(str(n) for n in index.shape)} -> {default_index_dir(robot_name)}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,281 @@
+# robots/consistency.py
+"""
+Large-scale consistency check between two dynamics formulations.
+
+Random joint states (positions inside the joint limits, velocities up to
+the robot speed, bounded accelerations) are drawn in chunks; both
+formulations evaluate every chunk in one vectorized call and the
+per-joint discrepancies are folded into running statistics: maximum,
+mean, RMS, a logarithmic histogram for percentiles, the number of
+samples outside atol + rtol·|τ_ref| and the worst cases.
+
+Chunk k is drawn from np.random.default_rng([seed, k]), so a run is
+reproducible for any chunk order and number of workers, and every worst
+case can be regenerated with sample_states from its sample index.
+
+Formulations:
+    newton_euler             recursive Newton-Euler over the rigid-body model
+    lagrange                 Euler-Lagrange equations (link Jacobians, energy gradients)
+    joint_space              M q̈ + C q̇ + G (composite rigid body algorithm + bias passes)
+    newton_euler_simplified  per-joint model (calculate_kuka_newton_euler_simplified_batch)
+    lagrange_simplified      per-joint model (calculate_kuka_lagrange_simplified_batch)
+
+Usage (from the repository root):
+    python -m robots.consistency --robots "KR6 R900" --samples 1000000
+    python -m robots.consistency --reference newton_euler_simplified --candidate lagrange_simplified
+"""
+
+import argparse
+import os
+import sys
+import numpy as np
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+from .kuka_robots import get_available_robots, get_robot_by_name
+from .kuka_dynamics import (calculate_kuka_rigid_body_torques_batch, calculate_kuka_joint_space_dynamics_batch,
+                            calculate_kuka_newton_euler_simplified_batch,
+                            calculate_kuka_lagrange_simplified_batch)
+from .rigid_body import build_rigid_body_model, lagrangian_torques
+from .model_registry import model_process_pool
+from utils.precision import resolve_dtype, as_compute_array
+
+CHUNK_SIZE = 20000
+ACCELERATION_RANGE = 10.0  # rad/s², largest sampled |q̈|
+DEFAULT_SPEED = 2.0  # rad/s, for models without a max speed
+WORST_CASES = 10
+PERCENTILES = (50.0, 90.0, 99.0, 99.9, 99.99)
+# Histogram of |τ_candidate - τ_reference|: ten bins per decade from 1e-16
+# to 1e6 Nm, plus an underflow and an overflow bin
+HISTOGRAM_EDGES = np.logspace(-16, 6, 221)
+
+Formulation = Callable[[str, np.ndarray, np.ndarray, np.ndarray, np.dtype], np.ndarray]
+
+def _lagrange(robot_name, q, qd, qdd, dtype):
+    model = build_rigid_body_model(get_robot_by_name(robot_name), dtype)
+    return lagrangian_torques(model, as_compute_array(q, dtype), as_compute_array(qd, dtype),
+                              as_compute_array(qdd, dtype))
+
+def _joint_space(robot_name, q, qd, qdd, dtype):
+    M, coriolis, G = calculate_kuka_joint_space_dynamics_batch(robot_name, q, qd, dtype=dtype)
+    return np.einsum('nij,nj->ni', M, as_compute_array(qdd, dtype)) + coriolis + G
+
+FORMULATIONS: Dict[str, Formulation] = {
+    'newton_euler': lambda robot_name, q, qd, qdd, dtype:
+        calculate_kuka_rigid_body_torques_batch(robot_name, q, qd, qdd, dtype=dtype),
+    'lagrange': _lagrange,
+    'joint_space': _joint_space,
+    'newton_euler_simplified': lambda robot_name, q, qd, qdd, dtype:
+        calculate_kuka_newton_euler_simplified_batch(robot_name, q, qd, qdd, dtype=dtype),
+    'lagrange_simplified': lambda robot_name, q, qd, qdd, dtype:
+        calculate_kuka_lagrange_simplified_batch(robot_name, q, qd, qdd, dtype=dtype)
+}
+
+def register_formulation(name: str, function: Formulation):
+    """
+    Make an inverse dynamics implementation available to the checker
+
+    Args:
+        name: Formulation name
+        function: f(robot_name, q, qd, qdd, dtype) -> torques (N, dof); register it
+            when its module is imported so that worker processes see it too
+    """
+    FORMULATIONS[name] = function
+
+@dataclass
+class WorstCase:
+    """One sampled state with a large discrepancy"""
+    sample: int  # global sample index, see sample_states
+    joint: int
+    discrepancy: float  # |τ_candidate - τ_reference| at the joint, Nm
+    score: float  # discrepancy / (atol + rtol |τ_reference|)
+    reference: np.ndarray  # (dof,) Nm
+    candidate: np.ndarray  # (dof,) Nm
+    q: np.ndarray
+    qd: np.ndarray
+    qdd: np.ndarray
+
+@dataclass
+class ConsistencyReport:
+    """Discrepancy distribution of candidate against reference over the sampled states"""
+    robot_name: str
+    reference: str
+    candidate: str
+    samples: int
+    seed: int
+    atol: float
+    rtol: float
+    max_abs: np.ndarray  # (dof,) Nm
+    mean_abs: np.ndarray  # (dof,) Nm
+    rms: np.ndarray  # (dof,) Nm
+    percentiles: Dict[float, np.ndarray]  # percentile -> (dof,) Nm, histogram bin upper edges
+    violations: np.ndarray  # (dof,) samples outside atol + rtol |τ_reference|
+    worst: List[WorstCase] = field(default_factory=list)
+
+    @property
+    def consistent(self) -> bool:
+        return not self.violations.any()
+
+def sample_states(robot_name: str, chunk: int, size: int = CHUNK_SIZE, seed: int = 0):
+    """
+    Joint states of one chunk: sample i of a run is row i % size of chunk i // size
+
+    Returns:
+        (q, qd, qdd), each of shape (size, dof), float64
+    """
+    robot = get_robot_by_name(robot_name)
+    if robot is None:
+        raise ValueError(f"Robot {robot_name} not found")
+    limits = robot.get_joint_limits()
+    speed = robot.max_speed or DEFAULT_SPEED
+    rng = np.random.default_rng([seed, chunk])
+    q = rng.uniform(limits[:, 0], limits[:, 1], (size, robot.dof))
+    qd = rng.uniform(-speed, speed, (size, robot.dof))
+    qdd = rng.uniform(-ACCELERATION_RANGE, ACCELERATION_RANGE, (size, robot.dof))
+    return q, qd, qdd
+
+def _check_chunk(args) -> Dict:
+    """Partial statistics of one chunk"""
+    robot_name, reference, candidate, chunk, size, seed, atol, rtol, worst, dtype = args
+    q, qd, qdd = sample_states(robot_name, chunk, size, seed)
+    tau_ref = np.asarray(FORMULATIONS[reference](robot_name, q, qd, qdd, np.float64), dtype=np.float64)
+    tau = np.asarray(FORMULATIONS[candidate](robot_name, q, qd, qdd, dtype), dtype=np.float64)
+    error = np.abs(tau - tau_ref)
+    score = error / (atol + rtol * np.abs(tau_ref))
+
+    histogram = np.stack([np.bincount(np.searchsorted(HISTOGRAM_EDGES, error[:, j]),
+                                      minlength=len(HISTOGRAM_EDGES) + 1) for j in range(error.shape[1])])
+    row_score = score.max(axis=1)
+    rows = np.argsort(-row_score)[:worst]
+    cases = []
+    for row in rows:
+        joint = int(score[row].argmax())
+        cases.append(WorstCase(sample=chunk * size + int(row), joint=joint, discrepancy=float(error[row, joint]),
+                               score=float(row_score[row]), reference=tau_ref[row], candidate=tau[row],
+                               q=q[row], qd=qd[row], qdd=qdd[row]))
+    return {
+        'count': len(q),
+        'sum': error.sum(axis=0),
+        'sum_squares': np.square(error).sum(axis=0),
+        'max': error.max(axis=0),
+        'histogram': histogram,
+        'violations': (score > 1.0).sum(axis=0),
+        'worst': cases
+    }
+
+def _percentiles(histogram: np.ndarray, count: int) -> Dict[float, np.ndarray]:
+    """Upper bin edges at which the cumulative histogram reaches each percentile"""
+    upper = np.append(HISTOGRAM_EDGES, np.inf)
+    cumulative = np.cumsum(histogram, axis=1)
+    return {p: upper[np.argmax(cumulative >= np.ceil(p / 100.0 * count), axis=1)] for p in PERCENTILES}
+
+def check_consistency(robot_name: str, reference: str = 'newton_euler', candidate: str = 'lagrange',
+                      samples: int = 10**6, seed: int = 0, chunk_size: int = CHUNK_SIZE,
+                      atol: float = 1e-6, rtol: float = 1e-6, worst: int = WORST_CASES,
+                      workers: Optional[int] = None, dtype=None) -> ConsistencyReport:
+    """
+    Compare two formulations over random joint states
+
+    Args:
+        robot_name: Name of the KUKA robot model
+        reference: Reference formulation, evaluated in float64
+        candidate: Formulation under test
+        samples: Number of states, rounded up to whole chunks
+        seed: Seed of the state sampling
+        chunk_size: States per vectorized evaluation
+        atol, rtol: A joint torque is consistent when |τ_candidate - τ_reference| <= atol + rtol |τ_reference|
+        worst: Worst cases to keep
+        workers: Worker processes, one per CPU by default; 1 checks in this process
+        dtype: Compute dtype of the candidate, defaults to the global compute dtype
+
+    Returns:
+        ConsistencyReport
+    """
+    if get_robot_by_name(robot_name) is None:
+        raise ValueError(f"Robot {robot_name} not found")
+    for name in (reference, candidate):
+        if name not in FORMULATIONS:
+            raise ValueError(f"Unknown formulation {name}, expected one of {sorted(FORMULATIONS)}")
+    dtype = resolve_dtype(dtype)
+    chunks = max(1, -(-samples // chunk_size))
+    jobs = [(robot_name, reference, candidate, k, chunk_size, seed, atol, rtol, worst, dtype) for k in range(chunks)]
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or chunks <= 1:
+        parts = map(_check_chunk, jobs)
+        return _merge(robot_name, reference, candidate, seed, atol, rtol, worst, parts)
+    with model_process_pool(min(workers, chunks)) as pool:
+        return _merge(robot_name, reference, candidate, seed, atol, rtol, worst, pool.map(_check_chunk, jobs))
+
+def _merge(robot_name, reference, candidate, seed, atol, rtol, worst, parts) -> ConsistencyReport:
+    """Fold chunk statistics in chunk order"""
+    total = None
+    cases = []
+    for part in parts:
+        cases = sorted(cases + part.pop('worst'), key=lambda case: -case.score)[:worst]
+        if total is None:
+            total = part
+            continue
+        total['count'] += part['count']
+        for key in ('sum', 'sum_squares', 'histogram', 'violations'):
+            total[key] += part[key]
+        np.maximum(total['max'], part['max'], out=total['max'])
+    count = total['count']
+    return ConsistencyReport(
+        robot_name=robot_name,
+        reference=reference,
+        candidate=candidate,
+        samples=count,
+        seed=seed,
+        atol=atol,
+        rtol=rtol,
+        max_abs=total['max'],
+        mean_abs=total['sum'] / count,
+        rms=np.sqrt(total['sum_squares'] / count),
+        percentiles=_percentiles(total['histogram'], count),
+        violations=total['violations'],
+        worst=cases
+    )
+
+def format_report(report: ConsistencyReport) -> str:
+    """Report as fixed-width text: one row per joint, then the worst cases"""
+    lines = [f"{report.robot_name}: {report.candidate} vs {report.reference}, {report.samples} states, "
+             f"seed {report.seed}, tolerance {report.atol:g} + {report.rtol:g}|tau| -> "
+             f"{'CONSISTENT' if report.consistent else 'INCONSISTENT'}",
+             f"{'Joint':>5} {'max':>10} {'mean':>10} {'rms':>10} "
+             + ' '.join(f"{f'p{p:g}':>10}" for p in PERCENTILES) + f" {'violations':>11}"]
+    for j in range(len(report.max_abs)):
+        lines.append(f"{j + 1:>5} {report.max_abs[j]:>10.3e} {report.mean_abs[j]:>10.3e} {report.rms[j]:>10.3e} "
+                     + ' '.join(f"{report.percentiles[p][j]:>10.1e}" for p in PERCENTILES)
+                     + f" {int(report.violations[j]):>11}")
+    if report.worst:
+        lines.append("Worst cases (sample, joint, |diff| Nm, reference Nm, candidate Nm, q rad):")
+        for case in report.worst:
+            lines.append(f"  #{case.sample} joint {case.joint + 1}: {case.discrepancy:.3e} "
+                         f"({case.reference[case.joint]:.4f} vs {case.candidate[case.joint]:.4f}) "
+                         f"q={np.array2string(case.q, precision=3, separator=',')}")
+    return '\n'.join(lines)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Check two dynamics formulations against each other")
+    parser.add_argument('--robots', nargs='*', default=get_available_robots())
+    parser.add_argument('--reference', choices=sorted(FORMULATIONS), default='newton_euler')
+    parser.add_argument('--candidate', choices=sorted(FORMULATIONS), default='lagrange')
+    parser.add_argument('--samples', type=int, default=10**6)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    parser.add_argument('--atol', type=float, default=1e-6, help="Absolute tolerance in Nm")
+    parser.add_argument('--rtol', type=float, default=1e-6)
+    parser.add_argument('--worst', type=int, default=WORST_CASES)
+    parser.add_argument('--workers', type=int, help="Worker processes (default: one per CPU)")
+    parser.add_argument('--dtype', choices=('float64', 'float32'), help="Compute dtype of the candidate")
+    args = parser.parse_args(argv)
+
+    consistent = True
+    for robot_name in args.robots:
+        report = check_consistency(robot_name, args.reference, args.candidate, args.samples, args.seed,
+                                   args.chunk_size, args.atol, args.rtol, args.worst, args.workers, args.dtype)
+        print(format_report(report))
+        consistent &= report.consistent
+    return 0 if consistent else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
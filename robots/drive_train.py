@@ -0,0 +1,222 @@
+# robots/drive_train.py
+"""
+Drive-train stage between ideal link torques and the servo motors.
+
+Each joint is driven by a motor through a gearbox: the motor turns
+gear_ratio times faster than the joint, accelerates its own rotor inertia
+and loses part of the transmitted power in the gearbox. Joint friction
+(viscous and Coulomb) adds to the link torque on the output side, and the
+winding resistance adds copper losses on the electrical side.
+"""
+
+import numpy as np
+from dataclasses import dataclass, fields, replace
+from typing import Optional
+from .kuka_robots import get_robot_by_name, get_robot_torque_limits
+from utils.profiling import profiled
+from utils.precision import resolve_dtype, as_compute_array
+
+# Typical reductions of a six-axis arm, base axes first
+DEFAULT_GEAR_RATIOS = (160.0, 160.0, 120.0, 100.0, 100.0, 60.0)
+
+@dataclass
+class DriveTrain:
+    """Drive-train parameters as arrays indexed by joint"""
+    gear_ratio: np.ndarray  # motor speed / joint speed
+    rotor_inertia: np.ndarray  # kg*m² on the motor side
+    viscous_friction: np.ndarray  # Nm*s/rad on the joint side
+    coulomb_friction: np.ndarray  # Nm on the joint side
+    efficiency: np.ndarray  # gearbox efficiency in (0, 1]
+    torque_constant: np.ndarray  # Nm/A
+    winding_resistance: np.ndarray  # Ohm
+    # Joint speed (rad/s) over which Coulomb friction ramps up, keeps the
+    # friction torque continuous through zero speed
+    friction_velocity: float = 0.01
+
+    @property
+    def dof(self) -> int:
+        return len(self.gear_ratio)
+
+    def astype(self, dtype) -> "DriveTrain":
+        """Copy with the per-joint arrays in dtype"""
+        arrays = {f.name: np.asarray(getattr(self, f.name), dtype=dtype)
+                  for f in fields(self) if f.name != 'friction_velocity'}
+        return replace(self, **arrays)
+
+@dataclass
+class DriveTrainResult:
+    """Drive-train quantities over a trajectory of N samples"""
+    motor_torque: np.ndarray  # (N, dof) Nm
+    motor_speed: np.ndarray  # (N, dof) rad/s
+    electrical_power: np.ndarray  # (N, dof) W, negative while regenerating
+    energy: np.ndarray  # (N, dof) J, cumulative electrical energy per joint
+    supply_energy: np.ndarray  # (N,) J, cumulative energy drawn from the supply
+
+def default_drive_train(robot_name: str, **overrides) -> DriveTrain:
+    """
+    Approximate drive-train parameters of a KUKA robot
+
+    The values are scaled from the joint torque limits (same level of
+    approximation as the link data): the motor peak torque is the joint
+    limit divided by the gear ratio and the rotor inertia grows with it.
+
+    Args:
+        robot_name: Name of the KUKA robot model
+        overrides: Per-joint values (scalar or sequence) replacing the defaults,
+            e.g. efficiency=0.9 or gear_ratio=[...]
+
+    Returns:
+        DriveTrain of the robot
+    """
+    robot = get_robot_by_name(robot_name)
+    if robot is None:
+        raise ValueError(f"Robot {robot_name} not found")
+
+    dof = robot.dof
+    limits = np.asarray(get_robot_torque_limits(robot_name)[:dof], dtype=float)
+    gear_ratio = np.array([DEFAULT_GEAR_RATIOS[min(i, len(DEFAULT_GEAR_RATIOS) - 1)] for i in range(dof)])
+    motor_peak_torque = limits / gear_ratio
+    parameters = {
+        'gear_ratio': gear_ratio,
+        'rotor_inertia': 1e-4 * motor_peak_torque,
+        'viscous_friction': 0.01 * limits,
+        'coulomb_friction': 0.02 * limits,
+        'efficiency': np.full(dof, 0.85),
+        'torque_constant': np.full(dof, 0.8),
+        'winding_resistance': np.full(dof, 1.5)
+    }
+    friction_velocity = overrides.pop('friction_velocity', 0.01)
+    for name, value in overrides.items():
+        if name not in parameters:
+            raise ValueError(f"Unknown drive-train parameter {name}")
+        parameters[name] = np.broadcast_to(np.asarray(value, dtype=float), (dof,)).copy()
+    if np.any(parameters['efficiency'] <= 0) or np.any(parameters['efficiency'] > 1):
+        raise ValueError("Gearbox efficiency must be in (0, 1]")
+    return DriveTrain(friction_velocity=friction_velocity, **parameters)
+
+def joint_friction(drive: DriveTrain, joint_velocities: np.ndarray) -> np.ndarray:
+    """Viscous plus Coulomb friction torque (N, dof) opposing the joint motion"""
+    qd = joint_velocities
+    friction = np.tanh(qd / drive.friction_velocity)
+    friction *= drive.coulomb_friction
+    friction += drive.viscous_friction * qd
+    return friction
+
+def cumulative_energy(power: np.ndarray, time_step: Optional[float] = None, timestamps=None) -> np.ndarray:
+    """
+    Trapezoidal running integral of power over the samples (first axis)
+
+    Args:
+        power: Power in W, shape (N, ...)
+        time_step: Sample period in s for uniformly sampled data
+        timestamps: Sample times in s, shape (N,), for non-uniform data
+
+    Returns:
+        Energy in J with the shape of power, zero at the first sample
+    """
+    if (time_step is None) == (timestamps is None):
+        raise ValueError("Pass exactly one of time_step and timestamps")
+    energy = np.zeros_like(power)
+    if len(power) < 2:
+        return energy
+    steps = energy[1:]
+    np.add(power[1:], power[:-1], out=steps)
+    if timestamps is not None:
+        dt = np.diff(np.asarray(timestamps, dtype=power.dtype))
+        steps *= 0.5 * dt.reshape((-1,) + (1,) * (power.ndim - 1))
+    else:
+        steps *= power.dtype.type(0.5 * time_step)
+    np.cumsum(steps, axis=0, out=steps)
+    return energy
+
+@profiled
+def calculate_kuka_drive_train_batch(robot_name: str, joint_velocities, joint_accelerations, joint_torques,
+                                     time_step: Optional[float] = None, timestamps=None,
+                                     drive: Optional[DriveTrain] = None, regeneration: float = 0.0,
+                                     dtype=None) -> DriveTrainResult:
+    """
+    Motor torque, speed, electrical power and energy over a trajectory
+
+    Per sample and joint:
+        load torque    τ_l = τ + τ_friction(q̇)
+        motor speed    ω_m = G q̇
+        motor torque   τ_m = J_r G q̈ + τ_l / (G η)   when the motor drives the load
+                             J_r G q̈ + τ_l η / G     when the load back-drives the motor
+        electrical     P = τ_m ω_m + R (τ_m / k_t)²
+
+    The joints share the DC bus, so regenerated power of one axis feeds
+    the others; only the net negative bus power is returned to the supply,
+    scaled by `regeneration` (0 when a brake resistor burns it).
+
+    Args:
+        robot_name: Name of the KUKA robot model
+        joint_velocities: Joint velocities in rad/s, shape (N, dof)
+        joint_accelerations: Joint accelerations in rad/s², shape (N, dof)
+        joint_torques: Link torques in Nm from any of the dynamics models, shape (N, dof)
+        time_step: Sample period in s (or pass timestamps)
+        timestamps: Sample times in s, shape (N,)
+        drive: Drive-train parameters, default_drive_train(robot_name) when omitted
+        regeneration: Fraction of net regenerated bus power recovered, in [0, 1]
+        dtype: Compute dtype, defaults to the global compute dtype
+
+    Returns:
+        DriveTrainResult with (N, dof) motor quantities and cumulative energies
+    """
+    if drive is None:
+        drive = default_drive_train(robot_name)
+    if not 0.0 <= regeneration <= 1.0:
+        raise ValueError("Regeneration fraction must be in [0, 1]")
+
+    dtype = resolve_dtype(dtype)
+    drive = drive.astype(dtype)
+    qd = np.atleast_2d(as_compute_array(joint_velocities, dtype))
+    qdd = np.atleast_2d(as_compute_array(joint_accelerations, dtype))
+    tau = np.atleast_2d(as_compute_array(joint_torques, dtype))
+    if qd.shape[1] != drive.dof:
+        raise ValueError(f"Expected {drive.dof} joints, got {qd.shape[1]}")
+
+    # In-place arithmetic: shift-long logs are (N, dof) with N in the millions
+    load = joint_friction(drive, qd)
+    load += tau
+    motor_torque = load / (drive.gear_ratio * drive.efficiency)
+    # The gearbox loses power in the direction it flows: back-driven joints
+    # pass τ_l η / G instead of τ_l / (G η)
+    back_driven = load * qd < 0
+    np.multiply(motor_torque, drive.efficiency**2, out=motor_torque, where=back_driven)
+    motor_torque += (drive.rotor_inertia * drive.gear_ratio) * qdd
+    motor_speed = drive.gear_ratio * qd
+    electrical_power = motor_torque * motor_speed
+    copper_loss = np.square(motor_torque)
+    copper_loss *= drive.winding_resistance / drive.torque_constant**2
+    electrical_power += copper_loss
+
+    bus_power = electrical_power.sum(axis=1)
+    supply_power = np.where(bus_power > 0, bus_power, bus_power * dtype(regeneration))
+    return DriveTrainResult(
+        motor_torque=motor_torque,
+        motor_speed=motor_speed,
+        electrical_power=electrical_power,
+        energy=cumulative_energy(electrical_power, time_step, timestamps),
+        supply_energy=cumulative_energy(supply_power, time_step, timestamps)
+    )
+
+def energy_per_cycle(cumulative, cycle_starts) -> np.ndarray:
+    """
+    Energy of each cycle from a cumulative energy series
+
+    Args:
+        cumulative: Cumulative energy, shape (N,) or (N, dof), e.g. DriveTrainResult.supply_energy
+        cycle_starts: Sample indices where cycles begin, ascending; the last
+            cycle runs to the final sample
+
+    Returns:
+        Energy per cycle in J, shape (cycles,) or (cycles, dof)
+    """
+    cumulative = np.asarray(cumulative)
+    starts = np.asarray(cycle_starts, dtype=np.int64)
+    if starts.size == 0:
+        return cumulative[:0]
+    if np.any(np.diff(starts) <= 0) or starts[0] < 0 or starts[-1] >= len(cumulative):
+        raise ValueError("Cycle starts must be ascending sample indices")
+    ends = np.append(starts[1:], len(cumulative) - 1)
+    return cumulative[ends] - cumulative[starts]
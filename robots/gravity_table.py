@@ -0,0 +1,431 @@
+# robots/gravity_table.py
+"""
+Precomputed gravity-torque tables.
+
+Gravity torque G(q) only depends on the joints that move mass relative to
+the gravity direction: a vertical base axis and wrist joints with centered
+masses drop out. A table covers [-pi, pi) for each of the remaining
+revolute joints and is fitted from samples on a periodic grid:
+
+- 'harmonic': G of a revolute chain is a trigonometric polynomial of
+  degree one in each joint, so the 3^d coefficients of the basis
+  {1, cos q_j, sin q_j} reproduce it exactly. A query is one small
+  matrix product.
+- 'cubic' / 'linear': periodic cubic B-spline or multilinear
+  interpolation over a grid sized to the tolerance, for models where the
+  harmonic fit misses (its error bound exceeds the tolerance).
+- 'auto' (default): harmonic, falling back to cubic.
+
+Every table carries an a priori error bound per torque and the largest
+error measured against RNEA at random configurations.
+
+Usage (from the repository root):
+    python -m robots.gravity_table --robots "KR6 R900" --tolerance 0.01
+"""
+
+import argparse
+import json
+import os
+import sys
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+from .kuka_robots import get_available_robots, get_robot_by_name
+from .rigid_body import RigidBodyModel, build_rigid_body_model, add_payload
+from .kuka_kernels import get_kernels
+from .configuration_index import model_fingerprint
+from .model_registry import get_model_registry, model_slug
+from utils.profiling import profiled
+
+TABLE_VERSION = 1
+METHODS = ('auto', 'harmonic', 'cubic', 'linear')
+DEFAULT_TOLERANCE = 0.01  # Nm
+MIN_POINTS = 8  # grid points per joint
+MAX_POINTS = 256
+MAX_TABLE_ROWS = 1 << 22  # grid points per table, ~200 MB for six torques
+PILOT_POINTS = 8
+VALIDATION_SAMPLES = 4096
+_CHUNK = 8192  # query rows per pass, bounds the (rows, corners) work arrays
+
+def gravity_joints(model: RigidBodyModel, samples: int = 256, seed: int = 0,
+                   threshold: float = 1e-9) -> np.ndarray:
+    """
+    Joints whose position changes the gravity torques
+
+    Each joint is moved to random positions across random configurations;
+    joints that change no torque by more than threshold (relative to the
+    largest change) are left out.
+    """
+    rng = np.random.default_rng(seed)
+    q = rng.uniform(-np.pi, np.pi, (samples, model.dof))
+    zero = np.zeros_like(q)
+    kernels = get_kernels()
+    G = kernels.rnea(model, q, zero, zero)
+    effect = np.zeros(model.dof)
+    for j in range(model.dof):
+        moved = q.copy()
+        moved[:, j] = rng.uniform(-np.pi, np.pi, samples)
+        effect[j] = np.abs(kernels.rnea(model, moved, zero, zero) - G).max()
+    return np.flatnonzero(effect > threshold * max(effect.max(), 1.0))
+
+def _grid_points(shape: Tuple[int, ...], start: int, stop: int) -> np.ndarray:
+    """Angles of the flat grid points start..stop, shape (stop - start, d)"""
+    index = np.arange(start, stop)
+    if not shape:
+        return np.zeros((len(index), 0))
+    step = 2 * np.pi / np.asarray(shape, dtype=float)
+    return np.stack(np.unravel_index(index, shape), axis=1) * step - np.pi
+
+def _grid_torques(model: RigidBodyModel, joints: np.ndarray, shape: Tuple[int, ...]) -> np.ndarray:
+    """G on the periodic grid over joints (other joints at zero), shape shape + (dof,)"""
+    size = int(np.prod(shape))
+    if size > MAX_TABLE_ROWS:
+        raise ValueError(f"Gravity table grid {list(shape)} exceeds {MAX_TABLE_ROWS} points, "
+                         f"raise the tolerance or use cubic interpolation")
+    G = np.empty((size, model.dof))
+    kernels = get_kernels()
+    # Generated in chunks: the full grid of joint vectors is several times the table
+    for start in range(0, size, _CHUNK):
+        stop = min(start + _CHUNK, size)
+        q = np.zeros((stop - start, model.dof))
+        q[:, joints] = _grid_points(shape, start, stop)
+        zero = np.zeros_like(q)
+        G[start:stop] = kernels.rnea(model, q, zero, zero)
+    return G.reshape(tuple(shape) + (model.dof,))
+
+def _harmonic_basis(angles: np.ndarray) -> np.ndarray:
+    """Tensor basis of {1, cos q_j, sin q_j} over the table joints, shape (N, 3^d)"""
+    n = len(angles)
+    basis = np.ones((n, 1))
+    for j in range(angles.shape[1]):
+        axis = np.stack([np.ones(n), np.cos(angles[:, j]), np.sin(angles[:, j])], axis=1)
+        basis = (basis[:, :, None] * axis[:, None, :]).reshape(n, -1)
+    return basis
+
+def _fit_harmonic(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Degree-one harmonic coefficients (3^d, dof) of grid samples and their
+    error bound per torque (dof,)
+
+    The bound is the summed magnitude of the grid harmonics above degree
+    one in any joint, i.e. of everything the basis leaves out. Harmonics
+    beyond the grid resolution alias onto lower ones and are not seen; the
+    validation against RNEA covers that case.
+    """
+    d = values.ndim - 1
+    dof = values.shape[-1]
+    shape = values.shape[:-1]
+    if d == 0:
+        return values.reshape(1, dof), np.zeros(dof)
+    spectrum = np.fft.fftn(values, axes=tuple(range(d))) / np.prod(shape)
+    degree = np.zeros(shape, dtype=np.int64)
+    for j, n in enumerate(shape):
+        k = np.abs(np.fft.fftfreq(n, 1.0 / n)).astype(np.int64)
+        degree = np.maximum(degree, k.reshape([n if a == j else 1 for a in range(d)]))
+    bound = np.abs(spectrum[degree > 1]).sum(axis=0)
+    # The basis is orthogonal over the grid, so least squares is the spectral truncation
+    basis = _harmonic_basis(_grid_points(shape, 0, int(np.prod(shape))))
+    coefficients = np.linalg.lstsq(basis, values.reshape(-1, dof), rcond=None)[0]
+    return coefficients, bound
+
+def _derivative_maxima(values: np.ndarray, order: int) -> np.ndarray:
+    """
+    max |d^order G / dq_j^order| per table axis j and torque (d, dof)
+
+    Derivatives are taken spectrally along each periodic axis. Gravity
+    torques of revolute chains are low-order trigonometric polynomials in
+    each joint, so the grid resolves them and the maxima over the grid
+    (widened by 1/cos(pi/n) for the peaks between points) bound the
+    derivatives everywhere.
+    """
+    d = values.ndim - 1
+    maxima = np.zeros((d, values.shape[-1]))
+    for j in range(d):
+        n = values.shape[j]
+        k = np.fft.fftfreq(n, 1.0 / n)
+        shape = [1] * values.ndim
+        shape[j] = n
+        spectrum = np.fft.fft(values, axis=j) * ((1j * k) ** order).reshape(shape)
+        derivative = np.fft.ifft(spectrum, axis=j).real
+        maxima[j] = np.abs(derivative).reshape(-1, values.shape[-1]).max(axis=0) / np.cos(np.pi / n)
+    return maxima
+
+def _error_bound(maxima: np.ndarray, shape: Tuple[int, ...], method: str) -> np.ndarray:
+    """
+    Interpolation error bound per torque (dof,)
+
+    Sum over the table axes of the 1D bounds: h²/8 max|G''| for linear
+    interpolation, 5h⁴/384 max|G''''| for cubic splines.
+    """
+    h = 2 * np.pi / np.asarray(shape, dtype=float)
+    if method == 'linear':
+        return ((h**2 / 8.0)[:, None] * maxima).sum(axis=0)
+    return ((5.0 * h**4 / 384.0)[:, None] * maxima).sum(axis=0)
+
+def _points_for(maxima: np.ndarray, tolerance: float, method: str) -> Tuple[int, ...]:
+    """Grid points per axis so that every axis contributes at most tolerance / d"""
+    d = len(maxima)
+    share = tolerance / d
+    worst = np.maximum(maxima.max(axis=1), 1e-12)
+    if method == 'linear':
+        h = np.sqrt(8.0 * share / worst)
+    else:
+        h = (384.0 * share / (5.0 * worst)) ** 0.25
+    return tuple(int(n) for n in np.clip(np.ceil(2 * np.pi / h), MIN_POINTS, MAX_POINTS))
+
+def _spline_coefficients(values: np.ndarray) -> np.ndarray:
+    """
+    Periodic cubic B-spline coefficients interpolating the grid values
+
+    Solves (c[i-1] + 4 c[i] + c[i+1]) / 6 = G[i] along every table axis
+    in the Fourier domain, where the circulant system is diagonal.
+    """
+    coefficients = values.astype(np.complex128)
+    for j in range(values.ndim - 1):
+        n = values.shape[j]
+        shape = [1] * values.ndim
+        shape[j] = n
+        response = (4.0 + 2.0 * np.cos(2 * np.pi * np.arange(n) / n)) / 6.0
+        coefficients = np.fft.ifft(np.fft.fft(coefficients, axis=j) / response.reshape(shape), axis=j)
+    return np.ascontiguousarray(coefficients.real)
+
+class GravityTable:
+    """
+    Gravity torques of one robot (and payload) as a table over its
+    gravity joints
+
+    Args:
+        coefficients: Harmonic coefficients (3, ..., 3, dof), spline coefficients
+            ('cubic') or grid samples ('linear'), shape grid + (dof,)
+        joints: Table joints, indices into the joint vector
+        method: 'harmonic', 'cubic' or 'linear'
+        error_bound: Error bound per torque in Nm
+        meta: Build metadata
+    """
+
+    def __init__(self, coefficients: np.ndarray, joints, method: str, error_bound, meta: Optional[Dict] = None):
+        self.coefficients = coefficients
+        self.joints = np.asarray(joints, dtype=np.int64)
+        self.method = method
+        self.error_bound = np.asarray(error_bound, dtype=float)
+        self.meta = dict(meta or {})
+        self.shape = np.array(coefficients.shape[:-1], dtype=np.int64)
+        self.dof = coefficients.shape[-1]
+        self._flat = coefficients.reshape(-1, self.dof)
+        # Row-major strides of the grid in flat rows
+        self._strides = np.append(np.cumprod(self.shape[::-1])[::-1][1:], 1).astype(np.int64)
+        self._taps = 4 if method == 'cubic' else 2  # stencil points per axis
+
+    @classmethod
+    def build(cls, model: RigidBodyModel, tolerance: float = DEFAULT_TOLERANCE, method: str = 'auto',
+              meta: Optional[Dict] = None, seed: int = 0) -> 'GravityTable':
+        """
+        Sample and fit the table of a rigid-body model
+
+        A pilot grid gives the harmonic fit and measures how fast the
+        torques vary along each gravity joint; spline grids are sized so
+        that their error bound stays below tolerance; a table whose bound
+        cannot meet tolerance raises ValueError. The table is then checked
+        against RNEA at random configurations.
+        """
+        if method not in METHODS:
+            raise ValueError(f"Unsupported gravity table method {method}")
+        joints = gravity_joints(model, seed=seed)
+        if any(model.joint_types[j] == 'prismatic' for j in joints):
+            raise ValueError("Gravity tables support revolute gravity joints only")
+
+        d = len(joints)
+        pilot = _grid_torques(model, joints, (PILOT_POINTS,) * d)
+        coefficients = None
+        if method in ('auto', 'harmonic'):
+            harmonic, bound = _fit_harmonic(pilot)
+            if method == 'harmonic' or bound.max() <= tolerance:
+                method = 'harmonic'
+                coefficients = harmonic.reshape((3,) * d + (model.dof,))
+            else:
+                method = 'cubic'
+        if coefficients is None:
+            derivative = 2 if method == 'linear' else 4
+            shape = _points_for(_derivative_maxima(pilot, derivative), tolerance, method) if d else ()
+            values = _grid_torques(model, joints, shape)
+            bound = (_error_bound(_derivative_maxima(values, derivative), shape, method) if d
+                     else np.zeros(model.dof))
+            coefficients = _spline_coefficients(values) if method == 'cubic' else values
+        if bound.max() > tolerance:
+            # Grids are capped at MAX_POINTS per joint, and a forced harmonic fit may not reach it either
+            raise ValueError(f"Gravity table error bound {bound.max():.3g} Nm ({method}) exceeds the "
+                             f"tolerance of {tolerance:g} Nm, raise the tolerance or use cubic interpolation")
+        table = cls(coefficients, joints, method, bound, dict(meta or {}, tolerance=tolerance))
+
+        # Independent check of the bound
+        rng = np.random.default_rng(seed + 1)
+        q = rng.uniform(-np.pi, np.pi, (VALIDATION_SAMPLES, model.dof))
+        zero = np.zeros_like(q)
+        exact = get_kernels().rnea(model, q, zero, zero)
+        table.meta['validated_error'] = np.abs(table.evaluate(q) - exact).max(axis=0).tolist()
+        return table
+
+    def __len__(self) -> int:
+        return len(self._flat)
+
+    def _weights(self, frac: np.ndarray) -> np.ndarray:
+        """Per-axis stencil weights, shape (N, d, taps)"""
+        if self.method == 'linear':
+            return np.stack([1.0 - frac, frac], axis=-1)
+        f2 = frac * frac
+        f3 = f2 * frac
+        return np.stack([(1.0 - frac) ** 3, 3.0 * f3 - 6.0 * f2 + 4.0,
+                         -3.0 * f3 + 3.0 * f2 + 3.0 * frac + 1.0, f3], axis=-1) / 6.0
+
+    def _interpolate(self, angles: np.ndarray) -> np.ndarray:
+        """Spline or multilinear interpolation at table-joint angles (n, d)"""
+        n = len(angles)
+        x = (angles + np.pi) / (2 * np.pi / self.shape)
+        cell = np.floor(x)
+        weights = self._weights(x - cell)
+        # Spline stencils start one point before the cell
+        cell = cell.astype(np.int64) - (1 if self.method == 'cubic' else 0)
+        taps = np.arange(self._taps)
+        # Flat rows and weights of the stencil corners, (n, taps^d), built axis by axis
+        # (indices wrap around the periodic grid)
+        rows = np.zeros((n, 1), dtype=np.int64)
+        w = np.ones((n, 1))
+        for j in range(len(self.shape)):
+            axis_rows = ((cell[:, j, None] + taps) % self.shape[j]) * self._strides[j]
+            rows = (rows[:, :, None] + axis_rows[:, None, :]).reshape(n, -1)
+            w = (w[:, :, None] * weights[:, j, None, :]).reshape(n, -1)
+        return np.matmul(w[:, None, :], np.take(self._flat, rows, axis=0))[:, 0, :]
+
+    @profiled
+    def evaluate(self, joint_angles) -> np.ndarray:
+        """
+        Gravity torques from the table
+
+        Args:
+            joint_angles: Joint angles in radians, shape (dof,) or (N, dof); joints
+                outside the table do not affect gravity and are ignored
+
+        Returns:
+            Gravity torques in Nm, shape (N, dof)
+        """
+        q = np.atleast_2d(np.asarray(joint_angles, dtype=float))
+        out = np.empty((len(q), self.dof))
+        for start in range(0, len(q), _CHUNK):
+            angles = q[start:start + _CHUNK][:, self.joints]
+            if self.method == 'harmonic':
+                out[start:start + _CHUNK] = _harmonic_basis(angles) @ self._flat
+            else:
+                out[start:start + _CHUNK] = self._interpolate(angles)
+        return out
+
+    def save(self, directory: str) -> str:
+        """Write the table as .npy coefficients plus meta.json (meta last, so partial writes stay invalid)"""
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, 'coefficients.npy'), self.coefficients)
+        meta = dict(self.meta, version=TABLE_VERSION, joints=self.joints.tolist(), method=self.method,
+                    error_bound=self.error_bound.tolist())
+        temporary = os.path.join(directory, f'meta.json.{os.getpid()}.tmp')
+        with open(temporary, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2)
+        os.replace(temporary, os.path.join(directory, 'meta.json'))
+        return directory
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> 'GravityTable':
+        """Open a saved table, memory-mapping its coefficients by default"""
+        with open(os.path.join(directory, 'meta.json'), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta.get('version') != TABLE_VERSION:
+            raise ValueError(f"{directory} has table version {meta.get('version')}, expected {TABLE_VERSION}")
+        coefficients = np.load(os.path.join(directory, 'coefficients.npy'),
+                               mmap_mode='r' if mmap else None).view(np.ndarray)
+        return cls(coefficients, meta['joints'], meta['method'], meta['error_bound'], meta)
+
+def default_table_dir(robot_name: str, payload: float = 0.0, method: str = 'auto') -> str:
+    return os.path.join(get_model_registry().cache_dir, 'gravity', f'{model_slug(robot_name)}_p{payload:g}_{method}')
+
+_tables: Dict[Tuple[str, float, float, str], GravityTable] = {}
+
+def get_gravity_table(robot_name: str, payload: float = 0.0, tolerance: float = DEFAULT_TOLERANCE,
+                      method: str = 'auto', directory: Optional[str] = None,
+                      build: bool = True) -> Optional[GravityTable]:
+    """
+    Gravity table of a robot and payload, loaded once per process
+
+    The table on disk is reused while it was built for the same model and
+    payload with at most the requested tolerance; otherwise it is rebuilt
+    and saved.
+
+    Args:
+        robot_name: Name of the KUKA robot model
+        payload: Point-mass payload at the tool flange in kg
+        tolerance: Required error bound in Nm
+        method: 'auto', 'harmonic', 'cubic' or 'linear'
+        directory: Table directory, defaults to the model cache
+        build: Build a missing or stale table; otherwise return None
+
+    Returns:
+        GravityTable, or None
+    """
+    key = (robot_name, payload, tolerance, method)
+    if key in _tables:
+        return _tables[key]
+    robot = get_robot_by_name(robot_name)
+    if robot is None:
+        raise ValueError(f"Robot {robot_name} not found")
+
+    directory = directory or default_table_dir(robot_name, payload, method)
+    fingerprint = model_fingerprint(robot)
+    table = None
+    try:
+        table = GravityTable.load(directory)
+        meta = table.meta
+        if (meta.get('fingerprint') != fingerprint or meta.get('payload') != payload
+                or meta.get('tolerance', np.inf) > tolerance or table.error_bound.max(initial=0.0) > tolerance):
+            table = None
+    except (OSError, ValueError, KeyError):
+        pass
+    if table is None:
+        if not build:
+            return None
+        model = add_payload(build_rigid_body_model(robot), payload)
+        GravityTable.build(model, tolerance, method,
+                           meta={'robot': robot_name, 'payload': payload, 'fingerprint': fingerprint}).save(directory)
+        table = GravityTable.load(directory)
+    _tables[key] = table
+    return table
+
+@profiled
+def calculate_kuka_gravity_torques(robot_name: str, joint_angles, payload: float = 0.0,
+                                   tolerance: float = DEFAULT_TOLERANCE, method: str = 'auto') -> np.ndarray:
+    """
+    Gravity torques for a batch of joint configurations from the cached table
+
+    Args:
+        robot_name: Name of the KUKA robot model
+        joint_angles: Joint angles in radians, shape (dof,) or (N, dof)
+        payload: Point-mass payload at the tool flange in kg
+        tolerance: Error bound in Nm
+        method: Table method, see get_gravity_table
+
+    Returns:
+        Gravity torques in Nm, shape (N, dof)
+    """
+    return get_gravity_table(robot_name, payload, tolerance, method).evaluate(joint_angles)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Build gravity torque tables")
+    parser.add_argument('--robots', nargs='*', default=get_available_robots())
+    parser.add_argument('--payload', type=float, default=0.0, help="Payload in kg")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE, help="Error bound in Nm")
+    parser.add_argument('--method', choices=METHODS, default='auto')
+    args = parser.parse_args(argv)
+
+    for robot_name in args.robots:
+        table = get_gravity_table(robot_name, args.payload, args.tolerance, args.method)
+        print(f"{robot_name}: {table.method} over joints {[int(j) + 1 for j in table.joints]}, "
+              f"table {table.shape.tolist()}, bound {table.error_bound.max():.2e} Nm, "
+              f"checked {max(table.meta['validated_error']):.2e} Nm")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,213 @@
+# robots/incremental.py
+"""
+Kinematics and dynamics state objects with cached per-link intermediates.
+
+A serial chain only propagates changes outwards: the pose of frame i
+depends on joints 0..i, and in the recursive Newton-Euler outward pass
+the velocity, acceleration and body force of link i depend on the states
+of joints 0..i. When joint k changes, everything proximal to k stays
+valid and only the part of the chain from k on is recomputed. Both state
+objects work on batches of N states, so a joint can be perturbed across
+a whole trajectory at once.
+"""
+
+import numpy as np
+from typing import List, Optional, Tuple
+from .kuka_robots import get_robot_by_name
+from .rigid_body import (GRAVITY_VECTOR, RigidBodyModel, build_rigid_body_model, geometric_jacobian,
+                         _base_motion, _base_pose, _inward_pass, _outward_step, _pose_step)
+from utils.precision import resolve_dtype, as_compute_array
+
+def _model_for(robot_name: str, dtype) -> RigidBodyModel:
+    robot = get_robot_by_name(robot_name)
+    if robot is None:
+        raise ValueError(f"Robot {robot_name} not found")
+    return build_rigid_body_model(robot, dtype)
+
+def _changed_joints(old: np.ndarray, new: np.ndarray) -> np.ndarray:
+    """Joints whose column differs anywhere in the batch"""
+    return np.flatnonzero(np.any(old != new, axis=0))
+
+class KinematicsState:
+    """
+    Joint frame poses of a batch of configurations, recomputed from the
+    first changed joint outwards
+
+    Results are computed lazily: changing several joints before reading
+    a pose costs a single update from the most proximal of them.
+    """
+
+    def __init__(self, model: RigidBodyModel, joint_angles):
+        self.model = model
+        self.q = np.atleast_2d(np.array(joint_angles, dtype=model.axes.dtype))
+        self._transforms: List[Optional[Tuple[np.ndarray, np.ndarray]]] = [None] * model.dof
+        self._poses: List[Tuple[np.ndarray, np.ndarray]] = [None] * model.dof
+        self._valid = 0  # leading joint frames whose poses are up to date
+        self.link_updates = 0  # joint frames recomputed so far
+
+    @classmethod
+    def for_robot(cls, robot_name: str, joint_angles, dtype=None) -> "KinematicsState":
+        dtype = resolve_dtype(dtype)
+        return cls(_model_for(robot_name, dtype), as_compute_array(joint_angles, dtype))
+
+    def copy(self) -> "KinematicsState":
+        """Independent state sharing the cached arrays (trial changes leave this one intact)"""
+        state = KinematicsState.__new__(KinematicsState)
+        state.model = self.model
+        state.q = self.q.copy()
+        state._transforms = list(self._transforms)
+        state._poses = list(self._poses)
+        state._valid = self._valid
+        state.link_updates = 0
+        return state
+
+    def _invalidate(self, joints):
+        for k in joints:
+            self._transforms[k] = None
+        if len(joints):
+            self._valid = min(self._valid, int(min(joints)))
+
+    def set_joint(self, k: int, value):
+        """Set joint k to value (scalar or one value per state)"""
+        self.q[:, k] = value
+        self._invalidate([k])
+
+    def set_joint_angles(self, joint_angles):
+        """Set all joint angles, invalidating only the joints that changed"""
+        q = np.broadcast_to(np.asarray(joint_angles, dtype=self.q.dtype), self.q.shape)
+        changed = _changed_joints(self.q, q)
+        self.q[:] = q
+        self._invalidate(changed)
+
+    def _update(self):
+        if self._valid == self.model.dof:
+            return
+        if self._valid > 0:
+            R, p = self._poses[self._valid - 1]
+        else:
+            R, p = _base_pose(len(self.q), self.q.dtype)
+        for i in range(self._valid, self.model.dof):
+            if self._transforms[i] is None:
+                self._transforms[i] = self.model.joint_transforms(i, self.q[:, i])
+            R, p = _pose_step(R, p, *self._transforms[i])
+            self._poses[i] = (R, p)
+            self.link_updates += 1
+        self._valid = self.model.dof
+
+    def frame_poses(self) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """One (rotation (N, 3, 3), position (N, 3)) pair per joint frame, as rigid_body.frame_poses"""
+        self._update()
+        return list(self._poses)
+
+    def tool_pose(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Tool flange orientation (N, 3, 3) and position (N, 3) in the base frame"""
+        self._update()
+        R, p = self._poses[-1]
+        return R, p + R @ self.model.tool_xyz
+
+    def joint_positions(self) -> np.ndarray:
+        """Joint frame origins followed by the tool flange, shape (N, dof + 1, 3)"""
+        self._update()
+        return np.stack([p for _, p in self._poses] + [self.tool_pose()[1]], axis=1)
+
+    def jacobian(self) -> np.ndarray:
+        """Geometric tool Jacobian (N, 6, dof) from the cached poses"""
+        self._update()
+        return geometric_jacobian(self.model, self.q, self._poses)
+
+class DynamicsState:
+    """
+    Recursive Newton-Euler inverse dynamics of a batch of joint states
+    with cached outward-pass results
+
+    The joint transform of link i depends on q_i only; link velocities,
+    accelerations and body forces are cached per link and recomputed from
+    the first joint whose position, velocity or acceleration changed. The
+    inward force pass is always rerun in full: every joint torque sees the
+    forces of all distal links, and the pass costs one force transform
+    per joint.
+    """
+
+    def __init__(self, model: RigidBodyModel, joint_angles, joint_velocities, joint_accelerations,
+                 gravity=GRAVITY_VECTOR):
+        dtype = model.axes.dtype
+        self.model = model
+        self.gravity = gravity
+        self.q = np.atleast_2d(np.array(joint_angles, dtype=dtype))
+        self.qd = np.atleast_2d(np.array(joint_velocities, dtype=dtype))
+        self.qdd = np.atleast_2d(np.array(joint_accelerations, dtype=dtype))
+        dof = model.dof
+        self._transforms: List[Optional[Tuple[np.ndarray, np.ndarray]]] = [None] * dof
+        self._motion: List[Tuple[np.ndarray, np.ndarray]] = [None] * dof  # (v, a) per link
+        self._forces: List[np.ndarray] = [None] * dof
+        self._valid = 0  # leading links whose outward-pass results are up to date
+        self._tau: Optional[np.ndarray] = None
+        self.link_updates = 0  # links recomputed in the outward pass so far
+
+    @classmethod
+    def for_robot(cls, robot_name: str, joint_angles, joint_velocities, joint_accelerations,
+                  gravity=GRAVITY_VECTOR, dtype=None) -> "DynamicsState":
+        dtype = resolve_dtype(dtype)
+        return cls(_model_for(robot_name, dtype), as_compute_array(joint_angles, dtype),
+                   as_compute_array(joint_velocities, dtype), as_compute_array(joint_accelerations, dtype),
+                   gravity)
+
+    def copy(self) -> "DynamicsState":
+        """Independent state sharing the cached arrays (trial changes leave this one intact)"""
+        state = DynamicsState.__new__(DynamicsState)
+        state.__dict__.update(self.__dict__)
+        state.q, state.qd, state.qdd = self.q.copy(), self.qd.copy(), self.qdd.copy()
+        state._transforms = list(self._transforms)
+        state._motion = list(self._motion)
+        state._forces = list(self._forces)
+        state.link_updates = 0
+        return state
+
+    def _invalidate(self, k: int, position: bool):
+        if position:
+            self._transforms[k] = None
+        self._valid = min(self._valid, k)
+        self._tau = None
+
+    def set_joint(self, k: int, angle=None, velocity=None, acceleration=None):
+        """Change the position, velocity and/or acceleration of joint k (scalar or one value per state)"""
+        if angle is not None:
+            self.q[:, k] = angle
+        if velocity is not None:
+            self.qd[:, k] = velocity
+        if acceleration is not None:
+            self.qdd[:, k] = acceleration
+        if angle is not None or velocity is not None or acceleration is not None:
+            self._invalidate(k, angle is not None)
+
+    def set_state(self, joint_angles=None, joint_velocities=None, joint_accelerations=None):
+        """Replace whole joint vectors, invalidating only the joints that changed"""
+        for name, values in (('q', joint_angles), ('qd', joint_velocities), ('qdd', joint_accelerations)):
+            if values is None:
+                continue
+            current = getattr(self, name)
+            values = np.broadcast_to(np.asarray(values, dtype=current.dtype), current.shape)
+            changed = _changed_joints(current, values)
+            current[:] = values
+            for k in changed:
+                self._invalidate(int(k), name == 'q')
+
+    def torques(self) -> np.ndarray:
+        """Joint torques (forces for prismatic joints), shape (N, dof)"""
+        if self._tau is not None:
+            return self._tau
+        model = self.model
+        if self._valid > 0:
+            v, a = self._motion[self._valid - 1]
+        else:
+            v, a = _base_motion(len(self.q), self.q.dtype, self.gravity)
+        for i in range(self._valid, model.dof):
+            if self._transforms[i] is None:
+                self._transforms[i] = model.joint_transforms(i, self.q[:, i])
+            E, r = self._transforms[i]
+            v, a, self._forces[i] = _outward_step(model, i, E, r, v, a, self.qd[:, i], self.qdd[:, i])
+            self._motion[i] = (v, a)
+            self.link_updates += 1
+        self._valid = model.dof
+        self._tau = _inward_pass(model, self._transforms, self._forces)
+        return self._tau
@@ -3,11 +3,22 @@
 import numpy as np
 from typing import List, Tuple, Dict
 from .kuka_robots import KukaRobot, get_robot_by_name
+from .kuka_kernels import get_kernels
+from .rigid_body import (GRAVITY_VECTOR, build_rigid_body_model, add_payload, cholesky_solve,
+                         potential_energy)
+from utils.profiling import profiled
+from utils.precision import resolve_dtype, as_compute_array
+from utils.streaming_stats import StreamingStatistics
 
+# Time points per chunk of streamed workspace statistics
+WORKSPACE_CHUNK_SIZE = 10000
+
+@profiled
 def calculate_kuka_newton_euler(robot_name: str, joint_angles: List[float], 
                                joint_velocities: List[float], joint_accelerations: List[float]) -> List[float]:
     """
     Calculate joint torques for KUKA robot using Newton-Euler method
+    (recursive Newton-Euler over the rigid-body model)
     
     Args:
         robot_name: Name of the KUKA robot model
@@ -18,36 +29,16 @@ def calculate_kuka_newton_euler(robot_name: str, joint_angles: List[float],
     Returns:
         List of joint torques in Nm
     """
-    robot = get_robot_by_name(robot_name)
-    if robot is None:
-        raise ValueError(f"Robot {robot_name} not found")
-    
-    # Simplified Newton-Euler calculation for KUKA robots
-    torques = []
-    
-    for i, (angle, velocity, acceleration) in enumerate(zip(joint_angles, joint_velocities, joint_accelerations)):
-        link = robot.links[i]
-        
-        # Inertia torque: τ = I * α
-        inertia_torque = link.inertia * acceleration
-        
-        # Gravitational torque (simplified)
-        # τ_g = m * g * l * sin(θ)
-        gravitational_torque = link.mass * 9.81 * link.center_of_mass * np.sin(angle)
-        
-        # Centrifugal and Coriolis effects (simplified)
-        centrifugal_torque = 0.5 * link.mass * link.length**2 * velocity**2
-        
-        # Total torque for this joint
-        total_torque = inertia_torque + gravitational_torque + centrifugal_torque
-        torques.append(total_torque)
-    
-    return torques
+    torques = calculate_kuka_newton_euler_batch(robot_name, [joint_angles], [joint_velocities],
+                                                [joint_accelerations], dtype=np.float64)
+    return torques[0].tolist()
 
+@profiled
 def calculate_kuka_lagrange(robot_name: str, joint_angles: List[float], 
                            joint_velocities: List[float], joint_accelerations: List[float]) -> List[float]:
     """
     Calculate joint torques for KUKA robot using Lagrange method
+    (τ = M(q) q̈ + C(q, q̇) q̇ + G(q) of the rigid-body model)
     
     Args:
         robot_name: Name of the KUKA robot model
@@ -58,82 +49,283 @@ def calculate_kuka_lagrange(robot_name: str, joint_angles: List[float],
     Returns:
         List of joint torques in Nm
     """
+    torques = calculate_kuka_lagrange_batch(robot_name, [joint_angles], [joint_velocities],
+                                            [joint_accelerations], dtype=np.float64)
+    return torques[0].tolist()
+
+def get_link_parameter_arrays(robot: KukaRobot, dtype=np.float64) -> Dict[str, np.ndarray]:
+    """Link parameters of a robot as arrays indexed by joint"""
+    return {
+        'mass': np.array([link.mass for link in robot.links], dtype=dtype),
+        'length': np.array([link.length for link in robot.links], dtype=dtype),
+        'inertia': np.array([link.inertia for link in robot.links], dtype=dtype),
+        'center_of_mass': np.array([link.center_of_mass for link in robot.links], dtype=dtype),
+        'inertia_tensor': np.array([link.get_inertia_tensor() for link in robot.links], dtype=dtype),
+        'com': np.array([link.get_com() for link in robot.links], dtype=dtype)
+    }
+
+@profiled
+def calculate_kuka_newton_euler_batch(robot_name: str, joint_angles, joint_velocities,
+                                      joint_accelerations, dtype=None) -> np.ndarray:
+    """
+    Vectorized Newton-Euler torques for a batch of joint states (recursive
+    Newton-Euler over the rigid-body model)
+    
+    Args:
+        robot_name: Name of the KUKA robot model
+        joint_angles: Joint angles in radians, shape (N, dof)
+        joint_velocities: Joint velocities in rad/s, shape (N, dof)
+        joint_accelerations: Joint accelerations in rad/s², shape (N, dof)
+        dtype: Compute dtype, defaults to the global compute dtype
+    
+    Returns:
+        Joint torques in Nm, shape (N, dof)
+    """
     robot = get_robot_by_name(robot_name)
     if robot is None:
         raise ValueError(f"Robot {robot_name} not found")
     
-    # Simplified Lagrange calculation for KUKA robots
-    torques = []
-    
-    for i, (angle, velocity, acceleration) in enumerate(zip(joint_angles, joint_velocities, joint_accelerations)):
-        link = robot.links[i]
-        
-        # Mass matrix element (simplified)
-        M = link.inertia
-        
-        # Coriolis matrix element (simplified)
-        C = 0.1 * link.mass * link.length**2 * velocity
-        
-        # Gravity vector element
-        G = link.mass * 9.81 * link.center_of_mass * np.cos(angle)
-        
-        # Lagrange equation: M*q_ddot + C*q_dot + G = τ
-        torque = M * acceleration + C * velocity + G
-        torques.append(torque)
-    
-    return torques
+    dtype = resolve_dtype(dtype)
+    q = np.atleast_2d(as_compute_array(joint_angles, dtype))
+    qd = np.atleast_2d(as_compute_array(joint_velocities, dtype))
+    qdd = np.atleast_2d(as_compute_array(joint_accelerations, dtype))
+    return get_kernels().rnea(build_rigid_body_model(robot, dtype), q, qd, qdd)
 
-def calculate_kuka_kinetic_energy(robot_name: str, joint_velocities: List[float]) -> float:
+@profiled
+def calculate_kuka_newton_euler_simplified_batch(robot_name: str, joint_angles, joint_velocities,
+                                                 joint_accelerations, dtype=None) -> np.ndarray:
     """
-    Calculate total kinetic energy of KUKA robot
+    Simplified per-joint Newton-Euler model (inertia, sin(θ) gravity and
+    centrifugal term of each joint on its own, no coupling between links),
+    evaluated by the kernel backend
     
     Args:
         robot_name: Name of the KUKA robot model
-        joint_velocities: List of joint velocities in rad/s
+        joint_angles: Joint angles in radians, shape (N, dof)
+        joint_velocities: Joint velocities in rad/s, shape (N, dof)
+        joint_accelerations: Joint accelerations in rad/s², shape (N, dof)
+        dtype: Compute dtype, defaults to the global compute dtype
     
     Returns:
-        Total kinetic energy in Joules
+        Joint torques in Nm, shape (N, dof)
     """
     robot = get_robot_by_name(robot_name)
     if robot is None:
         raise ValueError(f"Robot {robot_name} not found")
     
-    kinetic_energy = 0.0
+    dtype = resolve_dtype(dtype)
+    p = get_link_parameter_arrays(robot, dtype)
+    q = np.atleast_2d(as_compute_array(joint_angles, dtype))
+    qd = np.atleast_2d(as_compute_array(joint_velocities, dtype))
+    qdd = np.atleast_2d(as_compute_array(joint_accelerations, dtype))
+    return get_kernels().newton_euler(p['mass'], p['length'], p['inertia'], p['center_of_mass'], q, qd, qdd)
+
+@profiled
+def calculate_kuka_lagrange_batch(robot_name: str, joint_angles, joint_velocities,
+                                  joint_accelerations, dtype=None) -> np.ndarray:
+    """
+    Vectorized Lagrange torques M(q) q̈ + C(q, q̇) q̇ + G(q) for a batch of
+    joint states (composite rigid body algorithm and a Newton-Euler bias pass)
+    
+    Args:
+        robot_name: Name of the KUKA robot model
+        joint_angles: Joint angles in radians, shape (N, dof)
+        joint_velocities: Joint velocities in rad/s, shape (N, dof)
+        joint_accelerations: Joint accelerations in rad/s², shape (N, dof)
+        dtype: Compute dtype, defaults to the global compute dtype
     
-    for i, velocity in enumerate(joint_velocities):
-        link = robot.links[i]
-        # Kinetic energy: K = 0.5 * I * ω²
-        kinetic_energy += 0.5 * link.inertia * velocity**2
+    Returns:
+        Joint torques in Nm, shape (N, dof)
+    """
+    robot = get_robot_by_name(robot_name)
+    if robot is None:
+        raise ValueError(f"Robot {robot_name} not found")
     
-    return kinetic_energy
+    dtype = resolve_dtype(dtype)
+    q = np.atleast_2d(as_compute_array(joint_angles, dtype))
+    qd = np.atleast_2d(as_compute_array(joint_velocities, dtype))
+    qdd = np.atleast_2d(as_compute_array(joint_accelerations, dtype))
+    kernels = get_kernels()
+    model = build_rigid_body_model(robot, dtype)
+    bias = kernels.rnea(model, q, qd, np.zeros_like(q))
+    return np.einsum('nij,nj->ni', kernels.crba(model, q), qdd) + bias
 
-def calculate_kuka_potential_energy(robot_name: str, joint_angles: List[float]) -> float:
+@profiled
+def calculate_kuka_lagrange_simplified_batch(robot_name: str, joint_angles, joint_velocities,
+                                             joint_accelerations, dtype=None) -> np.ndarray:
     """
-    Calculate total potential energy of KUKA robot
+    Simplified per-joint Lagrange model (diagonal inertia, 0.1·m·l²·q̇
+    Coriolis stand-in and cos(θ) gravity per joint, no coupling between
+    links), evaluated by the kernel backend
     
     Args:
         robot_name: Name of the KUKA robot model
-        joint_angles: List of joint angles in radians
+        joint_angles: Joint angles in radians, shape (N, dof)
+        joint_velocities: Joint velocities in rad/s, shape (N, dof)
+        joint_accelerations: Joint accelerations in rad/s², shape (N, dof)
+        dtype: Compute dtype, defaults to the global compute dtype
     
     Returns:
-        Total potential energy in Joules
+        Joint torques in Nm, shape (N, dof)
     """
     robot = get_robot_by_name(robot_name)
     if robot is None:
         raise ValueError(f"Robot {robot_name} not found")
     
-    potential_energy = 0.0
-    height = 0.0
+    dtype = resolve_dtype(dtype)
+    p = get_link_parameter_arrays(robot, dtype)
+    q = np.atleast_2d(as_compute_array(joint_angles, dtype))
+    qd = np.atleast_2d(as_compute_array(joint_velocities, dtype))
+    qdd = np.atleast_2d(as_compute_array(joint_accelerations, dtype))
+    return get_kernels().lagrange(p['mass'], p['length'], p['inertia'], p['center_of_mass'], q, qd, qdd)
+
+@profiled
+def calculate_kuka_rigid_body_torques_batch(robot_name: str, joint_angles, joint_velocities,
+                                            joint_accelerations, gravity=GRAVITY_VECTOR,
+                                            payload: float = 0.0, dtype=None) -> np.ndarray:
+    """
+    Rigid-body inverse dynamics (recursive Newton-Euler over spatial
+    vectors) with the full 3D link inertias, for a batch of joint states
+    
+    Args:
+        robot_name: Name of the KUKA robot model
+        joint_angles: Joint angles in radians, shape (N, dof)
+        joint_velocities: Joint velocities in rad/s, shape (N, dof)
+        joint_accelerations: Joint accelerations in rad/s², shape (N, dof)
+        gravity: Gravity vector in the z-up base frame (m/s²), None for no gravity
+        payload: Point-mass payload at the tool flange in kg
+        dtype: Compute dtype, defaults to the global compute dtype
+    
+    Returns:
+        Joint torques in Nm, shape (N, dof)
+    """
+    robot = get_robot_by_name(robot_name)
+    if robot is None:
+        raise ValueError(f"Robot {robot_name} not found")
+    
+    dtype = resolve_dtype(dtype)
+    q = np.atleast_2d(as_compute_array(joint_angles, dtype))
+    qd = np.atleast_2d(as_compute_array(joint_velocities, dtype))
+    qdd = np.atleast_2d(as_compute_array(joint_accelerations, dtype))
+    model = add_payload(build_rigid_body_model(robot, dtype), payload)
+    return get_kernels().rnea(model, q, qd, qdd, gravity)
+
+@profiled
+def calculate_kuka_mass_matrix_batch(robot_name: str, joint_angles, payload: float = 0.0,
+                                     dtype=None) -> np.ndarray:
+    """
+    Configuration-dependent joint-space mass matrices M(q) (composite rigid
+    body algorithm) for a batch of joint angles
+    
+    Args:
+        robot_name: Name of the KUKA robot model
+        joint_angles: Joint angles in radians, shape (N, dof)
+        payload: Point-mass payload at the tool flange in kg
+        dtype: Compute dtype, defaults to the global compute dtype
+    
+    Returns:
+        Mass matrices in kg*m², shape (N, dof, dof); np.linalg.cholesky
+        factors them in one call for cholesky_solve
+    """
+    robot = get_robot_by_name(robot_name)
+    if robot is None:
+        raise ValueError(f"Robot {robot_name} not found")
+    
+    dtype = resolve_dtype(dtype)
+    q = np.atleast_2d(as_compute_array(joint_angles, dtype))
+    return get_kernels().crba(add_payload(build_rigid_body_model(robot, dtype), payload), q)
+
+@profiled
+def calculate_kuka_joint_space_dynamics_batch(robot_name: str, joint_angles, joint_velocities,
+                                              gravity=GRAVITY_VECTOR, payload: float = 0.0,
+                                              dtype=None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Mass matrix, Coriolis/centrifugal and gravity terms of
+    M(q) q̈ + C(q, q̇) q̇ + G(q) = τ for a batch of joint states (composite
+    rigid body algorithm, and Newton-Euler passes at zero acceleration
+    without gravity and at rest with gravity)
+    
+    Args:
+        robot_name: Name of the KUKA robot model
+        joint_angles: Joint angles in radians, shape (N, dof)
+        joint_velocities: Joint velocities in rad/s, shape (N, dof)
+        gravity: Gravity vector in the z-up base frame (m/s²), None for no gravity
+        payload: Point-mass payload at the tool flange in kg
+        dtype: Compute dtype, defaults to the global compute dtype
+    
+    Returns:
+        (M of shape (N, dof, dof), C q̇ of shape (N, dof), G of shape (N, dof))
+    """
+    robot = get_robot_by_name(robot_name)
+    if robot is None:
+        raise ValueError(f"Robot {robot_name} not found")
+    
+    dtype = resolve_dtype(dtype)
+    q = np.atleast_2d(as_compute_array(joint_angles, dtype))
+    qd = np.atleast_2d(as_compute_array(joint_velocities, dtype))
+    model = add_payload(build_rigid_body_model(robot, dtype), payload)
+    kernels = get_kernels()
+    zero = np.zeros_like(q)
+    coriolis = kernels.rnea(model, q, qd, zero, None)
+    G = kernels.rnea(model, q, zero, zero, gravity) if gravity is not None else zero
+    return kernels.crba(model, q), coriolis, G
+
+@profiled
+def calculate_kuka_forward_dynamics_batch(robot_name: str, joint_angles, joint_velocities, joint_torques,
+                                          gravity=GRAVITY_VECTOR, payload: float = 0.0,
+                                          dtype=None) -> np.ndarray:
+    """
+    Joint accelerations q̈ = M⁻¹ (τ - C q̇ - G) for a batch of joint states,
+    solved through batched Cholesky factors of M
+    
+    Args:
+        robot_name: Name of the KUKA robot model
+        joint_angles: Joint angles in radians, shape (N, dof)
+        joint_velocities: Joint velocities in rad/s, shape (N, dof)
+        joint_torques: Applied joint torques in Nm, shape (N, dof)
+        gravity: Gravity vector in the z-up base frame (m/s²), None for no gravity
+        payload: Point-mass payload at the tool flange in kg
+        dtype: Compute dtype, defaults to the global compute dtype
+    
+    Returns:
+        Joint accelerations in rad/s², shape (N, dof)
+    """
+    M, coriolis, G = calculate_kuka_joint_space_dynamics_batch(robot_name, joint_angles, joint_velocities,
+                                                               gravity, payload, dtype)
+    tau = np.atleast_2d(as_compute_array(joint_torques, M.dtype))
+    return cholesky_solve(np.linalg.cholesky(M), tau - coriolis - G)
+
+@profiled
+def calculate_kuka_kinetic_energy(robot_name: str, joint_angles: List[float], joint_velocities: List[float]) -> float:
+    """
+    Calculate total kinetic energy of KUKA robot
+    
+    Args:
+        robot_name: Name of the KUKA robot model
+        joint_angles: List of joint angles in radians
+        joint_velocities: List of joint velocities in rad/s
+    
+    Returns:
+        Total kinetic energy in Joules
+    """
+    return float(calculate_kuka_kinetic_energy_batch(robot_name, joint_angles, joint_velocities,
+                                                     dtype=np.float64)[0])
+
+@profiled
+def calculate_kuka_potential_energy(robot_name: str, joint_angles: List[float]) -> float:
+    """
+    Calculate total potential energy of KUKA robot
     
-    for i, angle in enumerate(joint_angles):
-        link = robot.links[i]
-        # Accumulate height for each link
-        height += link.length * np.cos(angle)
-        # Potential energy: U = m * g * h
-        potential_energy += link.mass * 9.81 * height
+    Args:
+        robot_name: Name of the KUKA robot model
+        joint_angles: List of joint angles in radians
     
-    return potential_energy
+    Returns:
+        Total potential energy in Joules, zero with all centers of mass at the base
+    """
+    return float(calculate_kuka_potential_energy_batch(robot_name, joint_angles, dtype=np.float64)[0])
 
+@profiled
 def calculate_kuka_jacobian(robot_name: str, joint_angles: List[float]) -> np.ndarray:
     """
     Calculate Jacobian matrix for KUKA robot (simplified)
@@ -164,6 +356,111 @@ def calculate_kuka_jacobian(robot_name: str, joint_angles: List[float]) -> np.nd
     
     return J
 
+@profiled
+def calculate_kuka_kinetic_energy_batch(robot_name: str, joint_angles, joint_velocities, dtype=None) -> np.ndarray:
+    """
+    Vectorized total kinetic energy ½ q̇ᵀ M(q) q̇ for a batch of joint states
+    
+    Args:
+        robot_name: Name of the KUKA robot model
+        joint_angles: Joint angles in radians, shape (N, dof)
+        joint_velocities: Joint velocities in rad/s, shape (N, dof)
+        dtype: Compute dtype, defaults to the global compute dtype
+    
+    Returns:
+        Kinetic energies in Joules, shape (N,)
+    """
+    robot = get_robot_by_name(robot_name)
+    if robot is None:
+        raise ValueError(f"Robot {robot_name} not found")
+    
+    dtype = resolve_dtype(dtype)
+    q = np.atleast_2d(as_compute_array(joint_angles, dtype))
+    qd = np.atleast_2d(as_compute_array(joint_velocities, dtype))
+    M = get_kernels().crba(build_rigid_body_model(robot, dtype), q)
+    return 0.5 * np.einsum('ni,nij,nj->n', qd, M, qd)
+
+@profiled
+def calculate_kuka_potential_energy_batch(robot_name: str, joint_angles, dtype=None) -> np.ndarray:
+    """
+    Vectorized total potential energy -Σ mᵢ gᵀ cᵢ for a batch of joint angles
+    
+    Args:
+        robot_name: Name of the KUKA robot model
+        joint_angles: Joint angles in radians, shape (N, dof)
+        dtype: Compute dtype, defaults to the global compute dtype
+    
+    Returns:
+        Potential energies in Joules, shape (N,)
+    """
+    robot = get_robot_by_name(robot_name)
+    if robot is None:
+        raise ValueError(f"Robot {robot_name} not found")
+    
+    dtype = resolve_dtype(dtype)
+    q = np.atleast_2d(as_compute_array(joint_angles, dtype))
+    return potential_energy(build_rigid_body_model(robot, dtype), q)
+
+@profiled
+def calculate_kuka_jacobian_batch(robot_name: str, joint_angles, dtype=None) -> np.ndarray:
+    """
+    Vectorized (simplified) Jacobian for a batch of joint angles
+    
+    Args:
+        robot_name: Name of the KUKA robot model
+        joint_angles: Joint angles in radians, shape (N, 6)
+        dtype: Compute dtype, defaults to the global compute dtype
+    
+    Returns:
+        Jacobian matrices, shape (N, 6, 6)
+    """
+    robot = get_robot_by_name(robot_name)
+    if robot is None:
+        raise ValueError(f"Robot {robot_name} not found")
+    
+    dtype = resolve_dtype(dtype)
+    p = get_link_parameter_arrays(robot, dtype)
+    q = np.atleast_2d(as_compute_array(joint_angles, dtype))[:, :6]
+    
+    # Row i depends only on joint i, as in calculate_kuka_jacobian
+    return get_kernels().jacobian(p['length'][:6], q)
+
+@profiled
+def generate_kuka_sample_trajectory(robot_name: str, time_points: int = 100, duration: float = 10.0,
+                                    dtype=None) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Generate the sinusoidal sample trajectory used for workspace analysis
+    
+    Args:
+        robot_name: Name of the KUKA robot model
+        time_points: Number of time points
+        duration: Trajectory duration in seconds
+        dtype: Compute dtype, defaults to the global compute dtype
+    
+    Returns:
+        Tuple of (time, joint_angles, joint_velocities, joint_accelerations),
+        joint arrays have shape (time_points, dof)
+    """
+    robot = get_robot_by_name(robot_name)
+    if robot is None:
+        raise ValueError(f"Robot {robot_name} not found")
+    
+    dtype = resolve_dtype(dtype)
+    time = np.linspace(0, duration, time_points, dtype=dtype)
+    return (time,) + sample_trajectory_states(robot, time)
+
+def sample_trajectory_states(robot: KukaRobot, time: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Joint angles, velocities and accelerations of the sample trajectory at the given times"""
+    # Simple sinusoidal motion, different frequency for each joint
+    freq = (0.5 + np.arange(robot.dof) * 0.1).astype(time.dtype)
+    phase = np.outer(time, freq)
+    joint_angles = 0.5 * np.sin(phase)
+    joint_velocities = 0.5 * freq * np.cos(phase)
+    joint_accelerations = -0.5 * freq**2 * np.sin(phase)
+    
+    return joint_angles, joint_velocities, joint_accelerations
+
+@profiled
 def calculate_kuka_workspace_torques(robot_name: str, time_points: int = 100) -> Tuple[np.ndarray, List[np.ndarray]]:
     """
     Calculate torques over time for KUKA robot workspace analysis
@@ -179,41 +476,52 @@ def calculate_kuka_workspace_torques(robot_name: str, time_points: int = 100) ->
     if robot is None:
         raise ValueError(f"Robot {robot_name} not found")
     
-    time = np.linspace(0, 10, time_points)  # 10 seconds simulation
-    
-    # Generate sample joint trajectories
-    joint_angles = []
-    joint_velocities = []
-    joint_accelerations = []
-    
-    for i in range(robot.dof):
-        # Simple sinusoidal motion for each joint
-        freq = 0.5 + i * 0.1  # Different frequency for each joint
-        angle = 0.5 * np.sin(freq * time)
-        velocity = 0.5 * freq * np.cos(freq * time)
-        acceleration = -0.5 * freq**2 * np.sin(freq * time)
-        
-        joint_angles.append(angle)
-        joint_velocities.append(velocity)
-        joint_accelerations.append(acceleration)
-    
-    # Calculate torques for each time point
-    newton_euler_torques = []
-    lagrange_torques = []
-    
-    for t in range(time_points):
-        angles = [joint_angles[i][t] for i in range(robot.dof)]
-        velocities = [joint_velocities[i][t] for i in range(robot.dof)]
-        accelerations = [joint_accelerations[i][t] for i in range(robot.dof)]
-        
-        ne_torque = calculate_kuka_newton_euler(robot_name, angles, velocities, accelerations)
-        lag_torque = calculate_kuka_lagrange(robot_name, angles, velocities, accelerations)
-        
-        newton_euler_torques.append(ne_torque)
-        lagrange_torques.append(lag_torque)
-    
-    return time, [np.array(newton_euler_torques), np.array(lagrange_torques)]
+    from .workspace_stream import stream_kuka_workspace_torques
+    
+    # Sample joint trajectory (10 seconds simulation), evaluated in vectorized chunks
+    chunks = list(stream_kuka_workspace_torques(robot_name, time_points=time_points))
+    time = np.concatenate([chunk.time for chunk in chunks])
+    newton_euler_torques = np.concatenate([chunk.tau['newton_euler'] for chunk in chunks])
+    lagrange_torques = np.concatenate([chunk.tau['lagrange'] for chunk in chunks])
+    
+    return time, [newton_euler_torques, lagrange_torques]
+
+@profiled
+def calculate_kuka_workspace_statistics(robot_name: str, time_points: int = 100, duration: float = 10.0,
+                                        threshold=None, chunk_size: int = WORKSPACE_CHUNK_SIZE,
+                                        dtype=None) -> Dict[str, StreamingStatistics]:
+    """
+    Per-joint torque statistics of the workspace analysis without keeping
+    the torque history
+    
+    The sample trajectory is streamed chunk by chunk (see
+    robots/workspace_stream.py) and both methods' torques are folded into
+    streaming accumulators, so memory is O(dof) for any number of time
+    points.
+    
+    Args:
+        robot_name: Name of the KUKA robot model
+        time_points: Number of time points for analysis
+        duration: Trajectory duration in seconds
+        threshold: |τ| threshold in Nm for time above threshold, scalar or (dof,)
+        chunk_size: Time points per chunk
+        dtype: Compute dtype, defaults to the global compute dtype
+    
+    Returns:
+        Dictionary with 'newton_euler' and 'lagrange' StreamingStatistics
+    """
+    from .workspace_stream import stream_kuka_workspace_torques, run_pipeline, StatisticsStage
+    
+    stage = StatisticsStage(threshold)
+    run_pipeline(stream_kuka_workspace_torques(robot_name, time_points=time_points, duration=duration,
+                                               chunk_size=chunk_size, dtype=dtype), stage)
+    statistics = stage.statistics
+    if not statistics:
+        dof = get_robot_by_name(robot_name).dof
+        statistics = {m: StreamingStatistics(dof, threshold) for m in ('newton_euler', 'lagrange')}
+    return statistics
 
+@profiled
 def get_kuka_robot_info(robot_name: str) -> Dict:
     """
     Get comprehensive information about a KUKA robot
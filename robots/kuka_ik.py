@@ -0,0 +1,195 @@
+# robots/kuka_ik.py
+
+import numpy as np
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Tuple
+from .kuka_robots import get_robot_by_name
+from .rigid_body import build_rigid_body_model, frame_poses, geometric_jacobian
+from utils.profiling import profiled
+from utils.precision import resolve_dtype, as_compute_array
+
+@dataclass
+class IKResult:
+    """Batch inverse kinematics solution"""
+    joint_angles: np.ndarray  # (N, dof) rad
+    converged: np.ndarray  # (N,) bool
+    position_error: np.ndarray  # (N,) m
+    orientation_error: np.ndarray  # (N,) rad, zero for position-only targets
+    iterations: np.ndarray  # (N,) iterations spent per target
+
+class IKWarmStartCache:
+    """
+    Solved configurations indexed by target position on a voxel grid.
+
+    Looking up a batch of targets returns, per target, the last solution
+    stored in the same cell or, if that cell is empty, the nearest solution
+    stored in one of the 26 neighbouring cells, so consecutive chunks of a
+    tool path (or repeated paths) start next to their solution instead of
+    at a fixed guess. The least recently used cells are dropped beyond
+    `capacity`.
+    """
+
+    # Offsets of the 26 cells around a cell
+    _NEIGHBOURS = [(i, j, k) for i in (-1, 0, 1) for j in (-1, 0, 1) for k in (-1, 0, 1) if i or j or k]
+
+    def __init__(self, cell_size: float = 0.02, capacity: int = 100000):
+        self.cell_size = cell_size
+        self.capacity = capacity
+        # cell -> (solved target position, joint angles)
+        self._cells: "OrderedDict[Tuple[int, int, int], Tuple[np.ndarray, np.ndarray]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._cells)
+
+    def clear(self):
+        self._cells.clear()
+
+    def _keys(self, positions: np.ndarray):
+        return map(tuple, np.floor(positions / self.cell_size).astype(np.int64).tolist())
+
+    def _nearest_neighbour(self, key: Tuple[int, int, int], position: np.ndarray):
+        best_key, best_distance = None, np.inf
+        for dx, dy, dz in self._NEIGHBOURS:
+            neighbour = (key[0] + dx, key[1] + dy, key[2] + dz)
+            entry = self._cells.get(neighbour)
+            if entry is not None:
+                distance = np.sum((entry[0] - position)**2)
+                if distance < best_distance:
+                    best_key, best_distance = neighbour, distance
+        return best_key
+
+    def lookup(self, positions: np.ndarray, seeds: np.ndarray) -> np.ndarray:
+        """
+        Replace the rows of seeds whose target cell, or failing that one of
+        its neighbouring cells, holds a solution
+
+        Returns:
+            Boolean mask of the cache hits
+        """
+        hits = np.zeros(len(positions), dtype=bool)
+        for i, key in enumerate(self._keys(positions)):
+            if key not in self._cells:
+                key = self._nearest_neighbour(key, positions[i])
+                if key is None:
+                    continue
+            seeds[i] = self._cells[key][1]
+            hits[i] = True
+            self._cells.move_to_end(key)
+        return hits
+
+    def store(self, positions: np.ndarray, joint_angles: np.ndarray):
+        for key, position, solution in zip(self._keys(positions), positions, joint_angles):
+            self._cells[key] = (position.copy(), solution.copy())
+            self._cells.move_to_end(key)
+        while len(self._cells) > self.capacity:
+            self._cells.popitem(last=False)
+
+def orientation_error(target: np.ndarray, current: np.ndarray) -> np.ndarray:
+    """
+    Rotation vectors (N, 3) that turn current into target orientations,
+    expressed in the base frame
+    """
+    R = np.matmul(target, np.swapaxes(current, -1, -2))
+    vee = 0.5 * np.stack([R[:, 2, 1] - R[:, 1, 2], R[:, 0, 2] - R[:, 2, 0], R[:, 1, 0] - R[:, 0, 1]], axis=1)
+    sin_angle = np.linalg.norm(vee, axis=1)
+    cos_angle = 0.5 * (np.trace(R, axis1=1, axis2=2) - 1.0)
+    angle = np.arctan2(sin_angle, cos_angle)
+    # angle / sin(angle) -> 1 for small angles
+    scale = np.where(sin_angle > 1e-9, angle / np.maximum(sin_angle, 1e-12), 1.0)
+    return vee * scale[:, None]
+
+@profiled
+def solve_kuka_ik_batch(robot_name: str, target_positions, target_rotations=None, initial_guess=None,
+                        cache: Optional[IKWarmStartCache] = None, index=None, max_iterations: int = 100,
+                        tolerance: float = 1e-5, orientation_tolerance: float = 1e-4,
+                        damping: float = 0.01, max_step: float = 0.5, dtype=None) -> IKResult:
+    """
+    Damped-least-squares inverse kinematics for a batch of tool poses
+
+    All unconverged targets take one vectorized step per iteration,
+    dq = J^T (J J^T + damping² I)^-1 e, limited to max_step rad; converged
+    targets drop out of the active set.
+
+    Args:
+        robot_name: Name of the KUKA robot model
+        target_positions: Tool flange positions in the base frame in m, shape (N, 3)
+        target_rotations: Tool flange orientations, shape (N, 3, 3); None solves for position only
+        initial_guess: Seed joint angles, shape (dof,) or (N, dof); zeros by default
+        cache: Warm-start cache; hits replace the initial guess and converged solutions are stored
+        index: ConfigurationIndex of the robot; cache misses start from the sampled
+            configuration whose tool position is nearest to the target
+        max_iterations: Iteration limit per target
+        tolerance: Position tolerance in m
+        orientation_tolerance: Orientation tolerance in rad
+        damping: Damping factor (m), trades accuracy near singularities for stability
+        max_step: Largest joint step per iteration in rad
+        dtype: Compute dtype, defaults to the global compute dtype
+
+    Returns:
+        IKResult with joint angles of shape (N, dof)
+    """
+    robot = get_robot_by_name(robot_name)
+    if robot is None:
+        raise ValueError(f"Robot {robot_name} not found")
+
+    dtype = resolve_dtype(dtype)
+    model = build_rigid_body_model(robot, dtype)
+    positions = np.atleast_2d(as_compute_array(target_positions, dtype))
+    n = len(positions)
+    rotations = None
+    if target_rotations is not None:
+        rotations = as_compute_array(target_rotations, dtype).reshape(n, 3, 3)
+
+    q = np.zeros((n, robot.dof), dtype=dtype)
+    if initial_guess is not None:
+        q[:] = as_compute_array(initial_guess, dtype)
+    hits = cache.lookup(positions, q) if cache is not None else np.zeros(n, dtype=bool)
+    if index is not None and not hits.all():
+        nearest, _ = index.nearest_batch(positions[~hits])
+        q[~hits] = index.joint_angles[nearest]
+
+    rows = slice(None) if rotations is not None else slice(3, 6)
+    identity = np.eye(6 if rotations is not None else 3, dtype=dtype)
+    iterations = np.zeros(n, dtype=np.int64)
+    active = np.arange(n)
+    for iteration in range(max_iterations + 1):
+        poses = frame_poses(model, q[active])
+        R, p = poses[-1]
+        e_position = positions[active] - (p + R @ model.tool_xyz)
+        done = np.linalg.norm(e_position, axis=1) <= tolerance
+        if rotations is not None:
+            e_rotation = orientation_error(rotations[active], R)
+            done &= np.linalg.norm(e_rotation, axis=1) <= orientation_tolerance
+            error = np.concatenate([e_rotation, e_position], axis=1)
+        else:
+            error = e_position
+
+        remaining = ~done
+        if not remaining.any() or iteration == max_iterations:
+            break
+        poses = [(R_i[remaining], p_i[remaining]) for R_i, p_i in poses]
+        active = active[remaining]
+        J = geometric_jacobian(model, q[active], poses)[:, rows, :]
+        A = np.matmul(J, np.swapaxes(J, 1, 2)) + damping**2 * identity
+        step = np.einsum('nji,nj->ni', J, np.linalg.solve(A, error[remaining][..., None])[..., 0])
+        scale = np.minimum(1.0, max_step / np.maximum(np.abs(step).max(axis=1), 1e-12))
+        q[active] += step * scale[:, None]
+        iterations[active] += 1
+
+    # Keep revolute joint angles in [-pi, pi)
+    revolute = np.array([t != 'prismatic' for t in model.joint_types])
+    q[:, revolute] = (q[:, revolute] + np.pi) % (2 * np.pi) - np.pi
+
+    R, p = frame_poses(model, q)[-1]
+    position_error = np.linalg.norm(positions - (p + R @ model.tool_xyz), axis=1)
+    if rotations is not None:
+        rotation_error = np.linalg.norm(orientation_error(rotations, R), axis=1)
+    else:
+        rotation_error = np.zeros(n, dtype=dtype)
+    converged = (position_error <= tolerance) & (rotation_error <= orientation_tolerance)
+    if cache is not None and converged.any():
+        cache.store(positions[converged], q[converged])
+
+    return IKResult(joint_angles=q, converged=converged, position_error=position_error,
+                    orientation_error=rotation_error, iterations=iterations)
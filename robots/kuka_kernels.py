@@ -0,0 +1,393 @@
+# robots/kuka_kernels.py
+
+import os
+import numpy as np
+from typing import Dict, List
+from . import rigid_body
+from .rigid_body import GRAVITY_VECTOR, RigidBodyModel
+
+try:
+    import numba
+    NUMBA_AVAILABLE = True
+except ImportError:
+    numba = None
+    NUMBA_AVAILABLE = False
+
+GRAVITY = 9.81
+
+class NumpyKernels:
+    """
+    Reference implementation of the batch dynamics kernels.
+
+    All kernels take per-joint link parameter arrays of shape (dof,), or
+    a RigidBodyModel for the rigid-body kernels, and joint states of shape
+    (N, dof) in one dtype, and return arrays of that dtype.
+    """
+
+    name = 'numpy'
+
+    def rnea(self, model: RigidBodyModel, q, qd, qdd, gravity=GRAVITY_VECTOR):
+        # Vectorized over the batch, one step per joint
+        return rigid_body.rnea(model, q, qd, qdd, gravity)
+
+    def crba(self, model: RigidBodyModel, q):
+        return rigid_body.crba(model, q)
+
+    def newton_euler(self, mass, length, inertia, center_of_mass, q, qd, qdd):
+        # Simplified per-joint model: inertia + gravity + centrifugal terms
+        return (inertia * qdd
+                + mass * GRAVITY * center_of_mass * np.sin(q)
+                + 0.5 * mass * length**2 * qd**2)
+
+    def lagrange(self, mass, length, inertia, center_of_mass, q, qd, qdd):
+        # Simplified per-joint model: M*q_ddot + C*q_dot + G
+        return (inertia * qdd
+                + 0.1 * mass * length**2 * qd * qd
+                + mass * GRAVITY * center_of_mass * np.cos(q))
+
+    def jacobian(self, length, q):
+        # Row i depends only on joint i
+        J = np.repeat((0.1 * length * np.sin(q))[:, :, None], q.shape[1], axis=2)
+        diagonal = np.arange(q.shape[1])
+        J[:, diagonal, diagonal] = length * np.cos(q)
+        return J
+
+    def forward_kinematics(self, length, q):
+        # Absolute link angles are the running sum of relative joint angles
+        angle_sum = np.cumsum(q, axis=1)
+        positions = np.zeros((q.shape[0], q.shape[1] + 1, 2), dtype=q.dtype)
+        positions[:, 1:, 0] = np.cumsum(length * np.cos(angle_sum), axis=1)
+        positions[:, 1:, 1] = np.cumsum(length * np.sin(angle_sum), axis=1)
+        return positions
+
+if NUMBA_AVAILABLE:
+    # Compiled lazily on first use; cache=True stores the machine code in
+    # __pycache__ so later start-ups load it instead of recompiling
+    _jit = numba.njit(parallel=True, cache=True)
+    _njit = numba.njit(cache=True)
+    prange = numba.prange
+
+    # Rigid-body kernels: one row of the batch per iteration of the
+    # parallel loop, the joint recursion runs on scalars within the row.
+    # Same spatial algebra as robots/spatial.py, (E, r) transforms and
+    # [angular; linear] vectors.
+
+    @_njit
+    def _nb_joint_transform(prismatic, axis, R0, p0, q, E, r):
+        """Parent-to-link transform (E, r) of one joint at position q"""
+        if prismatic:
+            for i in range(3):
+                r[i] = p0[i] + q * (R0[i, 0] * axis[0] + R0[i, 1] * axis[1] + R0[i, 2] * axis[2])
+                for j in range(3):
+                    E[j, i] = R0[i, j]
+            return
+        # E = (R0 Rot(axis, q))^T with Rot = c I + s skew(axis) + (1 - c) axis axisᵀ
+        c = np.cos(q)
+        s = np.sin(q)
+        t = 1.0 - c
+        x, y, z = axis[0], axis[1], axis[2]
+        r00, r01, r02 = c + t * x * x, t * x * y - s * z, t * x * z + s * y
+        r10, r11, r12 = t * x * y + s * z, c + t * y * y, t * y * z - s * x
+        r20, r21, r22 = t * x * z - s * y, t * y * z + s * x, c + t * z * z
+        for i in range(3):
+            r[i] = p0[i]
+            E[0, i] = R0[i, 0] * r00 + R0[i, 1] * r10 + R0[i, 2] * r20
+            E[1, i] = R0[i, 0] * r01 + R0[i, 1] * r11 + R0[i, 2] * r21
+            E[2, i] = R0[i, 0] * r02 + R0[i, 1] * r12 + R0[i, 2] * r22
+
+    @_njit
+    def _nb_transform_motion(E, r, m, out):
+        """out = X m"""
+        u0 = m[3] - (r[1] * m[2] - r[2] * m[1])
+        u1 = m[4] - (r[2] * m[0] - r[0] * m[2])
+        u2 = m[5] - (r[0] * m[1] - r[1] * m[0])
+        for i in range(3):
+            out[i] = E[i, 0] * m[0] + E[i, 1] * m[1] + E[i, 2] * m[2]
+            out[i + 3] = E[i, 0] * u0 + E[i, 1] * u1 + E[i, 2] * u2
+
+    @_njit
+    def _nb_inverse_transform_force(E, r, f, out):
+        """out = X^T f"""
+        for i in range(3):
+            out[i + 3] = E[0, i] * f[3] + E[1, i] * f[4] + E[2, i] * f[5]
+        for i in range(3):
+            out[i] = E[0, i] * f[0] + E[1, i] * f[1] + E[2, i] * f[2]
+        out[0] += r[1] * out[5] - r[2] * out[4]
+        out[1] += r[2] * out[3] - r[0] * out[5]
+        out[2] += r[0] * out[4] - r[1] * out[3]
+
+    @_njit
+    def _nb_joint_transforms(prismatic, axes, origin_rotations, origin_positions, q, E, r):
+        for i in range(q.shape[0]):
+            _nb_joint_transform(prismatic[i], axes[i], origin_rotations[i], origin_positions[i], q[i], E[i], r[i])
+
+    @_jit
+    def _nb_rnea(prismatic, axes, origin_rotations, origin_positions, subspaces, inertias, gravity,
+                 q, qd, qdd, out):
+        dof = q.shape[1]
+        for n in prange(q.shape[0]):
+            E = np.empty((dof, 3, 3), dtype=q.dtype)
+            r = np.empty((dof, 3), dtype=q.dtype)
+            f = np.empty((dof, 6), dtype=q.dtype)
+            v = np.zeros(6, dtype=q.dtype)
+            a = np.zeros(6, dtype=q.dtype)
+            v_link = np.empty(6, dtype=q.dtype)
+            a_link = np.empty(6, dtype=q.dtype)
+            momentum = np.empty(6, dtype=q.dtype)
+            parent = np.empty(6, dtype=q.dtype)
+            # Gravity as an upward base acceleration
+            for k in range(3):
+                a[k + 3] = -gravity[k]
+            _nb_joint_transforms(prismatic, axes, origin_rotations, origin_positions, q[n], E, r)
+
+            for i in range(dof):
+                S = subspaces[i]
+                _nb_transform_motion(E[i], r[i], v, v_link)
+                _nb_transform_motion(E[i], r[i], a, a_link)
+                for k in range(6):
+                    v[k] = v_link[k] + S[k] * qd[n, i]
+                    a[k] = a_link[k] + S[k] * qdd[n, i]
+                # a += v x vJ with vJ = S qd
+                w0, w1, w2 = S[0] * qd[n, i], S[1] * qd[n, i], S[2] * qd[n, i]
+                u0, u1, u2 = S[3] * qd[n, i], S[4] * qd[n, i], S[5] * qd[n, i]
+                a[0] += v[1] * w2 - v[2] * w1
+                a[1] += v[2] * w0 - v[0] * w2
+                a[2] += v[0] * w1 - v[1] * w0
+                a[3] += v[1] * u2 - v[2] * u1 + v[4] * w2 - v[5] * w1
+                a[4] += v[2] * u0 - v[0] * u2 + v[5] * w0 - v[3] * w2
+                a[5] += v[0] * u1 - v[1] * u0 + v[3] * w1 - v[4] * w0
+                # f = I a + v x* (I v)
+                I = inertias[i]
+                for k in range(6):
+                    total_v = 0.0
+                    total_a = 0.0
+                    for l in range(6):
+                        total_v += I[k, l] * v[l]
+                        total_a += I[k, l] * a[l]
+                    momentum[k] = total_v
+                    f[i, k] = total_a
+                h = momentum
+                f[i, 0] += v[1] * h[2] - v[2] * h[1] + v[4] * h[5] - v[5] * h[4]
+                f[i, 1] += v[2] * h[0] - v[0] * h[2] + v[5] * h[3] - v[3] * h[5]
+                f[i, 2] += v[0] * h[1] - v[1] * h[0] + v[3] * h[4] - v[4] * h[3]
+                f[i, 3] += v[1] * h[5] - v[2] * h[4]
+                f[i, 4] += v[2] * h[3] - v[0] * h[5]
+                f[i, 5] += v[0] * h[4] - v[1] * h[3]
+
+            for i in range(dof - 1, -1, -1):
+                total = 0.0
+                for k in range(6):
+                    total += f[i, k] * subspaces[i, k]
+                out[n, i] = total
+                if i > 0:
+                    _nb_inverse_transform_force(E[i], r[i], f[i], parent)
+                    for k in range(6):
+                        f[i - 1, k] += parent[k]
+
+    @_jit
+    def _nb_crba(prismatic, axes, origin_rotations, origin_positions, subspaces, inertias, q, out):
+        dof = q.shape[1]
+        for n in prange(q.shape[0]):
+            E = np.empty((dof, 3, 3), dtype=q.dtype)
+            r = np.empty((dof, 3), dtype=q.dtype)
+            composite = inertias.copy()
+            X = np.zeros((6, 6), dtype=q.dtype)
+            IX = np.empty((6, 6), dtype=q.dtype)
+            f = np.empty(6, dtype=q.dtype)
+            carried = np.empty(6, dtype=q.dtype)
+            _nb_joint_transforms(prismatic, axes, origin_rotations, origin_positions, q[n], E, r)
+
+            for i in range(dof - 1, -1, -1):
+                if i > 0:
+                    # composite[i - 1] += X^T composite[i] X with X = [[E, 0], [-E skew(r), E]]
+                    Ei, ri = E[i], r[i]
+                    for j in range(3):
+                        for k in range(3):
+                            X[j, k] = Ei[j, k]
+                            X[j + 3, k + 3] = Ei[j, k]
+                        X[j + 3, 0] = -(Ei[j, 1] * ri[2] - Ei[j, 2] * ri[1])
+                        X[j + 3, 1] = -(Ei[j, 2] * ri[0] - Ei[j, 0] * ri[2])
+                        X[j + 3, 2] = -(Ei[j, 0] * ri[1] - Ei[j, 1] * ri[0])
+                    for j in range(6):
+                        for k in range(6):
+                            total = 0.0
+                            for l in range(6):
+                                total += composite[i, j, l] * X[l, k]
+                            IX[j, k] = total
+                    for j in range(6):
+                        for k in range(6):
+                            total = 0.0
+                            for l in range(6):
+                                total += X[l, j] * IX[l, k]
+                            composite[i - 1, j, k] += total
+
+                for j in range(6):
+                    total = 0.0
+                    for k in range(6):
+                        total += composite[i, j, k] * subspaces[i, k]
+                    f[j] = total
+                total = 0.0
+                for k in range(6):
+                    total += f[k] * subspaces[i, k]
+                out[n, i, i] = total
+                for j in range(i - 1, -1, -1):
+                    _nb_inverse_transform_force(E[j + 1], r[j + 1], f, carried)
+                    total = 0.0
+                    for k in range(6):
+                        f[k] = carried[k]
+                        total += f[k] * subspaces[j, k]
+                    out[n, i, j] = total
+                    out[n, j, i] = total
+
+    @_jit
+    def _nb_newton_euler(mass, length, inertia, center_of_mass, q, qd, qdd, out):
+        for n in prange(q.shape[0]):
+            for j in range(q.shape[1]):
+                out[n, j] = (inertia[j] * qdd[n, j]
+                             + mass[j] * GRAVITY * center_of_mass[j] * np.sin(q[n, j])
+                             + 0.5 * mass[j] * length[j]**2 * qd[n, j]**2)
+
+    @_jit
+    def _nb_lagrange(mass, length, inertia, center_of_mass, q, qd, qdd, out):
+        for n in prange(q.shape[0]):
+            for j in range(q.shape[1]):
+                out[n, j] = (inertia[j] * qdd[n, j]
+                             + 0.1 * mass[j] * length[j]**2 * qd[n, j] * qd[n, j]
+                             + mass[j] * GRAVITY * center_of_mass[j] * np.cos(q[n, j]))
+
+    @_jit
+    def _nb_jacobian(length, q, out):
+        for n in prange(q.shape[0]):
+            for i in range(q.shape[1]):
+                off_diagonal = 0.1 * length[i] * np.sin(q[n, i])
+                for j in range(q.shape[1]):
+                    out[n, i, j] = off_diagonal
+                out[n, i, i] = length[i] * np.cos(q[n, i])
+
+    @_jit
+    def _nb_forward_kinematics(length, q, out):
+        for n in prange(q.shape[0]):
+            angle = 0.0
+            x = 0.0
+            y = 0.0
+            out[n, 0, 0] = 0.0
+            out[n, 0, 1] = 0.0
+            for j in range(q.shape[1]):
+                angle += q[n, j]
+                x += length[j] * np.cos(angle)
+                y += length[j] * np.sin(angle)
+                out[n, j + 1, 0] = x
+                out[n, j + 1, 1] = y
+
+def _model_arrays(model: RigidBodyModel, dtype):
+    """Joint parameters of a rigid-body model as the contiguous arrays the compiled kernels take"""
+    prismatic = np.array([joint_type == 'prismatic' for joint_type in model.joint_types])
+    arrays = (model.axes, model.origin_rotations, model.origin_positions, model.motion_subspaces,
+              model.inertias)
+    return (prismatic,) + tuple(np.ascontiguousarray(array, dtype=dtype) for array in arrays)
+
+class NumbaKernels:
+    """Compiled kernels, parallel over the batch dimension"""
+
+    name = 'numba'
+
+    def rnea(self, model: RigidBodyModel, q, qd, qdd, gravity=GRAVITY_VECTOR):
+        g = np.zeros(3, dtype=q.dtype) if gravity is None else np.asarray(gravity, dtype=q.dtype)
+        out = np.empty(q.shape, dtype=q.dtype)
+        _nb_rnea(*_model_arrays(model, q.dtype), g, q, qd, qdd, out)
+        return out
+
+    def crba(self, model: RigidBodyModel, q):
+        out = np.empty((q.shape[0], q.shape[1], q.shape[1]), dtype=q.dtype)
+        _nb_crba(*_model_arrays(model, q.dtype), q, out)
+        return out
+
+    def newton_euler(self, mass, length, inertia, center_of_mass, q, qd, qdd):
+        out = np.empty(q.shape, dtype=q.dtype)
+        _nb_newton_euler(mass, length, inertia, center_of_mass, q, qd, qdd, out)
+        return out
+
+    def lagrange(self, mass, length, inertia, center_of_mass, q, qd, qdd):
+        out = np.empty(q.shape, dtype=q.dtype)
+        _nb_lagrange(mass, length, inertia, center_of_mass, q, qd, qdd, out)
+        return out
+
+    def jacobian(self, length, q):
+        out = np.empty((q.shape[0], q.shape[1], q.shape[1]), dtype=q.dtype)
+        _nb_jacobian(length, q, out)
+        return out
+
+    def forward_kinematics(self, length, q):
+        out = np.empty((q.shape[0], q.shape[1] + 1, 2), dtype=q.dtype)
+        _nb_forward_kinematics(length, q, out)
+        return out
+
+_BACKENDS = {'numpy': NumpyKernels()}
+if NUMBA_AVAILABLE:
+    _BACKENDS['numba'] = NumbaKernels()
+
+class _BackendState:
+    kernels = None
+
+_state = _BackendState()
+
+def get_available_backends() -> List[str]:
+    return list(_BACKENDS.keys())
+
+def set_kernel_backend(name: str = 'auto'):
+    """
+    Select the kernel backend: 'numpy', 'numba', or 'auto' (numba when
+    installed, otherwise numpy)
+    """
+    if name == 'auto':
+        name = 'numba' if NUMBA_AVAILABLE else 'numpy'
+    if name not in _BACKENDS:
+        raise ValueError(f"Kernel backend {name} not available (available: {', '.join(_BACKENDS)})")
+    _state.kernels = _BACKENDS[name]
+
+def get_kernels(name: str = None):
+    """Kernels of the named backend, or of the selected one"""
+    if name is not None:
+        if name not in _BACKENDS:
+            raise ValueError(f"Kernel backend {name} not available (available: {', '.join(_BACKENDS)})")
+        return _BACKENDS[name]
+    if _state.kernels is None:
+        set_kernel_backend(os.environ.get('KUKA_KERNEL_BACKEND', 'auto'))
+    return _state.kernels
+
+def get_kernel_backend() -> str:
+    return get_kernels().name
+
+def compare_backends(q, qd, qdd, link_parameters: Dict[str, np.ndarray], model: RigidBodyModel,
+                     reference: str = 'numpy', candidate: str = 'numba') -> Dict[str, float]:
+    """
+    Largest difference between two backends for every kernel, relative to
+    the largest magnitude of the reference output
+
+    Args:
+        q, qd, qdd: Joint states of shape (N, dof)
+        link_parameters: 'mass', 'length', 'inertia' and 'center_of_mass' arrays
+        model: Rigid-body model of the same robot, for the rnea and crba kernels
+        reference: Backend treated as ground truth
+        candidate: Backend under test
+
+    Returns:
+        Dictionary of kernel name to relative difference
+    """
+    a = get_kernels(reference)
+    b = get_kernels(candidate)
+    p = link_parameters
+    pairs = {
+        'rnea': lambda k: k.rnea(model, q, qd, qdd),
+        'crba': lambda k: k.crba(model, q),
+        'newton_euler': lambda k: k.newton_euler(p['mass'], p['length'], p['inertia'], p['center_of_mass'], q, qd, qdd),
+        'lagrange': lambda k: k.lagrange(p['mass'], p['length'], p['inertia'], p['center_of_mass'], q, qd, qdd),
+        'jacobian': lambda k: k.jacobian(p['length'], q),
+        'forward_kinematics': lambda k: k.forward_kinematics(p['length'], q)
+    }
+    differences = {}
+    for name, run in pairs.items():
+        expected = run(a)
+        scale = max(float(np.abs(expected).max()), np.finfo(np.float64).tiny)
+        differences[name] = float(np.abs(run(b).astype(np.float64) - expected).max()) / scale
+    return differences
@@ -0,0 +1,59 @@
+# robots/kuka_kinematics.py
+
+import numpy as np
+from typing import Tuple
+from .kuka_robots import get_robot_by_name
+from .rigid_body import build_rigid_body_model, frame_poses, tool_pose
+from utils.precision import resolve_dtype, as_compute_array
+
+# Robot view plane: base x -> x, base z (up) -> y
+VIEW_PLANE_AXES = [0, 2]
+
+def calculate_kuka_forward_kinematics(robot_name: str, joint_angles, dtype=None) -> np.ndarray:
+    """
+    Calculate joint positions in the robot view for a batch of KUKA robot configurations
+
+    The joint frame origins and the tool flange of the rigid-body model
+    are projected onto the view plane (VIEW_PLANE_AXES), the same points
+    RobotVisualizer draws for the joint sliders.
+
+    Args:
+        robot_name: Name of the KUKA robot model
+        joint_angles: Joint angles in radians, shape (dof,) or (N, dof)
+        dtype: Compute dtype, defaults to the global compute dtype
+
+    Returns:
+        Joint positions of shape (N, dof + 1, 2), tool flange last
+    """
+    robot = get_robot_by_name(robot_name)
+    if robot is None:
+        raise ValueError(f"Robot {robot_name} not found")
+
+    dtype = resolve_dtype(dtype)
+    q = np.atleast_2d(as_compute_array(joint_angles, dtype))
+    model = build_rigid_body_model(robot, dtype)
+    poses = frame_poses(model, q)
+    R, p = poses[-1]
+    positions = np.stack([origin for _, origin in poses] + [p + R @ model.tool_xyz], axis=1)
+    return positions[:, :, VIEW_PLANE_AXES]
+
+def calculate_kuka_tool_pose(robot_name: str, joint_angles, dtype=None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Calculate the 3D tool flange pose for a batch of KUKA robot configurations
+
+    Args:
+        robot_name: Name of the KUKA robot model
+        joint_angles: Joint angles in radians, shape (dof,) or (N, dof)
+        dtype: Compute dtype, defaults to the global compute dtype
+
+    Returns:
+        Tuple of (rotations of shape (N, 3, 3), positions of shape (N, 3))
+        in the z-up base frame
+    """
+    robot = get_robot_by_name(robot_name)
+    if robot is None:
+        raise ValueError(f"Robot {robot_name} not found")
+
+    dtype = resolve_dtype(dtype)
+    q = np.atleast_2d(as_compute_array(joint_angles, dtype))
+    return tool_pose(build_rigid_body_model(robot, dtype), q)
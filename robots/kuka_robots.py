@@ -1,8 +1,14 @@
 # robots/kuka_robots.py
 
+import warnings
 import numpy as np
 from dataclasses import dataclass
-from typing import List, Dict, Tuple
+from typing import List, Dict, Optional, Tuple
+
+# Default joint axis of links without 3D geometry. Links extend along x and
+# rotate about -y, so q lifts the link from +x towards +z: the x/z plane of
+# the z-up base frame is the x/y plane of the planar kinematics.
+DEFAULT_JOINT_AXIS = (0.0, -1.0, 0.0)
 
 @dataclass
 class RobotLink:
@@ -12,6 +18,38 @@ class RobotLink:
     inertia: float  # kg*m²
     center_of_mass: float  # m (distance from joint)
     joint_type: str  # 'revolute' or 'prismatic'
+    # Optional 3D geometry; derived from the scalar parameters when omitted
+    inertia_tensor: Optional[np.ndarray] = None  # kg*m², 3x3 about the COM in the link frame
+    com: Optional[np.ndarray] = None  # m, COM in the link frame
+    axis: Optional[np.ndarray] = None  # unit joint axis in the link frame
+    origin_xyz: Optional[np.ndarray] = None  # m, joint position in the previous link frame
+    origin_rotation: Optional[np.ndarray] = None  # joint frame orientation in the previous link frame
+    position_limits: Optional[Tuple[float, float]] = None  # rad (m for prismatic), joint travel
+    
+    def get_inertia_tensor(self) -> np.ndarray:
+        """3x3 inertia tensor about the center of mass (isotropic from the scalar inertia by default)"""
+        if self.inertia_tensor is not None:
+            return np.asarray(self.inertia_tensor, dtype=float).reshape(3, 3)
+        return np.eye(3) * self.inertia
+    
+    def get_com(self) -> np.ndarray:
+        """Center of mass in the link frame (along the link by default)"""
+        if self.com is not None:
+            return np.asarray(self.com, dtype=float)
+        return np.array([self.center_of_mass, 0.0, 0.0])
+    
+    def get_axis(self) -> np.ndarray:
+        """Unit joint axis in the link frame"""
+        axis = np.asarray(self.axis if self.axis is not None else DEFAULT_JOINT_AXIS, dtype=float)
+        return axis / np.linalg.norm(axis)
+    
+    def get_position_limits(self) -> Tuple[float, float]:
+        """Lower and upper joint position (a full turn, or the link length for prismatic joints, by default)"""
+        if self.position_limits is not None:
+            return float(self.position_limits[0]), float(self.position_limits[1])
+        if self.joint_type == 'prismatic':
+            return 0.0, float(self.length)
+        return -np.pi, np.pi
 
 @dataclass
 class KukaRobot:
@@ -24,6 +62,7 @@ class KukaRobot:
     reach: float  # m
     repeatability: float  # mm
     max_speed: float  # rad/s
+    tool_xyz: Optional[np.ndarray] = None  # m, tool flange in the last link frame
     
     def get_dh_parameters(self) -> List[Dict]:
         """Get Denavit-Hartenberg parameters for the robot"""
@@ -40,15 +79,54 @@ class KukaRobot:
             })
         return dh_params
     
-    def get_mass_matrix(self) -> np.ndarray:
-        """Get mass matrix for the robot"""
-        masses = [link.mass for link in self.links]
-        return np.diag(masses)
+    def get_joint_origins(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Joint frame placements in the previous link frame
+        
+        Links without an explicit origin sit at the end of the previous
+        link, i.e. (length of the previous link, 0, 0) with no rotation.
+        
+        Returns:
+            (rotations of shape (dof, 3, 3), positions of shape (dof, 3))
+        """
+        rotations = np.zeros((self.dof, 3, 3))
+        positions = np.zeros((self.dof, 3))
+        for i, link in enumerate(self.links):
+            if link.origin_rotation is not None:
+                rotations[i] = np.asarray(link.origin_rotation, dtype=float).reshape(3, 3)
+            else:
+                rotations[i] = np.eye(3)
+            if link.origin_xyz is not None:
+                positions[i] = link.origin_xyz
+            elif i > 0:
+                positions[i] = (self.links[i - 1].length, 0.0, 0.0)
+        return rotations, positions
+    
+    def get_joint_limits(self) -> np.ndarray:
+        """Joint position limits, shape (dof, 2) as (lower, upper) rows"""
+        return np.array([link.get_position_limits() for link in self.links])
+    
+    def get_tool_offset(self) -> np.ndarray:
+        """Tool flange position in the last link frame"""
+        if self.tool_xyz is not None:
+            return np.asarray(self.tool_xyz, dtype=float)
+        return np.array([self.links[-1].length, 0.0, 0.0])
+    
+    def get_mass_matrix(self, joint_angles=None) -> np.ndarray:
+        """
+        Joint-space mass matrix M(q) of the rigid-body model (composite
+        rigid body algorithm) at the given joint angles, the zero pose by
+        default; calculate_kuka_mass_matrix_batch evaluates many poses
+        """
+        from .rigid_body import build_rigid_body_model, crba
+        q = np.zeros((1, self.dof)) if joint_angles is None else np.asarray(joint_angles, dtype=float).reshape(1, -1)
+        return crba(build_rigid_body_model(self), q)[0]
     
-    def get_inertia_matrix(self) -> np.ndarray:
-        """Get inertia matrix for the robot"""
-        inertias = [link.inertia for link in self.links]
-        return np.diag(inertias)
+    def get_inertia_matrix(self, joint_angles=None) -> np.ndarray:
+        """Deprecated alias of get_mass_matrix (it used to return the constant diagonal of link inertias)"""
+        warnings.warn("KukaRobot.get_inertia_matrix is deprecated, use get_mass_matrix(joint_angles)",
+                      DeprecationWarning, stacklevel=2)
+        return self.get_mass_matrix(joint_angles)
 
 # KUKA Robot Definitions
 KUKA_KR3_R540 = KukaRobot(
@@ -131,13 +209,29 @@ KUKA_ROBOTS = {
     'KR16 R1610': KUKA_KR16_R1610
 }
 
+# Approximate joint torque limits (Nm)
+KUKA_TORQUE_LIMITS = {
+    'KR3 R540': [50, 50, 20, 20, 10, 10],
+    'KR6 R900': [100, 100, 50, 50, 20, 20],
+    'KR10 R1100': [150, 150, 80, 80, 30, 30],
+    'KR16 R1610': [200, 200, 120, 120, 50, 50]
+}
+
 def get_available_robots() -> List[str]:
-    """Get list of available KUKA robot models"""
-    return list(KUKA_ROBOTS.keys())
+    """Get list of available KUKA robot models (built-in and from the model catalog)"""
+    from .model_registry import get_model_registry
+    return get_model_registry().names()
 
 def get_robot_by_name(name: str) -> KukaRobot:
     """Get KUKA robot configuration by name"""
-    return KUKA_ROBOTS.get(name)
+    from .model_registry import get_model_registry
+    return get_model_registry().get_robot(name)
+
+def get_robot_torque_limits(name: str) -> List[float]:
+    """Get approximate joint torque limits (Nm) of a KUKA robot"""
+    from .model_registry import get_model_registry
+    limits = get_model_registry().get_torque_limits(name)
+    return limits if limits is not None else [100] * 6
 
 def calculate_robot_inertia(robot: KukaRobot) -> float:
     """Calculate total inertia of the robot"""
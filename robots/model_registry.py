@@ -0,0 +1,474 @@
+# robots/model_registry.py
+
+import json
+import os
+import re
+import struct
+import numpy as np
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from .kuka_robots import KukaRobot, RobotLink, KUKA_ROBOTS, KUKA_TORQUE_LIMITS
+from .spatial import rpy_rotation
+
+try:
+    import yaml
+    YAML_AVAILABLE = True
+except ImportError:
+    yaml = None
+    YAML_AVAILABLE = False
+
+MODELS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models')
+MODEL_EXTENSIONS = ('.urdf', '.yaml', '.yml')
+
+# Compiled model blob: magic, header length, JSON header, padding, then a
+# little-endian float64 (dof, 34) array with one row per joint: the scalar
+# parameters, torque limit, the resolved 3D geometry and the joint limits
+BLOB_MAGIC = b'KUKAMDL1'
+BLOB_VERSION = 3
+BLOB_COLUMNS = (('mass', 1), ('length', 1), ('inertia', 1), ('center_of_mass', 1), ('torque_limit', 1),
+                ('inertia_tensor', 9), ('com', 3), ('axis', 3), ('origin_xyz', 3), ('origin_rotation', 9),
+                ('position_limits', 2))
+BLOB_WIDTH = sum(width for _, width in BLOB_COLUMNS)
+
+DEFAULT_TORQUE_LIMIT = 100.0
+ACTUATED_JOINTS = {'revolute': 'revolute', 'continuous': 'revolute', 'prismatic': 'prismatic'}
+
+# Only this much of a model file is read to find its name during discovery
+_PEEK_BYTES = 4096
+_YAML_NAME = re.compile(r'^name:\s*["\']?(.+?)["\']?\s*$', re.MULTILINE)
+_URDF_NAME = re.compile(r'<robot\b[^>]*\bname\s*=\s*["\']([^"\']+)["\']')
+
+def _vector(text: Optional[str], default=(0.0, 0.0, 0.0)) -> np.ndarray:
+    return np.array([float(v) for v in text.split()] if text else default, dtype=np.float64)
+
+def _origin(element: Optional[ET.Element]) -> Tuple[np.ndarray, np.ndarray]:
+    """Rotation and position of an URDF <origin> element"""
+    if element is None:
+        return np.eye(3), np.zeros(3)
+    return rpy_rotation(_vector(element.get('rpy'))), _vector(element.get('xyz'))
+
+def _link_inertial(link: ET.Element) -> Tuple[float, np.ndarray, np.ndarray]:
+    """Mass, COM and inertia tensor about the COM of an URDF link, in the link frame"""
+    inertial = link.find('inertial')
+    if inertial is None:
+        return 0.0, np.zeros(3), np.zeros((3, 3))
+    R, com = _origin(inertial.find('origin'))
+    tensor = inertial.find('inertia')
+    i = {key: float(tensor.get(key, 0.0)) if tensor is not None else 0.0
+         for key in ('ixx', 'ixy', 'ixz', 'iyy', 'iyz', 'izz')}
+    I = np.array([[i['ixx'], i['ixy'], i['ixz']],
+                  [i['ixy'], i['iyy'], i['iyz']],
+                  [i['ixz'], i['iyz'], i['izz']]])
+    return float(inertial.find('mass').get('value')), com, R @ I @ R.T
+
+def _combine_bodies(bodies: List[Tuple[float, np.ndarray, np.ndarray]]) -> Tuple[float, np.ndarray, np.ndarray]:
+    """Lump rigidly attached bodies (mass, COM, inertia about COM) into one"""
+    mass = sum(body[0] for body in bodies)
+    if mass <= 0.0:
+        return 0.0, np.zeros(3), np.zeros((3, 3))
+    com = sum(body[0] * body[1] for body in bodies) / mass
+    inertia = np.zeros((3, 3))
+    for m, c, I in bodies:
+        d = c - com
+        inertia += I + m * (d @ d * np.eye(3) - np.outer(d, d))
+    return mass, com, inertia
+
+def parse_urdf_model(path: str) -> Tuple[KukaRobot, List[float]]:
+    """
+    Convert a serial-chain URDF into a KukaRobot
+
+    Every revolute/continuous/prismatic joint becomes one link of the
+    model, with the joint origin, axis and the child link's inertia tensor
+    and COM. Links attached by fixed joints are lumped into the moving link
+    they hang from, and fixed joints after the last actuated joint give the
+    tool flange. The scalar parameters of the planar model are derived from
+    the 3D data: length is the distance to the next joint, center_of_mass
+    the COM distance and inertia the tensor component about the joint axis.
+    Joint <limit effort> values become the torque limits and <limit lower
+    upper> the position limits of revolute and prismatic joints (continuous
+    joints keep a full turn). Catalog data that
+    URDF has no place for is read from an optional
+    <kuka model="" max_payload="" reach="" repeatability=""/> element under
+    <robot>.
+
+    Returns:
+        (robot, torque limits in Nm)
+    """
+    root = ET.parse(path).getroot()
+    name = root.get('name') or os.path.splitext(os.path.basename(path))[0]
+    links = {link.get('name'): link for link in root.findall('link')}
+    joints_by_parent: Dict[str, List[ET.Element]] = {}
+    children = set()
+    for joint in root.findall('joint'):
+        parent = joint.find('parent').get('link')
+        joints_by_parent.setdefault(parent, []).append(joint)
+        children.add(joint.find('child').get('link'))
+
+    roots = [link for link in links if link not in children]
+    if len(roots) != 1:
+        raise ValueError(f"{path}: expected a single root link, found {len(roots)}")
+
+    # Walk the chain from the root. (R, p) is the pose of the current link
+    # in the frame of the last actuated joint; bodies collects the inertials
+    # rigidly attached to that joint.
+    chain = []
+    R, p = np.eye(3), np.zeros(3)
+    bodies = None
+    current = roots[0]
+    while current in joints_by_parent:
+        branches = joints_by_parent[current]
+        if len(branches) != 1:
+            raise ValueError(f"{path}: link {current} branches, only serial chains are supported")
+        joint = branches[0]
+        R_origin, p_origin = _origin(joint.find('origin'))
+        R, p = R @ R_origin, p + R @ p_origin
+        child = links[joint.find('child').get('link')]
+        mass, com, inertia = _link_inertial(child)
+        if joint.get('type') in ACTUATED_JOINTS:
+            bodies = [(mass, com, inertia)]
+            chain.append((joint, R, p, bodies))
+            R, p = np.eye(3), np.zeros(3)
+        elif bodies is not None:
+            bodies.append((mass, p + R @ com, R @ inertia @ R.T))
+        current = child.get('name')
+    if not chain:
+        raise ValueError(f"{path}: no actuated joints")
+    tool_xyz = p
+
+    robot_links = []
+    torque_limits = []
+    velocities = []
+    for i, (joint, origin_rotation, origin_xyz, bodies) in enumerate(chain):
+        mass, com, inertia_tensor = _combine_bodies(bodies)
+        axis_element = joint.find('axis')
+        axis = _vector(axis_element.get('xyz') if axis_element is not None else None, (1.0, 0.0, 0.0))
+        axis = axis / np.linalg.norm(axis)
+        next_joint = chain[i + 1][2] if i + 1 < len(chain) else tool_xyz
+        limit = joint.find('limit')
+        position_limits = None
+        if (joint.get('type') != 'continuous' and limit is not None
+                and limit.get('lower') is not None and limit.get('upper') is not None):
+            position_limits = (float(limit.get('lower')), float(limit.get('upper')))
+        robot_links.append(RobotLink(mass=mass,
+                                     length=float(np.linalg.norm(next_joint)),
+                                     inertia=float(axis @ inertia_tensor @ axis),
+                                     center_of_mass=float(np.linalg.norm(com)),
+                                     joint_type=ACTUATED_JOINTS[joint.get('type')],
+                                     inertia_tensor=inertia_tensor,
+                                     com=com,
+                                     axis=axis,
+                                     origin_xyz=origin_xyz,
+                                     origin_rotation=origin_rotation,
+                                     position_limits=position_limits))
+        torque_limits.append(float(limit.get('effort', DEFAULT_TORQUE_LIMIT)) if limit is not None
+                             else DEFAULT_TORQUE_LIMIT)
+        if limit is not None and limit.get('velocity') is not None:
+            velocities.append(float(limit.get('velocity')))
+
+    catalog = root.find('kuka')
+    catalog = catalog.attrib if catalog is not None else {}
+    robot = KukaRobot(
+        name=name,
+        model=catalog.get('model', name),
+        dof=len(robot_links),
+        links=robot_links,
+        max_payload=float(catalog.get('max_payload', 0.0)),
+        reach=float(catalog.get('reach', sum(link.length for link in robot_links))),
+        repeatability=float(catalog.get('repeatability', 0.0)),
+        # The slowest joint bounds the robot speed
+        max_speed=min(velocities) if velocities else 0.0,
+        tool_xyz=tool_xyz
+    )
+    return robot, torque_limits
+
+def _inertia_tensor(value) -> np.ndarray:
+    """3x3 tensor from a nested list or [ixx, iyy, izz, ixy, ixz, iyz]"""
+    values = np.asarray(value, dtype=np.float64)
+    if values.shape == (6,):
+        ixx, iyy, izz, ixy, ixz, iyz = values
+        return np.array([[ixx, ixy, ixz], [ixy, iyy, iyz], [ixz, iyz, izz]])
+    return values.reshape(3, 3)
+
+def parse_yaml_model(path: str) -> Tuple[KukaRobot, List[float]]:
+    """
+    Read a robot model from YAML
+
+    The file holds the KukaRobot fields at the top level and one mapping
+    per link under 'links'; a link may carry a 'torque_limit' (Nm) and the
+    optional 3D geometry 'inertia_tensor' (3x3 or [ixx, iyy, izz, ixy, ixz,
+    iyz]), 'com', 'axis', 'origin_xyz' and 'origin_rpy', and 'position_limits'
+    ([lower, upper] in rad, or m for prismatic joints).
+
+    Returns:
+        (robot, torque limits in Nm)
+    """
+    if not YAML_AVAILABLE:
+        raise ImportError(f"PyYAML is required to load {path} (pip install pyyaml)")
+    with open(path, 'r', encoding='utf-8') as f:
+        data = yaml.safe_load(f)
+
+    links = []
+    torque_limits = []
+    for link in data['links']:
+        links.append(RobotLink(mass=float(link['mass']),
+                               length=float(link['length']),
+                               inertia=float(link['inertia']),
+                               center_of_mass=float(link['center_of_mass']),
+                               joint_type=link.get('joint_type', 'revolute'),
+                               inertia_tensor=_inertia_tensor(link['inertia_tensor']) if 'inertia_tensor' in link else None,
+                               com=np.asarray(link['com'], dtype=np.float64) if 'com' in link else None,
+                               axis=np.asarray(link['axis'], dtype=np.float64) if 'axis' in link else None,
+                               origin_xyz=np.asarray(link['origin_xyz'], dtype=np.float64) if 'origin_xyz' in link else None,
+                               origin_rotation=rpy_rotation(link['origin_rpy']) if 'origin_rpy' in link else None,
+                               position_limits=tuple(float(v) for v in link['position_limits'])
+                               if 'position_limits' in link else None))
+        torque_limits.append(float(link.get('torque_limit', DEFAULT_TORQUE_LIMIT)))
+
+    robot = KukaRobot(
+        name=str(data['name']),
+        model=str(data.get('model', data['name'])),
+        dof=len(links),
+        links=links,
+        max_payload=float(data.get('max_payload', 0.0)),
+        reach=float(data.get('reach', sum(link.length for link in links))),
+        repeatability=float(data.get('repeatability', 0.0)),
+        max_speed=float(data.get('max_speed', 0.0)),
+        tool_xyz=np.asarray(data['tool_xyz'], dtype=np.float64) if 'tool_xyz' in data else None
+    )
+    return robot, torque_limits
+
+def write_model_blob(filename: str, robot: KukaRobot, torque_limits: List[float],
+                     source: Optional[os.stat_result] = None) -> str:
+    """Write a parsed model as a memory-mappable blob (atomically)"""
+    header = {
+        'version': BLOB_VERSION,
+        'name': robot.name,
+        'model': robot.model,
+        'dof': robot.dof,
+        'max_payload': robot.max_payload,
+        'reach': robot.reach,
+        'repeatability': robot.repeatability,
+        'max_speed': robot.max_speed,
+        'joint_types': [link.joint_type for link in robot.links],
+        'columns': [list(column) for column in BLOB_COLUMNS],
+        'tool_xyz': robot.get_tool_offset().tolist(),
+        'total_mass': sum(link.mass for link in robot.links),
+        'total_inertia': sum(link.inertia for link in robot.links),
+        'source_mtime_ns': source.st_mtime_ns if source else None,
+        'source_size': source.st_size if source else None
+    }
+    rotations, positions = robot.get_joint_origins()
+    data = np.array([np.concatenate([[link.mass, link.length, link.inertia, link.center_of_mass, limit],
+                                     link.get_inertia_tensor().ravel(), link.get_com(), link.get_axis(),
+                                     position, rotation.ravel(), link.get_position_limits()])
+                     for link, limit, position, rotation in zip(robot.links, torque_limits, positions, rotations)],
+                    dtype='<f8')
+    encoded = json.dumps(header).encode('utf-8')
+    # Pad so the array starts on an 8-byte boundary
+    encoded += b' ' * (-(len(BLOB_MAGIC) + 8 + len(encoded)) % 8)
+
+    os.makedirs(os.path.dirname(filename) or '.', exist_ok=True)
+    temporary = f"{filename}.{os.getpid()}.tmp"
+    with open(temporary, 'wb') as f:
+        f.write(BLOB_MAGIC)
+        f.write(struct.pack('<Q', len(encoded)))
+        f.write(encoded)
+        f.write(data.tobytes())
+    os.replace(temporary, filename)
+    return filename
+
+def read_model_blob(filename: str) -> Tuple[dict, np.ndarray]:
+    """
+    Open a model blob
+
+    Returns:
+        (header, read-only memory-mapped (dof, BLOB_WIDTH) parameter array)
+    """
+    with open(filename, 'rb') as f:
+        if f.read(len(BLOB_MAGIC)) != BLOB_MAGIC:
+            raise ValueError(f"{filename} is not a model blob")
+        (length,) = struct.unpack('<Q', f.read(8))
+        header = json.loads(f.read(length).decode('utf-8'))
+    if header.get('version') != BLOB_VERSION:
+        raise ValueError(f"{filename} has blob version {header.get('version')}, expected {BLOB_VERSION}")
+    data = np.memmap(filename, dtype='<f8', mode='r', offset=len(BLOB_MAGIC) + 8 + length,
+                     shape=(header['dof'], BLOB_WIDTH))
+    return header, data
+
+def robot_from_blob(header: dict, data: np.ndarray) -> Tuple[KukaRobot, List[float]]:
+    columns = {}
+    start = 0
+    for name, width in BLOB_COLUMNS:
+        columns[name] = data[:, start:start + width]
+        start += width
+    links = []
+    for i, joint_type in enumerate(header['joint_types']):
+        links.append(RobotLink(mass=float(columns['mass'][i, 0]), length=float(columns['length'][i, 0]),
+                               inertia=float(columns['inertia'][i, 0]),
+                               center_of_mass=float(columns['center_of_mass'][i, 0]), joint_type=joint_type,
+                               inertia_tensor=columns['inertia_tensor'][i].reshape(3, 3),
+                               com=columns['com'][i], axis=columns['axis'][i],
+                               origin_xyz=columns['origin_xyz'][i],
+                               origin_rotation=columns['origin_rotation'][i].reshape(3, 3),
+                               position_limits=tuple(float(v) for v in columns['position_limits'][i])))
+    robot = KukaRobot(name=header['name'], model=header['model'], dof=header['dof'], links=links,
+                      max_payload=header['max_payload'], reach=header['reach'],
+                      repeatability=header['repeatability'], max_speed=header['max_speed'],
+                      tool_xyz=np.array(header['tool_xyz']))
+    return robot, [float(limit) for limit in columns['torque_limit'][:, 0]]
+
+def _peek_model_name(path: str) -> Optional[str]:
+    """Model name from the start of a file, without parsing it"""
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        head = f.read(_PEEK_BYTES)
+    match = (_URDF_NAME if path.endswith('.urdf') else _YAML_NAME).search(head)
+    return match.group(1).strip() if match else None
+
+class RobotModelRegistry:
+    """
+    Built-in KUKA models plus the models found in a directory of URDF and
+    YAML files.
+
+    Discovery only reads the model name of every file (kept in an index
+    keyed by file size and modification time), so listing a large catalog
+    is cheap. A model is parsed the first time it is requested and the
+    result is stored as a blob in the cache directory; later sessions
+    memory-map the blob instead of parsing again until the source file
+    changes. A file model with the same name as a built-in replaces it.
+    """
+
+    def __init__(self, models_dir: str = MODELS_DIR, cache_dir: Optional[str] = None):
+        self.models_dir = models_dir
+        self.cache_dir = cache_dir or os.path.join(models_dir, '.cache')
+        self._files: Optional[Dict[str, str]] = None
+        self._loaded: Dict[str, Tuple[KukaRobot, List[float]]] = {}
+
+    @property
+    def index_path(self) -> str:
+        return os.path.join(self.cache_dir, 'index.json')
+
+    def refresh(self):
+        """Forget discovered files and loaded models (picks up catalog changes)"""
+        self._files = None
+        self._loaded.clear()
+
+    def _discover(self) -> Dict[str, str]:
+        if self._files is not None:
+            return self._files
+
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            index = {}
+
+        files = {}
+        updated = {}
+        if os.path.isdir(self.models_dir):
+            for entry in sorted(os.scandir(self.models_dir), key=lambda e: e.name):
+                if not entry.is_file() or not entry.name.lower().endswith(MODEL_EXTENSIONS):
+                    continue
+                if not entry.name.lower().endswith('.urdf') and not YAML_AVAILABLE:
+                    continue
+                stat = entry.stat()
+                cached = index.get(entry.name)
+                if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+                    name = cached[2]
+                else:
+                    name = _peek_model_name(entry.path)
+                if name:
+                    files[name] = entry.path
+                    updated[entry.name] = [stat.st_mtime_ns, stat.st_size, name]
+
+        if updated != index:
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                temporary = f"{self.index_path}.{os.getpid()}.tmp"
+                with open(temporary, 'w', encoding='utf-8') as f:
+                    json.dump(updated, f)
+                os.replace(temporary, self.index_path)
+            except OSError:
+                # A read-only catalog still works, just without the index
+                pass
+
+        self._files = files
+        return files
+
+    def names(self) -> List[str]:
+        """Built-in model names followed by file models in file name order"""
+        names = list(KUKA_ROBOTS.keys())
+        names += [name for name in self._discover() if name not in KUKA_ROBOTS]
+        return names
+
+    def _blob_path(self, source: str) -> str:
+        return os.path.join(self.cache_dir, os.path.basename(source) + '.kmodel')
+
+    def _load(self, name: str) -> Optional[Tuple[KukaRobot, List[float]]]:
+        if name in self._loaded:
+            return self._loaded[name]
+
+        source = self._discover().get(name)
+        if source is None:
+            if name not in KUKA_ROBOTS:
+                return None
+            return KUKA_ROBOTS[name], KUKA_TORQUE_LIMITS.get(name, [DEFAULT_TORQUE_LIMIT] * KUKA_ROBOTS[name].dof)
+
+        stat = os.stat(source)
+        blob = self._blob_path(source)
+        loaded = None
+        try:
+            header, data = read_model_blob(blob)
+            if (header['source_mtime_ns'] == stat.st_mtime_ns and header['source_size'] == stat.st_size
+                    and header['name'] == name):
+                loaded = robot_from_blob(header, data)
+        except (OSError, ValueError, KeyError):
+            pass
+
+        if loaded is None:
+            parse = parse_urdf_model if source.lower().endswith('.urdf') else parse_yaml_model
+            loaded = parse(source)
+            try:
+                write_model_blob(blob, *loaded, source=stat)
+            except OSError:
+                pass
+
+        self._loaded[name] = loaded
+        return loaded
+
+    def get_robot(self, name: str) -> Optional[KukaRobot]:
+        loaded = self._load(name)
+        return loaded[0] if loaded else None
+
+    def get_torque_limits(self, name: str) -> Optional[List[float]]:
+        loaded = self._load(name)
+        return list(loaded[1]) if loaded else None
+
+class _RegistryState:
+    registry = None
+
+_state = _RegistryState()
+
+def get_model_registry() -> RobotModelRegistry:
+    """Shared registry over KUKA_MODELS_DIR (default: robots/models)"""
+    if _state.registry is None:
+        _state.registry = RobotModelRegistry(os.environ.get('KUKA_MODELS_DIR', MODELS_DIR))
+    return _state.registry
+
+def set_models_dir(models_dir: str, cache_dir: Optional[str] = None):
+    """Point the shared registry at another model catalog"""
+    _state.registry = RobotModelRegistry(models_dir, cache_dir)
+
+def model_slug(name: str) -> str:
+    """File name safe form of a model name, e.g. 'KR10 R1100' -> 'KR10_R1100'"""
+    return re.sub(r'[^A-Za-z0-9]+', '_', name).strip('_')
+
+def _init_worker(models_dir: str, cache_dir: str):
+    # Spawned workers start with the default catalog
+    set_models_dir(models_dir, cache_dir)
+
+def model_process_pool(workers: int) -> ProcessPoolExecutor:
+    """Process pool whose workers see the same model catalog as this process"""
+    registry = get_model_registry()
+    return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                               initargs=(registry.models_dir, registry.cache_dir))
@@ -0,0 +1,330 @@
+# robots/rigid_body.py
+
+import numpy as np
+from dataclasses import dataclass, replace
+from typing import List, Tuple
+from .kuka_robots import KukaRobot
+from .spatial import (spatial_inertia, apply_inertia, motion_cross, force_cross, transform_motion,
+                      inverse_transform_force, inertia_to_parent, transform_matrix, motion_subspace,
+                      joint_transform, _cross)
+
+# Gravity in the z-up base frame (m/s²)
+GRAVITY_VECTOR = (0.0, 0.0, -9.81)
+
+@dataclass
+class RigidBodyModel:
+    """Serial-chain rigid-body model of a robot as arrays indexed by joint"""
+    joint_types: List[str]
+    axes: np.ndarray  # (dof, 3) unit joint axes in the joint frames
+    motion_subspaces: np.ndarray  # (dof, 6)
+    origin_rotations: np.ndarray  # (dof, 3, 3) joint frames in the previous link frames
+    origin_positions: np.ndarray  # (dof, 3)
+    inertias: np.ndarray  # (dof, 6, 6) spatial inertias about the joint origins
+    tool_xyz: np.ndarray  # (3,) tool flange in the last link frame
+
+    @property
+    def dof(self) -> int:
+        return len(self.joint_types)
+
+    def joint_transforms(self, i: int, q: np.ndarray):
+        """Parent-to-link transforms (E, r) of joint i for joint positions q of shape (N,)"""
+        return joint_transform(self.joint_types[i], self.axes[i], self.origin_rotations[i],
+                               self.origin_positions[i], q)
+
+def build_rigid_body_model(robot: KukaRobot, dtype=np.float64) -> RigidBodyModel:
+    """Rigid-body model of a robot from its (possibly derived) 3D link geometry"""
+    rotations, positions = robot.get_joint_origins()
+    joint_types = [link.joint_type for link in robot.links]
+    axes = np.array([link.get_axis() for link in robot.links], dtype=dtype)
+    return RigidBodyModel(
+        joint_types=joint_types,
+        axes=axes,
+        motion_subspaces=np.array([motion_subspace(t, a, dtype) for t, a in zip(joint_types, axes)]),
+        origin_rotations=rotations.astype(dtype),
+        origin_positions=positions.astype(dtype),
+        inertias=np.array([spatial_inertia(np.float64(link.mass), link.get_com(), link.get_inertia_tensor())
+                           for link in robot.links], dtype=dtype),
+        tool_xyz=robot.get_tool_offset().astype(dtype)
+    )
+
+def add_payload(model: RigidBodyModel, mass: float, com=None) -> RigidBodyModel:
+    """
+    Copy of a model carrying a point-mass payload on the last link
+
+    Args:
+        model: Rigid-body model
+        mass: Payload mass in kg
+        com: Payload center of mass relative to the tool flange, in the last
+            link frame (m); at the flange by default
+
+    Returns:
+        RigidBodyModel with the payload added to the last link inertia
+    """
+    if mass == 0:
+        return model
+    position = model.tool_xyz + (np.asarray(com, dtype=model.tool_xyz.dtype) if com is not None else 0.0)
+    inertias = model.inertias.copy()
+    # Spatial inertias about the same frame origin add up
+    inertias[-1] += spatial_inertia(np.float64(mass), position, np.zeros((3, 3)))
+    return replace(model, inertias=inertias)
+
+def rnea(model: RigidBodyModel, q: np.ndarray, qd: np.ndarray, qdd: np.ndarray,
+         gravity=GRAVITY_VECTOR) -> np.ndarray:
+    """
+    Recursive Newton-Euler inverse dynamics over a batch of joint states
+
+    The outward pass propagates link velocities and accelerations (gravity
+    enters as an upward base acceleration), the inward pass accumulates
+    link forces and projects them on the joint axes. Each pass loops over
+    the joints only; every step is vectorized over the batch.
+
+    Args:
+        model: Rigid-body model
+        q, qd, qdd: Joint positions, velocities and accelerations, shape (N, dof)
+        gravity: Gravity vector in the base frame, or None to leave gravity out
+
+    Returns:
+        Joint torques (forces for prismatic joints), shape (N, dof)
+    """
+    v, a = _base_motion(q.shape[0], q.dtype, gravity)
+    transforms = []
+    forces = []
+    for i in range(model.dof):
+        E, r = model.joint_transforms(i, q[:, i])
+        v, a, f = _outward_step(model, i, E, r, v, a, qd[:, i], qdd[:, i])
+        forces.append(f)
+        transforms.append((E, r))
+    return _inward_pass(model, transforms, forces)
+
+def _base_motion(n: int, dtype, gravity):
+    """Base velocity and acceleration (gravity as an upward acceleration) of n states"""
+    a = np.zeros((n, 6), dtype=dtype)
+    if gravity is not None:
+        a[:, 3:] = -np.asarray(gravity, dtype=dtype)
+    return np.zeros((n, 6), dtype=dtype), a
+
+def _outward_step(model: RigidBodyModel, i: int, E, r, v, a, qd_i, qdd_i):
+    """Velocity, acceleration and net body force of link i from those of its parent"""
+    S = model.motion_subspaces[i]
+    vJ = S * qd_i[:, None]
+    v = transform_motion(E, r, v) + vJ
+    a = transform_motion(E, r, a) + S * qdd_i[:, None] + motion_cross(v, vJ)
+    Iv = apply_inertia(model.inertias[i], v)
+    return v, a, apply_inertia(model.inertias[i], a) + force_cross(v, Iv)
+
+def _inward_pass(model: RigidBodyModel, transforms, forces) -> np.ndarray:
+    """Accumulate body forces towards the base and project them on the joint axes"""
+    dof = model.dof
+    tau = np.empty((forces[0].shape[0], dof), dtype=forces[0].dtype)
+    f = forces[-1]
+    for i in range(dof - 1, -1, -1):
+        tau[:, i] = f @ model.motion_subspaces[i]
+        if i > 0:
+            E, r = transforms[i]
+            f = forces[i - 1] + inverse_transform_force(E, r, f)
+    return tau
+
+def crba(model: RigidBodyModel, q: np.ndarray, transforms=None) -> np.ndarray:
+    """
+    Joint-space mass matrix M(q) by the composite rigid body algorithm
+
+    The inward pass folds every link inertia into its parent (composite
+    inertias); column i of M is the force the composite body i needs for
+    a unit acceleration of joint i, carried towards the base and projected
+    on the proximal joint axes.
+
+    Args:
+        model: Rigid-body model
+        q: Joint positions, shape (N, dof)
+        transforms: Joint transforms (E, r) per joint if already computed
+
+    Returns:
+        Symmetric positive definite mass matrices, shape (N, dof, dof)
+    """
+    dof = model.dof
+    if transforms is None:
+        transforms = [model.joint_transforms(i, q[:, i]) for i in range(dof)]
+    composite = [np.broadcast_to(model.inertias[i], (q.shape[0], 6, 6)) for i in range(dof)]
+    M = np.empty((q.shape[0], dof, dof), dtype=q.dtype)
+    for i in range(dof - 1, -1, -1):
+        if i > 0:
+            composite[i - 1] = composite[i - 1] + inertia_to_parent(*transforms[i], composite[i])
+        f = composite[i] @ model.motion_subspaces[i]
+        M[:, i, i] = f @ model.motion_subspaces[i]
+        for j in range(i - 1, -1, -1):
+            f = inverse_transform_force(*transforms[j + 1], f)
+            M[:, i, j] = M[:, j, i] = f @ model.motion_subspaces[j]
+    return M
+
+def cholesky_solve(L: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    Solve M x = b from the lower Cholesky factors L of a batch of matrices
+
+    Args:
+        L: np.linalg.cholesky(M), shape (N, dof, dof)
+        b: Right-hand sides, shape (N, dof)
+
+    Returns:
+        x, shape (N, dof)
+    """
+    dof = L.shape[-1]
+    y = np.empty_like(b)
+    # Forward substitution L y = b, then back substitution L^T x = y,
+    # one joint at a time and vectorized over the batch
+    for i in range(dof):
+        y[:, i] = (b[:, i] - np.einsum('nj,nj->n', L[:, i, :i], y[:, :i])) / L[:, i, i]
+    x = np.empty_like(b)
+    for i in range(dof - 1, -1, -1):
+        x[:, i] = (y[:, i] - np.einsum('nj,nj->n', L[:, i + 1:, i], x[:, i + 1:])) / L[:, i, i]
+    return x
+
+def link_mass_properties(model: RigidBodyModel) -> Tuple[np.ndarray, np.ndarray]:
+    """Link masses (dof,) and centers of mass in the link frames (dof, 3), read back from the spatial inertias"""
+    mass = model.inertias[:, 3, 3]
+    # Upper right block is m skew(com)
+    C = model.inertias[:, :3, 3:]
+    com = np.stack([C[:, 2, 1], C[:, 0, 2], C[:, 1, 0]], axis=1) / np.where(mass > 0, mass, 1.0)[:, None]
+    return mass, com
+
+def lagrangian_mass_matrix(model: RigidBodyModel, q: np.ndarray) -> np.ndarray:
+    """
+    Mass matrix from the kinetic energy, M(q) = sum_i J_iᵀ I_i J_i over the
+    body Jacobians J_i of the links (N, dof, dof)
+
+    Same result as crba by a different route; used to cross-check it.
+    """
+    X = [transform_matrix(*model.joint_transforms(i, q[:, i])) for i in range(model.dof)]
+    return _jacobian_mass_terms(model, X, 0, *_empty_mass_terms(model, q))[-1][1]
+
+def _empty_mass_terms(model: RigidBodyModel, q: np.ndarray):
+    n, dof = q.shape
+    return np.zeros((n, 6, dof), dtype=q.dtype), np.zeros((n, dof, dof), dtype=q.dtype)
+
+def _jacobian_mass_terms(model: RigidBodyModel, X, start: int, J, M):
+    """(J_i, partial M after link i) for links start.. from the link motion transforms X"""
+    terms = []
+    for i in range(start, model.dof):
+        J = np.matmul(X[i], J)
+        J[:, :, i] = model.motion_subspaces[i]
+        M = M + np.matmul(np.swapaxes(J, 1, 2), np.matmul(model.inertias[i], J))
+        terms.append((J, M))
+    return terms
+
+def lagrangian_torques(model: RigidBodyModel, q: np.ndarray, qd: np.ndarray, qdd: np.ndarray,
+                       gravity=GRAVITY_VECTOR, step: float = 1e-5) -> np.ndarray:
+    """
+    Inverse dynamics from the Euler-Lagrange equations, independent of the
+    Newton-Euler recursion
+
+        τ = M q̈ + Ṁ q̇ - ½ ∂(q̇ᵀ M q̇)/∂q + ∂V/∂q
+
+    M comes from the link Jacobians (lagrangian_mass_matrix), its
+    derivatives from central differences with the given step (truncation
+    error ~step²), and ∂V/∂q analytically from the link centers of mass.
+
+    Args:
+        model: Rigid-body model
+        q, qd, qdd: Joint positions, velocities and accelerations, shape (N, dof)
+        gravity: Gravity vector in the base frame, or None to leave gravity out
+        step: Finite-difference step in rad (m)
+
+    Returns:
+        Joint torques (forces for prismatic joints), shape (N, dof)
+    """
+    dof = model.dof
+    X = [transform_matrix(*model.joint_transforms(i, q[:, i])) for i in range(dof)]
+    terms = _jacobian_mass_terms(model, X, 0, *_empty_mass_terms(model, q))
+    tau = np.einsum('nij,nj->ni', terms[-1][1], qdd)
+    # Ṁ q̇ is the derivative of M along q̇
+    dM = lagrangian_mass_matrix(model, q + step * qd) - lagrangian_mass_matrix(model, q - step * qd)
+    tau += np.einsum('nij,nj->ni', dM, qd) / (2 * step)
+    # Moving joint k alone leaves the Jacobians and mass terms of the links before it unchanged
+    for k in range(dof):
+        start = terms[k - 1] if k > 0 else _empty_mass_terms(model, q)
+        moved = []
+        for sign in (1.0, -1.0):
+            X_k = list(X)
+            X_k[k] = transform_matrix(*model.joint_transforms(k, q[:, k] + sign * step))
+            moved.append(_jacobian_mass_terms(model, X_k, k, *start)[-1][1])
+        tau[:, k] -= np.einsum('ni,nij,nj->n', qd, moved[0] - moved[1], qd) / (4 * step)
+
+    if gravity is not None:
+        # V = -sum_i m_i gᵀ c_i, and ∂c_i/∂q_k = z_k x (c_i - p_k) (z_k for prismatic joints)
+        g = np.asarray(gravity, dtype=q.dtype)
+        mass, com = link_mass_properties(model)
+        poses = frame_poses(model, q)
+        centers = [p + np.einsum('nij,j->ni', R, com[i]) for i, (R, p) in enumerate(poses)]
+        for k, (R, p) in enumerate(poses):
+            z = R @ model.axes[k]
+            # Mass-weighted sum of the distal centers of mass
+            moment = sum(mass[i] * centers[i] for i in range(k, dof))
+            if model.joint_types[k] == 'prismatic':
+                tau[:, k] -= mass[k:].sum() * (z @ g)
+            else:
+                tau[:, k] -= _cross(z, moment - mass[k:].sum() * p) @ g
+    return tau
+
+def potential_energy(model: RigidBodyModel, q: np.ndarray, gravity=GRAVITY_VECTOR) -> np.ndarray:
+    """
+    Gravitational potential energy V = -sum_i m_i gᵀ c_i of a batch of
+    joint positions, zero with all centers of mass at the base origin, shape (N,)
+    """
+    g = np.asarray(gravity, dtype=q.dtype)
+    mass, com = link_mass_properties(model)
+    V = np.zeros(q.shape[0], dtype=q.dtype)
+    for i, (R, p) in enumerate(frame_poses(model, q)):
+        V -= mass[i] * ((p + np.einsum('nij,j->ni', R, com[i])) @ g)
+    return V
+
+def frame_poses(model: RigidBodyModel, q: np.ndarray) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Base-frame poses of the joint frames over a batch of joint positions
+
+    Returns:
+        One (rotation (N, 3, 3), position (N, 3)) pair per joint
+    """
+    R, p = _base_pose(q.shape[0], q.dtype)
+    poses = []
+    for i in range(model.dof):
+        R, p = _pose_step(R, p, *model.joint_transforms(i, q[:, i]))
+        poses.append((R, p))
+    return poses
+
+def _base_pose(n: int, dtype):
+    return np.broadcast_to(np.eye(3, dtype=dtype), (n, 3, 3)), np.zeros((n, 3), dtype=dtype)
+
+def _pose_step(R, p, E, r):
+    """Base-frame pose of a joint frame from its parent's pose and the joint transform"""
+    return np.matmul(R, np.swapaxes(E, -1, -2)), p + np.einsum('nij,nj->ni', R, r)
+
+def tool_pose(model: RigidBodyModel, q: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Tool flange orientation (N, 3, 3) and position (N, 3) in the base frame"""
+    R, p = frame_poses(model, q)[-1]
+    return R, p + R @ model.tool_xyz
+
+def geometric_jacobian(model: RigidBodyModel, q: np.ndarray,
+                       poses: List[Tuple[np.ndarray, np.ndarray]] = None) -> np.ndarray:
+    """
+    Geometric Jacobian of the tool flange in the base frame
+
+    Args:
+        model: Rigid-body model
+        q: Joint positions, shape (N, dof)
+        poses: frame_poses(model, q) if already computed
+
+    Returns:
+        Jacobians of shape (N, 6, dof), rows [angular; linear] as spatial motion vectors
+    """
+    if poses is None:
+        poses = frame_poses(model, q)
+    R_tool, p_tool = poses[-1]
+    p_tool = p_tool + R_tool @ model.tool_xyz
+    J = np.zeros((q.shape[0], 6, model.dof), dtype=q.dtype)
+    for i, (R, p) in enumerate(poses):
+        axis = R @ model.axes[i]
+        if model.joint_types[i] == 'prismatic':
+            J[:, 3:, i] = axis
+        else:
+            J[:, :3, i] = axis
+            J[:, 3:, i] = _cross(axis, p_tool - p)
+    return J
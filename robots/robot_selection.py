@@ -0,0 +1,272 @@
+# robots/robot_selection.py
+"""
+Task-based robot selection.
+
+A task is a payload plus Cartesian targets: tool positions that must be
+reachable and/or timed tool paths that must be followed. Every candidate
+model solves the task with its own inverse kinematics, dynamics and drive
+train, and the models are ranked by how well they do it.
+
+Usage (from the repository root):
+    python -m robots.robot_selection --payload 5 --path cell_path.csv
+    python -m robots.robot_selection --payload 2 --targets poses.csv --workers 4
+
+Target files hold x,y,z rows (m, z-up base frame); path files hold
+t,x,y,z rows (s, m).
+"""
+
+import argparse
+import os
+import sys
+import numpy as np
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence, Tuple
+from .kuka_robots import get_available_robots, get_robot_by_name, get_robot_torque_limits
+from .kuka_dynamics import calculate_kuka_rigid_body_torques_batch
+from .kuka_ik import solve_kuka_ik_batch
+from .drive_train import calculate_kuka_drive_train_batch, cumulative_energy, default_drive_train, joint_friction
+from .model_registry import model_process_pool
+
+# Random IK seeds per free target, besides the zero pose
+IK_RESTARTS = 8
+# Path poses solved per batch, all seeded from the preceding solution
+PATH_CHUNK = 16
+
+@dataclass
+class ToolPath:
+    """Timed tool path: flange positions (and optionally orientations) over time"""
+    timestamps: np.ndarray  # (T,) s
+    positions: np.ndarray  # (T, 3) m
+    rotations: Optional[np.ndarray] = None  # (T, 3, 3)
+
+@dataclass
+class SelectionTask:
+    """What a robot has to do: carry payload to targets and along paths"""
+    payload: float  # kg
+    targets: Optional[np.ndarray] = None  # (N, 3) m, must be reachable
+    target_rotations: Optional[np.ndarray] = None  # (N, 3, 3)
+    paths: List[ToolPath] = field(default_factory=list)
+
+@dataclass
+class RobotEvaluation:
+    """Result of one robot on a task"""
+    robot_name: str
+    feasible: bool
+    reachable_fraction: float  # reached targets and path samples
+    torque_utilization: float  # peak |joint torque incl. friction| / torque limit, worst joint
+    speed_utilization: float  # peak |joint speed| / max speed, worst joint
+    rms_motor_torque: np.ndarray  # (dof,) Nm over all paths
+    energy: float  # J drawn from the supply over all paths
+    issues: List[str] = field(default_factory=list)
+
+def _solve_reachable(robot_name: str, positions: np.ndarray, rotations, seed: int):
+    """
+    IK for independent targets on a defined branch
+
+    Every target is solved from the same seeds, the zero pose and
+    IK_RESTARTS poses drawn uniformly within the joint limits from seed.
+    Among the converged solutions the one closest to the middle of the
+    joint ranges wins, so the result depends on neither cached
+    configuration indexes nor the order of the targets.
+    """
+    robot = get_robot_by_name(robot_name)
+    limits = robot.get_joint_limits()
+    rng = np.random.default_rng(seed)
+    seeds = np.vstack([np.zeros((1, robot.dof)),
+                       rng.uniform(limits[:, 0], limits[:, 1], (IK_RESTARTS, robot.dof))])
+    n, k = len(positions), len(seeds)
+    result = solve_kuka_ik_batch(robot_name, np.repeat(positions, k, axis=0),
+                                 None if rotations is None else np.repeat(rotations, k, axis=0),
+                                 initial_guess=np.tile(seeds, (n, 1)))
+    q = result.joint_angles.reshape(n, k, robot.dof)
+    converged = result.converged.reshape(n, k)
+    distance = np.where(converged, np.linalg.norm(q - limits.mean(axis=1), axis=2), np.inf)
+    best = distance.argmin(axis=1)
+    return q[np.arange(n), best], converged.any(axis=1)
+
+def _follow_path(robot_name: str, path: ToolPath, seed: int):
+    """
+    Joint trajectory of a tool path
+
+    The first pose is solved like a free target. The rest of the path is
+    solved in batches of PATH_CHUNK poses that all start from the last
+    solution of the previous batch, so the robot stays on one branch of
+    its inverse kinematics along the path.
+    """
+    rotations = path.rotations
+    q, converged = _solve_reachable(robot_name, path.positions[:1],
+                                    None if rotations is None else rotations[:1], seed)
+    q = np.concatenate([q, np.empty((len(path.positions) - 1, q.shape[1]))])
+    converged = np.concatenate([converged, np.empty(len(path.positions) - 1, dtype=bool)])
+    for start in range(1, len(path.positions), PATH_CHUNK):
+        chunk = slice(start, start + PATH_CHUNK)
+        result = solve_kuka_ik_batch(robot_name, path.positions[chunk],
+                                     None if rotations is None else rotations[chunk],
+                                     initial_guess=q[start - 1])
+        q[chunk], converged[chunk] = result.joint_angles, result.converged
+    # The solver wraps angles into [-pi, pi); undo jumps across the seam
+    return np.unwrap(q, axis=0), converged
+
+def evaluate_robot(robot_name: str, task: SelectionTask, seed: int = 0) -> RobotEvaluation:
+    """
+    Evaluate one robot on a task
+
+    Targets are checked for reachability and for the static torque that
+    holds the payload there. Paths are followed with IK, differentiated in
+    time and run through the rigid-body dynamics (with the payload) and
+    the default drive train.
+
+    Args:
+        robot_name: Name of the KUKA robot model
+        task: Payload, targets and paths
+        seed: Seed of the random IK seeds
+
+    Returns:
+        RobotEvaluation of the robot
+    """
+    robot = get_robot_by_name(robot_name)
+    if robot is None:
+        raise ValueError(f"Robot {robot_name} not found")
+
+    limits = np.asarray(get_robot_torque_limits(robot_name)[:robot.dof], dtype=float)
+    drive = default_drive_train(robot_name)
+    issues = []
+    if task.payload > robot.max_payload:
+        issues.append(f"payload {task.payload:g} kg exceeds {robot.max_payload:g} kg")
+
+    reached = 0
+    total = 0
+    peak_torque = np.zeros(robot.dof)
+    peak_speed = 0.0
+    squared_motor_torque = np.zeros(robot.dof)
+    duration = 0.0
+    energy = 0.0
+
+    if task.targets is not None and len(task.targets):
+        targets = np.asarray(task.targets, dtype=float).reshape(-1, 3)
+        q, converged = _solve_reachable(robot_name, targets, task.target_rotations, seed)
+        reached += int(converged.sum())
+        total += len(targets)
+        if converged.any():
+            rest = np.zeros_like(q[converged])
+            static = calculate_kuka_rigid_body_torques_batch(robot_name, q[converged], rest, rest,
+                                                             payload=task.payload, dtype=np.float64)
+            peak_torque = np.maximum(peak_torque, np.abs(static).max(axis=0))
+
+    for path in task.paths:
+        t = np.asarray(path.timestamps, dtype=float)
+        q, converged = _follow_path(robot_name, path, seed)
+        reached += int(converged.sum())
+        total += len(t)
+        if len(t) < 3 or not converged.all():
+            # Dynamics of a path the robot cannot follow mean nothing
+            continue
+        qd = np.gradient(q, t, axis=0)
+        qdd = np.gradient(qd, t, axis=0)
+        tau = calculate_kuka_rigid_body_torques_batch(robot_name, q, qd, qdd, payload=task.payload,
+                                                      dtype=np.float64)
+        peak_torque = np.maximum(peak_torque, np.abs(tau + joint_friction(drive, qd)).max(axis=0))
+        peak_speed = max(peak_speed, float(np.abs(qd).max()))
+        motors = calculate_kuka_drive_train_batch(robot_name, qd, qdd, tau, timestamps=t, drive=drive,
+                                                  dtype=np.float64)
+        squared_motor_torque += cumulative_energy(motors.motor_torque**2, timestamps=t)[-1]
+        duration += t[-1] - t[0]
+        energy += float(motors.supply_energy[-1])
+
+    reachable_fraction = reached / total if total else 1.0
+    torque_utilization = float((peak_torque / limits).max())
+    if robot.max_speed > 0:
+        speed_utilization = peak_speed / robot.max_speed
+    else:
+        # Models imported without a velocity limit
+        speed_utilization = float('nan')
+        issues.append("no joint speed limit in the model")
+    if reachable_fraction < 1.0:
+        issues.append(f"{total - reached} of {total} poses unreachable")
+    if torque_utilization > 1.0:
+        issues.append(f"torque at {torque_utilization:.0%} of limit")
+    if speed_utilization > 1.0:
+        issues.append(f"joint speed at {speed_utilization:.0%} of limit")
+
+    return RobotEvaluation(
+        robot_name=robot_name,
+        feasible=not issues,
+        reachable_fraction=reachable_fraction,
+        torque_utilization=torque_utilization,
+        speed_utilization=speed_utilization,
+        rms_motor_torque=np.sqrt(squared_motor_torque / duration) if duration > 0 else np.zeros(robot.dof),
+        energy=energy,
+        issues=issues
+    )
+
+def _evaluate(args: Tuple[str, SelectionTask, int]) -> RobotEvaluation:
+    return evaluate_robot(*args)
+
+def rank_robots(task: SelectionTask, robot_names: Optional[Sequence[str]] = None,
+                workers: Optional[int] = None, seed: int = 0) -> List[RobotEvaluation]:
+    """
+    Evaluate candidate robots on a task in parallel and rank them
+
+    Feasible robots come first; robots that follow paths are ordered by
+    energy, target-only tasks by torque utilization.
+
+    Args:
+        task: Payload, targets and paths
+        robot_names: Candidates, all available models by default
+        workers: Worker processes, one per candidate and CPU by default; 1 evaluates in this process
+        seed: Seed of the random IK seeds
+
+    Returns:
+        RobotEvaluations, best first
+    """
+    names = list(robot_names) if robot_names is not None else get_available_robots()
+    jobs = [(name, task, seed) for name in names]
+    workers = workers or min(len(names), os.cpu_count() or 1)
+    if workers <= 1 or len(names) <= 1:
+        evaluations = [_evaluate(job) for job in jobs]
+    else:
+        with model_process_pool(min(workers, len(names))) as pool:
+            evaluations = list(pool.map(_evaluate, jobs))
+
+    by_energy = bool(task.paths)
+    return sorted(evaluations, key=lambda e: (not e.feasible, 1.0 - e.reachable_fraction,
+                                              e.energy if by_energy else e.torque_utilization,
+                                              e.torque_utilization))
+
+def format_ranking(evaluations: List[RobotEvaluation]) -> str:
+    """Ranked evaluations as a fixed-width text table"""
+    lines = [f"{'#':>2}  {'Robot':<14} {'Feasible':<8} {'Reach':>6} {'Torque':>7} {'Speed':>6} "
+             f"{'RMS motor (Nm)':>14} {'Energy (J)':>11}  Issues"]
+    for rank, e in enumerate(evaluations, 1):
+        rms = float(e.rms_motor_torque.max()) if len(e.rms_motor_torque) else 0.0
+        lines.append(f"{rank:>2}  {e.robot_name:<14} {'yes' if e.feasible else 'no':<8} "
+                     f"{e.reachable_fraction:>6.0%} {e.torque_utilization:>7.0%} {e.speed_utilization:>6.0%} "
+                     f"{rms:>14.3f} {e.energy:>11.1f}  {'; '.join(e.issues)}")
+    return '\n'.join(lines)
+
+def load_path(filename: str) -> ToolPath:
+    """Tool path from a t,x,y,z CSV file"""
+    data = np.loadtxt(filename, delimiter=',', ndmin=2)
+    if data.shape[1] != 4:
+        raise ValueError(f"{filename}: expected t,x,y,z columns")
+    return ToolPath(timestamps=data[:, 0], positions=data[:, 1:4])
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Rank KUKA robot models for a task")
+    parser.add_argument('--payload', type=float, required=True, help="Payload in kg")
+    parser.add_argument('--targets', help="CSV of x,y,z target positions (m)")
+    parser.add_argument('--path', action='append', default=[], help="CSV of t,x,y,z tool path samples")
+    parser.add_argument('--robots', nargs='*', help="Candidates (default: all available models)")
+    parser.add_argument('--workers', type=int, help="Worker processes (default: one per robot and CPU)")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.targets is None and not args.path:
+        parser.error("give --targets and/or --path")
+    targets = np.loadtxt(args.targets, delimiter=',', ndmin=2) if args.targets else None
+    task = SelectionTask(payload=args.payload, targets=targets, paths=[load_path(p) for p in args.path])
+    print(format_ranking(rank_robots(task, args.robots, args.workers, args.seed)))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,191 @@
+# robots/spatial.py
+"""
+Batched 6D spatial vector algebra (Featherstone notation).
+
+Motion vectors are [angular; linear] and force vectors [moment; force],
+stored in the last axis of (..., 6) arrays. A Plücker transform from
+frame A to frame B is kept as the pair (E, r): E (..., 3, 3) rotates A
+coordinates into B coordinates and r (..., 3) is the origin of B expressed
+in A. All functions broadcast over the leading dimensions, so a batch of N
+states is processed with one call per joint.
+"""
+
+import numpy as np
+
+# einsum and explicit components beat np.matmul/np.cross on long stacks of
+# 3-vectors by 2-4x (no per-element broadcasting machinery)
+
+def _rotate(E, x):
+    """E @ x over the leading dimensions"""
+    return np.einsum('...ij,...j->...i', E, x)
+
+def _rotate_transpose(E, x):
+    """E.T @ x over the leading dimensions"""
+    return np.einsum('...ji,...j->...i', E, x)
+
+def _cross(a, b):
+    """cross(a, b) over the leading dimensions"""
+    a0, a1, a2 = a[..., 0], a[..., 1], a[..., 2]
+    b0, b1, b2 = b[..., 0], b[..., 1], b[..., 2]
+    out = np.empty(np.broadcast_shapes(a.shape, b.shape), dtype=np.result_type(a, b))
+    np.subtract(a1 * b2, a2 * b1, out=out[..., 0])
+    np.subtract(a2 * b0, a0 * b2, out=out[..., 1])
+    np.subtract(a0 * b1, a1 * b0, out=out[..., 2])
+    return out
+
+def skew(v):
+    """Cross-product matrix: skew(v) @ x == cross(v, x)"""
+    v = np.asarray(v)
+    S = np.zeros(v.shape + (3,), dtype=v.dtype)
+    S[..., 0, 1] = -v[..., 2]
+    S[..., 0, 2] = v[..., 1]
+    S[..., 1, 0] = v[..., 2]
+    S[..., 1, 2] = -v[..., 0]
+    S[..., 2, 0] = -v[..., 1]
+    S[..., 2, 1] = v[..., 0]
+    return S
+
+def axis_rotation(axis, angle):
+    """
+    Rotation matrices about a unit axis (Rodrigues)
+
+    Args:
+        axis: Unit axis, shape (3,) or (..., 3)
+        angle: Angles in radians, shape (...)
+
+    Returns:
+        Rotation matrices, shape (..., 3, 3)
+    """
+    angle = np.asarray(angle)
+    axis = np.asarray(axis, dtype=angle.dtype)
+    K = skew(axis)
+    c = np.cos(angle)[..., None, None]
+    s = np.sin(angle)[..., None, None]
+    return np.eye(3, dtype=angle.dtype) + s * K + (1 - c) * np.matmul(K, K)
+
+def rpy_rotation(rpy):
+    """URDF roll-pitch-yaw (fixed x, y, z axes) to a rotation matrix"""
+    roll, pitch, yaw = (float(v) for v in rpy)
+    return (axis_rotation(np.array([0.0, 0.0, 1.0]), yaw)
+            @ axis_rotation(np.array([0.0, 1.0, 0.0]), pitch)
+            @ axis_rotation(np.array([1.0, 0.0, 0.0]), roll))
+
+def motion_cross(v, m):
+    """Spatial motion cross product v x m"""
+    w, u = v[..., :3], v[..., 3:]
+    mw, mu = m[..., :3], m[..., 3:]
+    return np.concatenate([_cross(w, mw), _cross(w, mu) + _cross(u, mw)], axis=-1)
+
+def force_cross(v, f):
+    """Spatial force cross product v x* f"""
+    w, u = v[..., :3], v[..., 3:]
+    n, fl = f[..., :3], f[..., 3:]
+    return np.concatenate([_cross(w, n) + _cross(u, fl), _cross(w, fl)], axis=-1)
+
+def transform_motion(E, r, m):
+    """X m: motion vector from frame A to frame B"""
+    w = _rotate(E, m[..., :3])
+    u = _rotate(E, m[..., 3:] - _cross(r, m[..., :3]))
+    return np.concatenate([w, u], axis=-1)
+
+def inverse_transform_motion(E, r, m):
+    """X^-1 m: motion vector from frame B back to frame A"""
+    w = _rotate_transpose(E, m[..., :3])
+    u = _rotate_transpose(E, m[..., 3:]) + _cross(r, w)
+    return np.concatenate([w, u], axis=-1)
+
+def transform_force(E, r, f):
+    """X* f: force vector from frame A to frame B"""
+    n = _rotate(E, f[..., :3] - _cross(r, f[..., 3:]))
+    fl = _rotate(E, f[..., 3:])
+    return np.concatenate([n, fl], axis=-1)
+
+def inverse_transform_force(E, r, f):
+    """X^T f: force vector from frame B back to frame A"""
+    fl = _rotate_transpose(E, f[..., 3:])
+    n = _rotate_transpose(E, f[..., :3]) + _cross(r, fl)
+    return np.concatenate([n, fl], axis=-1)
+
+def compose_transforms(E1, r1, E2, r2):
+    """Transform A->C from A->B (E1, r1) followed by B->C (E2, r2)"""
+    return np.matmul(E2, E1), r1 + _rotate_transpose(E1, r2)
+
+def transform_matrix(E, r):
+    """6x6 motion transform matrix of (E, r), shape (..., 6, 6)"""
+    E = np.asarray(E)
+    r = np.broadcast_to(r, E.shape[:-1])
+    X = np.zeros(E.shape[:-2] + (6, 6), dtype=E.dtype)
+    X[..., :3, :3] = E
+    X[..., 3:, 3:] = E
+    X[..., 3:, :3] = -np.matmul(E, skew(r))
+    return X
+
+def spatial_inertia(mass, com, inertia_com):
+    """
+    Spatial inertia of a rigid body about its frame origin
+
+    Args:
+        mass: Mass in kg, shape (...)
+        com: Center of mass in the body frame in m, shape (..., 3)
+        inertia_com: Rotational inertia about the center of mass in kg*m², shape (..., 3, 3)
+
+    Returns:
+        Spatial inertia, shape (..., 6, 6)
+    """
+    mass = np.asarray(mass)
+    C = skew(com)
+    m = mass[..., None, None]
+    I = np.zeros(mass.shape + (6, 6), dtype=np.result_type(mass, inertia_com))
+    I[..., :3, :3] = inertia_com - m * np.matmul(C, C)
+    I[..., :3, 3:] = m * C
+    I[..., 3:, :3] = -m * C
+    I[..., 3:, 3:] = m * np.eye(3)
+    return I
+
+def apply_inertia(I, v):
+    """I v: momentum (force vector) of a spatial inertia moving with v"""
+    if I.ndim == 2:
+        # One inertia for the whole batch
+        return v @ I.T
+    return np.einsum('...ij,...j->...i', I, v)
+
+def inertia_to_parent(E, r, I):
+    """X^T I X: spatial inertia of a body expressed in the parent frame"""
+    X = transform_matrix(E, r)
+    return np.matmul(np.swapaxes(X, -1, -2), np.matmul(I, X))
+
+def motion_subspace(joint_type: str, axis, dtype=np.float64):
+    """Motion subspace S (6,) of a one-degree-of-freedom joint about/along axis"""
+    S = np.zeros(6, dtype=dtype)
+    if joint_type == 'prismatic':
+        S[3:] = axis
+    else:
+        S[:3] = axis
+    return S
+
+def joint_transform(joint_type: str, axis, origin_rotation, origin_xyz, q):
+    """
+    Parent-to-child transforms of one joint over a batch of positions
+
+    The child frame is the joint origin (origin_rotation, origin_xyz in
+    the parent frame) moved by q about (revolute) or along (prismatic)
+    the joint axis.
+
+    Args:
+        joint_type: 'revolute' or 'prismatic'
+        axis: Unit joint axis in the joint frame, shape (3,)
+        origin_rotation: Orientation of the joint frame in the parent frame, shape (3, 3)
+        origin_xyz: Position of the joint frame in the parent frame, shape (3,)
+        q: Joint positions, shape (N,)
+
+    Returns:
+        (E, r) with shapes (N, 3, 3) and (N, 3)
+    """
+    q = np.asarray(q)
+    if joint_type == 'prismatic':
+        R = np.broadcast_to(origin_rotation, q.shape + (3, 3))
+        r = origin_xyz + q[..., None] * (origin_rotation @ axis)
+    else:
+        R = np.matmul(origin_rotation, axis_rotation(axis, q))
+        r = np.broadcast_to(origin_xyz, q.shape + (3,))
+    return np.swapaxes(R, -1, -2), r
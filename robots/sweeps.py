@@ -0,0 +1,358 @@
+# robots/sweeps.py
+"""
+Resumable, checkpointed sweeps.
+
+A sweep (Monte Carlo run, workspace map, parameter sweep, ...) is split
+into a fixed number of deterministic shards: shard k of a sweep always
+covers the same inputs, whatever ran before it and wherever it runs. Each
+finished shard is written atomically to the sweep directory, so an
+interrupted sweep restarts where it stopped and only redoes the shards
+that were in flight.
+
+Workers pull shards from a queue shared through the sweep directory: a
+shard is claimed by creating its lock file exclusively, so several worker
+processes, and several sweep invocations on the same machine, can work
+through one sweep together. Locks of workers that died are taken over
+(on Windows, locks older than STALE_LOCK_SECONDS): the stale lock is
+first hard-linked to a marker named after its inode, which only one
+worker can create, so exactly one worker removes it.
+
+Sweep directory (under the model cache by default):
+    sweep.json          spec and model fingerprint; a different sweep is refused
+    shard_000000.npz    result arrays of finished shards
+    shard_000001.lock   pid of the worker running that shard
+    shard_000001.lock.<inode>.taken   stale lock being taken over (removed on release)
+
+Tasks:
+    monte_carlo     random joint states (as in robots.consistency) and their rigid-body torques
+    workspace_map   static torques on a grid over two joints, the other joints at zero
+    payload_sweep   worst-case static torque envelope for a list of payloads
+
+Usage (from the repository root):
+    python -m robots.sweeps monte_carlo --robot "KR6 R900" --shards 50 --param samples_per_shard=20000
+    python -m robots.sweeps payload_sweep --robot "KR6 R900" --shards 4 --param payloads=[0,2,4,6] --status
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import sys
+import time
+import numpy as np
+from dataclasses import dataclass, field, asdict
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from .kuka_robots import get_robot_by_name
+from .kuka_dynamics import calculate_kuka_rigid_body_torques_batch
+from .configuration_index import model_fingerprint
+from .consistency import sample_states
+from .torque_envelope import calculate_torque_envelope
+from .model_registry import get_model_registry, model_process_pool, model_slug
+
+SWEEP_VERSION = 1
+STALE_LOCK_SECONDS = 6 * 3600.0
+
+# task(robot_name, shard, shards, params, seed) -> result arrays of the shard
+Task = Callable[[str, int, int, Dict[str, Any], int], Dict[str, np.ndarray]]
+
+def _monte_carlo(robot_name, shard, shards, params, seed):
+    q, qd, qdd = sample_states(robot_name, shard, int(params.get('samples_per_shard', 20000)), seed)
+    tau = calculate_kuka_rigid_body_torques_batch(robot_name, q, qd, qdd, payload=float(params.get('payload', 0.0)),
+                                                  dtype=np.float64)
+    return {'q': q, 'qd': qd, 'qdd': qdd, 'tau': tau}
+
+def _workspace_map(robot_name, shard, shards, params, seed):
+    robot = get_robot_by_name(robot_name)
+    joints = list(params.get('joints', [1, 2]))
+    points = int(params.get('points', 64))
+    limits = robot.get_joint_limits()
+    rows = np.array_split(np.arange(points ** len(joints)), shards)[shard]
+    grid = np.stack(np.unravel_index(rows, (points,) * len(joints)), axis=1)
+    q = np.zeros((len(rows), robot.dof))
+    q[:, joints] = limits[joints, 0] + grid / max(points - 1, 1) * (limits[joints, 1] - limits[joints, 0])
+    zero = np.zeros_like(q)
+    tau = calculate_kuka_rigid_body_torques_batch(robot_name, q, zero, zero, payload=float(params.get('payload', 0.0)),
+                                                  dtype=np.float64)
+    return {'q': q, 'tau': tau}
+
+def _payload_sweep(robot_name, shard, shards, params, seed):
+    payloads = np.array_split(np.asarray(params['payloads'], dtype=float), shards)[shard]
+    envelopes = [calculate_torque_envelope(robot_name, payload, workers=1) for payload in payloads]
+    dof = get_robot_by_name(robot_name).dof
+    return {'payload': payloads,
+            'max_torque': np.array([e.max_torque for e in envelopes]).reshape(-1, dof),
+            'configurations': np.array([e.configurations for e in envelopes]).reshape(-1, dof, dof)}
+
+TASKS: Dict[str, Task] = {
+    'monte_carlo': _monte_carlo,
+    'workspace_map': _workspace_map,
+    'payload_sweep': _payload_sweep
+}
+
+def register_task(name: str, task: Task):
+    """Add a sweep task; it must be importable by worker processes (a module-level function)"""
+    TASKS[name] = task
+
+@dataclass
+class SweepSpec:
+    """Everything that determines the results of a sweep"""
+    task: str
+    robot_name: str
+    shards: int
+    params: Dict[str, Any] = field(default_factory=dict)
+    seed: int = 0
+
+    def digest(self) -> str:
+        """Hash of the spec and the robot model"""
+        data = dict(asdict(self), version=SWEEP_VERSION,
+                    fingerprint=model_fingerprint(get_robot_by_name(self.robot_name)))
+        return hashlib.sha1(json.dumps(data, sort_keys=True).encode('utf-8')).hexdigest()
+
+@dataclass
+class SweepStatus:
+    shards: int
+    completed: List[int]
+    running: List[int]
+    ran: List[int] = field(default_factory=list)  # shards finished by this call
+
+    @property
+    def done(self) -> bool:
+        return len(self.completed) == self.shards
+
+def default_sweep_dir(spec: SweepSpec) -> str:
+    return os.path.join(get_model_registry().cache_dir, 'sweeps', f'{spec.task}_{model_slug(spec.robot_name)}_{spec.digest()[:12]}')
+
+def _shard_path(directory: str, shard: int) -> str:
+    return os.path.join(directory, f'shard_{shard:06d}.npz')
+
+def _lock_path(directory: str, shard: int) -> str:
+    return os.path.join(directory, f'shard_{shard:06d}.lock')
+
+def _process_alive(pid: int, mtime: float) -> bool:
+    """Whether the process that wrote a file at mtime may still be running"""
+    if os.name == 'nt':
+        # os.kill would terminate the process on Windows
+        return time.time() - mtime <= STALE_LOCK_SECONDS
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+def _read_lock(lock: str) -> Tuple[int, Tuple[int, int, int]]:
+    """Owner pid of a lock and the identity (device, inode, mtime) of the file it was read from"""
+    with open(lock, 'r', encoding='utf-8') as f:
+        try:
+            pid = int(f.read().strip() or 0)
+        except ValueError:
+            pid = 0
+        stat = os.fstat(f.fileno())
+    return pid, (stat.st_dev, stat.st_ino, stat.st_mtime_ns)
+
+def _take_over(lock: str, pid: int, identity: Tuple[int, int, int]) -> bool:
+    """
+    Remove the stale lock (pid, identity) unless another worker is taking
+    it over or it was replaced in the meantime
+    """
+    marker = f'{lock}.{identity[1]}.taken'
+    try:
+        # Creating the marker is the atomic step: it exists only once per stale lock
+        os.link(lock, marker)
+    except FileExistsError:
+        return False
+    except FileNotFoundError:
+        return True  # already gone, try to claim it
+    try:
+        if _read_lock(marker) != (pid, identity):
+            # The lock was replaced after it was judged stale, the marker holds the new one
+            os.remove(marker)
+            return False
+    except FileNotFoundError:
+        return False
+    os.remove(lock)
+    return True
+
+def _claim(directory: str, shard: int) -> bool:
+    """Claim a shard by creating its lock file; False if another live worker holds it"""
+    lock = _lock_path(directory, shard)
+    for _ in range(2):
+        try:
+            fd = os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            try:
+                pid, identity = _read_lock(lock)
+            except FileNotFoundError:
+                continue
+            if _process_alive(pid, identity[2] / 1e9) or not _take_over(lock, pid, identity):
+                return False
+            continue
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(str(os.getpid()))
+        # Partial writes of previous owners that died; a live writer keeps its file
+        for temporary in glob.glob(f'{_shard_path(directory, shard)}.*.tmp'):
+            try:
+                pid = int(temporary.rsplit('.', 2)[-2])
+                if pid != os.getpid() and _process_alive(pid, os.path.getmtime(temporary)):
+                    continue
+                os.remove(temporary)
+            except (ValueError, FileNotFoundError):
+                pass
+        return True
+    return False
+
+def _release(directory: str, shard: int):
+    lock = _lock_path(directory, shard)
+    for marker in glob.glob(f'{lock}.*.taken'):
+        try:
+            os.remove(marker)
+        except FileNotFoundError:
+            pass
+    try:
+        os.remove(lock)
+    except FileNotFoundError:
+        pass
+
+def _save_shard(directory: str, shard: int, result: Dict[str, np.ndarray]):
+    """Write shard results atomically: readers see the complete file or none"""
+    filename = _shard_path(directory, shard)
+    temporary = f'{filename}.{os.getpid()}.tmp'
+    with open(temporary, 'wb') as f:
+        np.savez(f, **result)
+    os.replace(temporary, filename)
+
+def _work(args) -> List[int]:
+    """Worker loop: claim, run and save pending shards until none are left"""
+    directory, spec, order = args
+    task = TASKS[spec.task]
+    ran = []
+    for shard in order:
+        if os.path.exists(_shard_path(directory, shard)) or not _claim(directory, shard):
+            continue
+        try:
+            # Finished by another worker between the check and the claim
+            if not os.path.exists(_shard_path(directory, shard)):
+                _save_shard(directory, shard, task(spec.robot_name, shard, spec.shards, spec.params, spec.seed))
+                ran.append(shard)
+        finally:
+            _release(directory, shard)
+    return ran
+
+class SweepExecutor:
+    """
+    Runs the shards of a sweep into a result directory
+
+    Args:
+        spec: Sweep to run
+        directory: Result directory, defaults to default_sweep_dir(spec)
+    """
+
+    def __init__(self, spec: SweepSpec, directory: Optional[str] = None):
+        if spec.task not in TASKS:
+            raise ValueError(f"Unknown sweep task {spec.task}, expected {sorted(TASKS)}")
+        if get_robot_by_name(spec.robot_name) is None:
+            raise ValueError(f"Robot {spec.robot_name} not found")
+        if spec.shards < 1:
+            raise ValueError("A sweep needs at least one shard")
+        self.spec = spec
+        self.directory = directory or default_sweep_dir(spec)
+        self._prepare()
+
+    def _prepare(self):
+        """Create the directory and its spec, or check that it holds this sweep"""
+        os.makedirs(self.directory, exist_ok=True)
+        filename = os.path.join(self.directory, 'sweep.json')
+        spec = dict(asdict(self.spec), version=SWEEP_VERSION, digest=self.spec.digest())
+        if os.path.exists(filename):
+            with open(filename, 'r', encoding='utf-8') as f:
+                existing = json.load(f)
+            if existing.get('digest') != spec['digest']:
+                raise ValueError(f"{self.directory} holds a different sweep (or the robot model changed)")
+            return
+        temporary = f'{filename}.{os.getpid()}.tmp'
+        with open(temporary, 'w', encoding='utf-8') as f:
+            json.dump(spec, f, indent=2)
+        os.replace(temporary, filename)
+
+    def completed(self) -> List[int]:
+        return [k for k in range(self.spec.shards) if os.path.exists(_shard_path(self.directory, k))]
+
+    def _lock_alive(self, shard: int) -> bool:
+        try:
+            pid, identity = _read_lock(_lock_path(self.directory, shard))
+        except FileNotFoundError:
+            return False
+        return _process_alive(pid, identity[2] / 1e9)
+
+    def status(self) -> SweepStatus:
+        completed = self.completed()
+        done = set(completed)
+        running = [k for k in range(self.spec.shards) if k not in done and self._lock_alive(k)]
+        return SweepStatus(self.spec.shards, completed, running)
+
+    def run(self, workers: Optional[int] = None) -> SweepStatus:
+        """
+        Run all pending shards
+
+        Args:
+            workers: Worker processes, one per CPU (at most one per pending
+                shard) by default; 1 runs in this process
+
+        Returns:
+            SweepStatus after the run; shards claimed by other invocations
+            may still be running
+        """
+        done = set(self.completed())
+        pending = [k for k in range(self.spec.shards) if k not in done]
+        workers = workers or min(max(len(pending), 1), os.cpu_count() or 1)
+        if workers <= 1 or len(pending) <= 1:
+            ran = _work((self.directory, self.spec, pending))
+        else:
+            # Every worker walks the whole queue from its own offset, so they rarely contend for a shard
+            jobs = [(self.directory, self.spec, pending[i:] + pending[:i])
+                    for i in range(0, len(pending), -(-len(pending) // workers))]
+            with model_process_pool(len(jobs)) as pool:
+                ran = sorted(k for part in pool.map(_work, jobs) for k in part)
+        status = self.status()
+        status.ran = ran
+        return status
+
+    def load_shard(self, shard: int) -> Dict[str, np.ndarray]:
+        with np.load(_shard_path(self.directory, shard)) as data:
+            return {key: data[key] for key in data.files}
+
+    def results(self) -> Iterator[Tuple[int, Dict[str, np.ndarray]]]:
+        """(shard, arrays) of the finished shards in shard order"""
+        for shard in self.completed():
+            yield shard, self.load_shard(shard)
+
+def _parse_param(text: str) -> Tuple[str, Any]:
+    key, _, value = text.partition('=')
+    try:
+        return key, json.loads(value)
+    except json.JSONDecodeError:
+        return key, value
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run a resumable sweep")
+    parser.add_argument('task', choices=sorted(TASKS))
+    parser.add_argument('--robot', required=True)
+    parser.add_argument('--shards', type=int, required=True)
+    parser.add_argument('--param', action='append', default=[], help="Task parameter key=value (JSON value)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--directory', help="Result directory (default: under the model cache)")
+    parser.add_argument('--workers', type=int, help="Worker processes (default: one per CPU)")
+    parser.add_argument('--status', action='store_true', help="Only report progress")
+    args = parser.parse_args(argv)
+
+    spec = SweepSpec(args.task, args.robot, args.shards, dict(_parse_param(p) for p in args.param), args.seed)
+    executor = SweepExecutor(spec, args.directory)
+    status = executor.status() if args.status else executor.run(args.workers)
+    print(f"{executor.directory}: {len(status.completed)}/{status.shards} shards complete, "
+          f"{len(status.running)} running, {len(status.ran)} run now")
+    return 0 if status.done else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,291 @@
+# robots/torque_envelope.py
+"""
+Worst-case static torque envelope over the joint limits.
+
+For every joint the search finds the largest |gravity + payload torque|
+the robot can see while holding still anywhere inside its joint limits:
+
+1. A coarse grid over the gravity joints (joints that cannot change the
+   gravity torques are left out) is evaluated in one vectorized pass
+   through the gravity table.
+2. The best grid points of every joint seed a projected gradient ascent
+   that stays inside the limits. The seeds are split across worker
+   processes.
+3. The refined configurations are checked with the full Newton-Euler
+   model, which gives the reported torques.
+
+Envelopes are cached per robot and payload next to the gravity tables.
+
+Usage (from the repository root):
+    python -m robots.torque_envelope --robots "KR6 R900" --payload 6
+"""
+
+import argparse
+import json
+import os
+import sys
+import numpy as np
+from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional, Tuple
+from .kuka_robots import get_available_robots, get_robot_by_name
+from .rigid_body import build_rigid_body_model, add_payload
+from .kuka_kernels import get_kernels
+from .gravity_table import get_gravity_table
+from .configuration_index import model_fingerprint
+from .model_registry import get_model_registry, model_process_pool, model_slug
+from utils.profiling import profiled
+
+ENVELOPE_VERSION = 1
+COARSE_POINTS = 13  # grid points per gravity joint, limits included
+MAX_GRID_ROWS = 1 << 21
+REFINE_STARTS = 4  # best grid points refined per joint and torque sign
+REFINE_ITERATIONS = 200
+GRADIENT_STEP = 1e-6  # rad, central differences
+_CHUNK = 1 << 16
+
+@dataclass
+class TorqueEnvelope:
+    """Worst-case static torques of one robot and payload"""
+    robot_name: str
+    payload: float  # kg
+    max_torque: np.ndarray  # (dof,) Nm, largest |static torque| per joint
+    torque: np.ndarray  # (dof,) Nm, signed torque at the worst configuration
+    configurations: np.ndarray  # (dof, dof) rad, worst configuration of each joint (rows)
+    coarse_max_torque: np.ndarray  # (dof,) Nm, best grid value before refinement
+    joint_limits: np.ndarray  # (dof, 2) rad, limits searched
+
+def _grid(limits: np.ndarray, joints: np.ndarray, points: int) -> Tuple[np.ndarray, Tuple[int, ...]]:
+    """Axis values of the coarse grid over joints and its shape"""
+    points = max(2, min(points, int(MAX_GRID_ROWS ** (1.0 / max(len(joints), 1)))))
+    return [np.linspace(*limits[j], points) for j in joints], (points,) * len(joints)
+
+def _clamped_rest(limits: np.ndarray) -> np.ndarray:
+    """Zero pose pushed inside the limits (position of the joints outside the search)"""
+    return np.clip(0.0, limits[:, 0], limits[:, 1])
+
+def _coarse_search(table, limits: np.ndarray, joints: np.ndarray, points: int, starts: int):
+    """
+    Best grid points per joint
+
+    Returns:
+        (seeds (dof, 2 * starts, dof), best |torque| on the grid (dof,))
+    """
+    dof = len(limits)
+    axes, shape = _grid(limits, joints, points)
+    size = int(np.prod(shape))
+    rest = _clamped_rest(limits)
+    # Running best `starts` grid rows per joint for the largest and the smallest torque
+    best_rows = np.zeros((dof, 2, 0), dtype=np.int64)
+    best_values = np.zeros((dof, 2, 0))
+    for start in range(0, size, _CHUNK):
+        rows = np.arange(start, min(start + _CHUNK, size))
+        q = np.tile(rest, (len(rows), 1))
+        for j, axis, index in zip(joints, axes, np.unravel_index(rows, shape) if shape else ()):
+            q[:, j] = axis[index]
+        G = table.evaluate(q).T  # (dof, n)
+        values = np.concatenate([best_values, np.stack([G, -G], axis=1)], axis=2)
+        candidates = np.concatenate([best_rows, np.broadcast_to(rows, (dof, 2, len(rows)))], axis=2)
+        keep = np.argsort(-values, axis=2)[:, :, :starts]
+        best_values = np.take_along_axis(values, keep, axis=2)
+        best_rows = np.take_along_axis(candidates, keep, axis=2)
+
+    seeds = np.tile(rest, (dof, best_rows.shape[1] * best_rows.shape[2], 1))
+    for j, axis, index in zip(joints, axes, np.unravel_index(best_rows.reshape(dof, -1), shape) if shape else ()):
+        seeds[:, :, j] = axis[index]
+    return seeds, np.abs(best_values[:, :, 0].max(axis=1))
+
+def _refine(args) -> np.ndarray:
+    """
+    Projected gradient ascent of sign * G_joint from each seed
+
+    Args:
+        args: (robot name, payload, seeds (n, dof), target joint (n,), sign (n,),
+            searched joints, joint limits (dof, 2))
+
+    Returns:
+        Refined configurations (n, dof)
+    """
+    robot_name, payload, q, target, sign, joints, limits = args
+    table = get_gravity_table(robot_name, payload)
+    q = q.copy()
+    n, d = len(q), len(joints)
+    lower, upper = limits[joints, 0], limits[joints, 1]
+    rows = np.arange(n)
+
+    def objective(x):
+        return sign * table.evaluate(x)[rows, target]
+
+    value = objective(q)
+    step = np.full(n, 0.5 * np.min(upper - lower) / COARSE_POINTS)
+    probe = np.zeros((2 * d, n, q.shape[1]))
+    for _ in range(REFINE_ITERATIONS):
+        # Central differences along every searched joint in one evaluation
+        probe[:] = q
+        for k, j in enumerate(joints):
+            probe[2 * k, :, j] += GRADIENT_STEP
+            probe[2 * k + 1, :, j] -= GRADIENT_STEP
+        shifted = sign * table.evaluate(probe.reshape(-1, q.shape[1])).reshape(2 * d, n, -1)[:, rows, target]
+        gradient = (shifted[0::2] - shifted[1::2]).T / (2 * GRADIENT_STEP)
+        norm = np.linalg.norm(gradient, axis=1)
+        direction = gradient / np.maximum(norm, 1e-300)[:, None]
+
+        trial = q.copy()
+        trial[:, joints] = np.clip(q[:, joints] + step[:, None] * direction, lower, upper)
+        trial_value = objective(trial)
+        better = trial_value > value
+        q[better] = trial[better]
+        value[better] = trial_value[better]
+        step = np.where(better, step * 1.5, step * 0.5)
+        if step.max() < 1e-8:
+            break
+    return q
+
+@profiled
+def calculate_torque_envelope(robot_name: str, payload: float = 0.0, joint_limits=None,
+                              points: int = COARSE_POINTS, starts: int = REFINE_STARTS,
+                              workers: Optional[int] = None) -> TorqueEnvelope:
+    """
+    Search the worst-case static torque of every joint over the joint limits
+
+    Args:
+        robot_name: Name of the KUKA robot model
+        payload: Point-mass payload at the tool flange in kg
+        joint_limits: (dof, 2) lower/upper joint positions, the model limits by default
+        points: Coarse grid points per gravity joint
+        starts: Grid points refined per joint and torque sign
+        workers: Refinement processes, one per CPU (at most one per joint) by default;
+            1 refines in this process
+
+    Returns:
+        TorqueEnvelope of the robot
+    """
+    robot = get_robot_by_name(robot_name)
+    if robot is None:
+        raise ValueError(f"Robot {robot_name} not found")
+    limits = np.asarray(joint_limits if joint_limits is not None else robot.get_joint_limits(), dtype=float)
+    if limits.shape != (robot.dof, 2) or np.any(limits[:, 1] < limits[:, 0]):
+        raise ValueError(f"Expected ({robot.dof}, 2) joint limits with lower <= upper")
+
+    table = get_gravity_table(robot_name, payload)
+    joints = table.joints
+    seeds, coarse = _coarse_search(table, limits, joints, points, starts)
+    dof, per_joint = seeds.shape[:2]
+    target = np.repeat(np.arange(dof), per_joint)
+    # The first half of the seeds of a joint maximize its torque, the rest minimize it
+    sign = np.tile(np.repeat([1.0, -1.0], per_joint // 2), dof)
+    seeds = seeds.reshape(-1, dof)
+
+    workers = workers or min(dof, os.cpu_count() or 1)
+    if len(joints) == 0:
+        refined = seeds
+    elif workers <= 1:
+        refined = _refine((robot_name, payload, seeds, target, sign, joints, limits))
+    else:
+        parts = np.array_split(np.arange(len(seeds)), workers)
+        jobs = [(robot_name, payload, seeds[p], target[p], sign[p], joints, limits) for p in parts]
+        with model_process_pool(workers) as pool:
+            refined = np.concatenate(list(pool.map(_refine, jobs)))
+
+    # Exact torques at the refined configurations
+    model = add_payload(build_rigid_body_model(robot), payload)
+    zero = np.zeros_like(refined)
+    G = get_kernels().rnea(model, refined, zero, zero)[np.arange(len(refined)), target].reshape(dof, per_joint)
+    best = np.abs(G).argmax(axis=1)
+    rows = np.arange(dof) * per_joint + best
+    return TorqueEnvelope(
+        robot_name=robot_name,
+        payload=payload,
+        max_torque=np.abs(G[np.arange(dof), best]),
+        torque=G[np.arange(dof), best],
+        configurations=refined[rows],
+        coarse_max_torque=coarse,
+        joint_limits=limits
+    )
+
+def default_envelope_path(robot_name: str, payload: float = 0.0) -> str:
+    return os.path.join(get_model_registry().cache_dir, 'envelopes', f'{model_slug(robot_name)}_p{payload:g}.json')
+
+def save_envelope(envelope: TorqueEnvelope, filename: str, fingerprint: str) -> str:
+    """Write an envelope as JSON (atomically)"""
+    data = {key: value.tolist() if isinstance(value, np.ndarray) else value
+            for key, value in asdict(envelope).items()}
+    data.update(version=ENVELOPE_VERSION, fingerprint=fingerprint)
+    os.makedirs(os.path.dirname(filename), exist_ok=True)
+    temporary = f'{filename}.{os.getpid()}.tmp'
+    with open(temporary, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+    os.replace(temporary, filename)
+    return filename
+
+def load_envelope(filename: str) -> Tuple[TorqueEnvelope, Dict]:
+    """Read a saved envelope; returns (envelope, metadata)"""
+    with open(filename, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if data.get('version') != ENVELOPE_VERSION:
+        raise ValueError(f"{filename} has envelope version {data.get('version')}, expected {ENVELOPE_VERSION}")
+    meta = {'version': data.pop('version'), 'fingerprint': data.pop('fingerprint')}
+    arrays = ('max_torque', 'torque', 'configurations', 'coarse_max_torque', 'joint_limits')
+    return TorqueEnvelope(**{key: np.array(value) if key in arrays else value
+                             for key, value in data.items()}), meta
+
+_envelopes: Dict[Tuple[str, float], TorqueEnvelope] = {}
+
+def get_torque_envelope(robot_name: str, payload: float = 0.0, workers: Optional[int] = None,
+                        build: bool = True) -> Optional[TorqueEnvelope]:
+    """
+    Worst-case static torques of a robot and payload over its joint limits,
+    searched once and cached on disk
+
+    Args:
+        robot_name: Name of the KUKA robot model
+        payload: Point-mass payload at the tool flange in kg
+        workers: Refinement processes when the envelope has to be searched
+        build: Search a missing or stale envelope; otherwise return None
+
+    Returns:
+        TorqueEnvelope, or None
+    """
+    key = (robot_name, payload)
+    if key in _envelopes:
+        return _envelopes[key]
+    robot = get_robot_by_name(robot_name)
+    if robot is None:
+        raise ValueError(f"Robot {robot_name} not found")
+
+    filename = default_envelope_path(robot_name, payload)
+    fingerprint = model_fingerprint(robot)
+    envelope = None
+    try:
+        envelope, meta = load_envelope(filename)
+        if (meta['fingerprint'] != fingerprint or envelope.payload != payload
+                or not np.array_equal(envelope.joint_limits, robot.get_joint_limits())):
+            envelope = None
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    if envelope is None:
+        if not build:
+            return None
+        envelope = calculate_torque_envelope(robot_name, payload, workers=workers)
+        try:
+            save_envelope(envelope, filename, fingerprint)
+        except OSError:
+            # A read-only cache still gives the envelope for this session
+            pass
+    _envelopes[key] = envelope
+    return envelope
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Search worst-case static joint torques")
+    parser.add_argument('--robots', nargs='*', default=get_available_robots())
+    parser.add_argument('--payload', type=float, default=0.0, help="Payload in kg")
+    parser.add_argument('--workers', type=int, help="Refinement processes (default: one per CPU)")
+    args = parser.parse_args(argv)
+
+    for robot_name in args.robots:
+        envelope = get_torque_envelope(robot_name, args.payload, args.workers)
+        values = ', '.join(f'{t:.2f}' for t in envelope.max_torque)
+        print(f"{robot_name} ({args.payload:g} kg): max |static torque| [{values}] Nm")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
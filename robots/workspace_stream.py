@@ -0,0 +1,358 @@
+# robots/workspace_stream.py
+"""
+Chunked workspace analysis.
+
+stream_kuka_workspace_torques pulls fixed-size (time, q, qd, qdd) chunks
+from a trajectory source, evaluates the batch dynamics on each and yields
+WorkspaceChunk(time, q, qd, qdd, tau) with tau per method. Nothing is kept
+between chunks, so any horizon runs in constant memory and consumers see
+the first chunk as soon as it is computed.
+
+Pipeline stages are callables taking one WorkspaceChunk; run_pipeline
+feeds a stream through them in order:
+    StatisticsStage  per-joint streaming statistics (utils/streaming_stats.py)
+    LimitStage       per-joint torque limit violations
+    EnvelopeStage    bounded min/max envelope of the traces for plotting
+    CsvExportStage   time series rows written as they arrive
+
+run_workspace_study writes the torques of many variants (payloads) over
+the whole horizon into an out-of-core ResultStore (utils/result_store.py),
+with worker processes filling disjoint variants concurrently.
+
+Example:
+    stats, limits = StatisticsStage(), LimitStage(get_robot_torque_limits(name))
+    run_pipeline(stream_kuka_workspace_torques(name, time_points=10**7), stats, limits)
+"""
+
+import csv
+import os
+import numpy as np
+from typing import Callable, Dict, Iterable, Iterator, NamedTuple, Optional, Sequence, Tuple
+from .kuka_robots import get_robot_by_name
+from .model_registry import model_process_pool
+from .kuka_dynamics import (calculate_kuka_newton_euler_batch, calculate_kuka_lagrange_batch,
+                            calculate_kuka_rigid_body_torques_batch, sample_trajectory_states,
+                            WORKSPACE_CHUNK_SIZE)
+from utils.precision import resolve_dtype, as_compute_array
+from utils.streaming_stats import StreamingStatistics
+from utils.result_store import ResultStore
+
+ENVELOPE_POINTS = 4096
+METHODS: Dict[str, Callable] = {
+    'newton_euler': calculate_kuka_newton_euler_batch,
+    'lagrange': calculate_kuka_lagrange_batch,
+    'rigid_body': calculate_kuka_rigid_body_torques_batch
+}
+
+TrajectoryChunk = Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+
+class WorkspaceChunk(NamedTuple):
+    """Time points (n,), joint states (n, dof) and torques per method (n, dof)"""
+    time: np.ndarray
+    q: np.ndarray
+    qd: np.ndarray
+    qdd: np.ndarray
+    tau: Dict[str, np.ndarray]
+
+def sample_trajectory_source(robot_name: str, time_points: int = 100, duration: float = 10.0,
+                             chunk_size: int = WORKSPACE_CHUNK_SIZE, dtype=None) -> Iterator[TrajectoryChunk]:
+    """
+    The sinusoidal sample trajectory of generate_kuka_sample_trajectory in chunks
+
+    Yields:
+        (time, joint_angles, joint_velocities, joint_accelerations) chunks
+    """
+    robot = get_robot_by_name(robot_name)
+    if robot is None:
+        raise ValueError(f"Robot {robot_name} not found")
+    dtype = resolve_dtype(dtype)
+    step = duration / (time_points - 1) if time_points > 1 else 0.0
+    for start in range(0, time_points, chunk_size):
+        # Same time points as np.linspace(0, duration, time_points)
+        time = (np.arange(start, min(start + chunk_size, time_points)) * step).astype(dtype)
+        yield (time,) + sample_trajectory_states(robot, time)
+
+def array_trajectory_source(time, joint_angles, joint_velocities, joint_accelerations,
+                            chunk_size: int = WORKSPACE_CHUNK_SIZE) -> Iterator[TrajectoryChunk]:
+    """Existing trajectory arrays (or memory maps) in chunks of chunk_size rows"""
+    for start in range(0, len(time), chunk_size):
+        stop = start + chunk_size
+        yield (np.asarray(time[start:stop]), np.asarray(joint_angles[start:stop]),
+               np.asarray(joint_velocities[start:stop]), np.asarray(joint_accelerations[start:stop]))
+
+def stream_kuka_workspace_torques(robot_name: str, source: Optional[Iterable[TrajectoryChunk]] = None,
+                                  time_points: int = 100, duration: float = 10.0,
+                                  methods: Sequence[str] = ('newton_euler', 'lagrange'),
+                                  chunk_size: int = WORKSPACE_CHUNK_SIZE, dtype=None) -> Iterator[WorkspaceChunk]:
+    """
+    Workspace torques chunk by chunk
+
+    Args:
+        robot_name: Name of the KUKA robot model
+        source: Iterable of (time, q, qd, qdd) chunks, defaults to the sample trajectory
+        time_points: Time points of the default source
+        duration: Duration in seconds of the default source
+        methods: Torque methods, keys of METHODS
+        chunk_size: Time points per chunk of the default source
+        dtype: Compute dtype, defaults to the global compute dtype
+
+    Yields:
+        WorkspaceChunk per source chunk
+    """
+    if get_robot_by_name(robot_name) is None:
+        raise ValueError(f"Robot {robot_name} not found")
+    unknown = [m for m in methods if m not in METHODS]
+    if unknown:
+        raise ValueError(f"Unknown workspace methods {unknown}, expected {sorted(METHODS)}")
+    dtype = resolve_dtype(dtype)
+    if source is None:
+        source = sample_trajectory_source(robot_name, time_points, duration, chunk_size, dtype)
+    for time, q, qd, qdd in source:
+        q, qd, qdd = (np.atleast_2d(as_compute_array(x, dtype)) for x in (q, qd, qdd))
+        tau = {m: METHODS[m](robot_name, q, qd, qdd, dtype=dtype) for m in methods}
+        yield WorkspaceChunk(np.asarray(time), q, qd, qdd, tau)
+
+def run_pipeline(chunks: Iterable[WorkspaceChunk], *stages: Callable[[WorkspaceChunk], None]) -> int:
+    """Feed every chunk through the stages in order; returns the number of time points"""
+    count = 0
+    for chunk in chunks:
+        for stage in stages:
+            stage(chunk)
+        count += len(chunk.time)
+    return count
+
+def _durations(time: np.ndarray, previous: Optional[float]) -> Tuple[np.ndarray, float]:
+    """Sample durations (time to the previous point, the first point gets its successor's)"""
+    if len(time) == 0:
+        return np.zeros(0), previous
+    dt = np.diff(time, prepend=time[0] if previous is None else previous)
+    if previous is None:
+        dt[0] = dt[1] if len(dt) > 1 else 0.0
+    return dt, float(time[-1])
+
+class StatisticsStage:
+    """Streaming statistics of every method's torques; threshold as for StreamingStatistics"""
+
+    def __init__(self, threshold=None):
+        self.threshold = threshold
+        self.statistics: Dict[str, StreamingStatistics] = {}
+        self._previous = None
+
+    def __call__(self, chunk: WorkspaceChunk):
+        dt, self._previous = _durations(chunk.time, self._previous)
+        for method, tau in chunk.tau.items():
+            if method not in self.statistics:
+                self.statistics[method] = StreamingStatistics(tau.shape[1], self.threshold)
+            self.statistics[method].update(tau, dt)
+
+class LimitStage:
+    """
+    Torque limit check: violation counts and the first violation time per
+    method and joint (NaN if none)
+    """
+
+    def __init__(self, limits):
+        self.limits = np.asarray(limits, dtype=float)
+        self.counts: Dict[str, np.ndarray] = {}
+        self.first_time: Dict[str, np.ndarray] = {}
+
+    def __call__(self, chunk: WorkspaceChunk):
+        for method, tau in chunk.tau.items():
+            over = np.abs(tau) > self.limits[:tau.shape[1]]
+            if method not in self.counts:
+                self.counts[method] = np.zeros(tau.shape[1], dtype=np.int64)
+                self.first_time[method] = np.full(tau.shape[1], np.nan)
+            self.counts[method] += over.sum(axis=0)
+            first = np.argmax(over, axis=0)
+            new = np.isnan(self.first_time[method]) & over.any(axis=0)
+            self.first_time[method][new] = chunk.time[first[new]]
+
+    def violations(self) -> Dict[str, np.ndarray]:
+        """Joints (0-based) with violations per method"""
+        return {method: np.flatnonzero(counts) for method, counts in self.counts.items()}
+
+class EnvelopeStage:
+    """
+    Min/max envelope of the torque traces in at most max_points buckets
+
+    Buckets start one time point wide; when they run out, neighbours are
+    merged pairwise and the bucket width doubles, so peaks survive any
+    horizon in constant memory.
+    """
+
+    def __init__(self, max_points: int = ENVELOPE_POINTS):
+        self.max_points = max(2, int(max_points))
+        self.width = 1
+        self._time = np.zeros(0)
+        self._low: Dict[str, np.ndarray] = {}
+        self._high: Dict[str, np.ndarray] = {}
+        self._pending = None  # (start time, low, high, points) of the unfinished last bucket
+
+    def __call__(self, chunk: WorkspaceChunk):
+        n = len(chunk.time)
+        i = 0
+        while i < n:
+            if self._pending is None and n - i >= self.width:
+                # Whole buckets reduced at once
+                k = min((n - i) // self.width, self.max_points - len(self._time))
+                stop = i + k * self.width
+                low = {m: tau[i:stop].reshape(k, self.width, -1).min(axis=1) for m, tau in chunk.tau.items()}
+                high = {m: tau[i:stop].reshape(k, self.width, -1).max(axis=1) for m, tau in chunk.tau.items()}
+                self._append(chunk.time[i:stop:self.width], low, high)
+                i = stop
+                continue
+            if self._pending is None:
+                self._pending = (chunk.time[i], {}, {}, 0)
+            time, low, high, fill = self._pending
+            stop = min(n, i + self.width - fill)
+            for method, tau in chunk.tau.items():
+                lo, hi = tau[i:stop].min(axis=0), tau[i:stop].max(axis=0)
+                low[method] = np.minimum(low[method], lo) if method in low else lo
+                high[method] = np.maximum(high[method], hi) if method in high else hi
+            fill += stop - i
+            i = stop
+            self._pending = (time, low, high, fill)
+            if fill == self.width:
+                self._pending = None
+                self._append(np.array([time]), {m: v[None] for m, v in low.items()},
+                             {m: v[None] for m, v in high.items()})
+
+    def _append(self, time: np.ndarray, low: Dict[str, np.ndarray], high: Dict[str, np.ndarray]):
+        self._time = np.concatenate([self._time, time])
+        for method in low:
+            self._low[method] = np.concatenate([self._low[method], low[method]]) if method in self._low else low[method]
+            self._high[method] = np.concatenate([self._high[method], high[method]]) if method in self._high else high[method]
+        if len(self._time) >= self.max_points:
+            # Pairwise merge (an odd last bucket stays alone)
+            pairs = len(self._time) // 2
+            def merge(values, reduce):
+                merged = reduce(values[0:2 * pairs:2], values[1:2 * pairs:2])
+                return np.concatenate([merged, values[2 * pairs:]])
+            self._time = self._time[::2]
+            self._low = {m: merge(v, np.minimum) for m, v in self._low.items()}
+            self._high = {m: merge(v, np.maximum) for m, v in self._high.items()}
+            self.width *= 2
+
+    def traces(self) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """
+        Envelope as plottable traces: each bucket contributes its minimum
+        and maximum at the bucket start time
+
+        Returns:
+            Tuple of (time (2B,), {method: torques (2B, dof)})
+        """
+        time, low, high = self._time, dict(self._low), dict(self._high)
+        if self._pending is not None:
+            start, pending_low, pending_high, _ = self._pending
+            time = np.append(time, start)
+            for method in pending_low:
+                low[method] = np.concatenate([low[method], pending_low[method][None]]) if method in low else pending_low[method][None]
+                high[method] = np.concatenate([high[method], pending_high[method][None]]) if method in high else pending_high[method][None]
+        traces = {m: np.stack([low[m], high[m]], axis=1).reshape(-1, low[m].shape[1]) for m in low}
+        return np.repeat(time, 2), traces
+
+class CsvExportStage:
+    """Writes time, q and each method's torques as CSV rows while the stream runs"""
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self._file = open(filename, 'w', newline='', encoding='utf-8')
+        self._writer = csv.writer(self._file)
+        self._header = False
+
+    def __call__(self, chunk: WorkspaceChunk):
+        dof = chunk.q.shape[1]
+        if not self._header:
+            header = ['time'] + [f'q{j + 1}' for j in range(dof)]
+            for method in chunk.tau:
+                header += [f'{method}_tau{j + 1}' for j in range(dof)]
+            self._writer.writerow(header)
+            self._header = True
+        rows = np.column_stack([chunk.time, chunk.q] + list(chunk.tau.values()))
+        self._writer.writerows(rows.tolist())
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self) -> 'CsvExportStage':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def _study_variants(args) -> int:
+    """Fill the torques of a range of study variants; returns the number written"""
+    directory, variants, chunk_size = args
+    written = 0
+    with ResultStore(directory, 'r+') as store:
+        robot_name = store.attrs['robot']
+        duration = store.attrs['duration']
+        complete = store.complete('tau')
+        payloads = store['payload'][:]
+        for variant in variants:
+            if complete[variant]:
+                continue
+            start = 0
+            for time, q, qd, qdd in sample_trajectory_source(robot_name, len(store.coord('time')), duration,
+                                                             chunk_size, np.float64):
+                tau = calculate_kuka_rigid_body_torques_batch(robot_name, q, qd, qdd, payload=float(payloads[variant]),
+                                                              dtype=np.float64)
+                store.write('tau', (variant, slice(start, start + len(time))), tau)
+                start += len(time)
+            store.mark_complete('tau', variant)
+            written += 1
+    return written
+
+def run_workspace_study(robot_name: str, directory: str, payloads: Sequence[float], time_points: int = 100,
+                        duration: float = 10.0, dtype='float32', chunk_size: int = WORKSPACE_CHUNK_SIZE,
+                        workers: Optional[int] = None) -> ResultStore:
+    """
+    Rigid-body torques of the sample trajectory for every payload, written
+    to an out-of-core result store
+
+    The store holds 'payload' (variants,) and 'tau' (variants, time_points,
+    dof) with a 'time' coordinate. An existing store of the same study is
+    resumed: variants marked complete are skipped.
+
+    Args:
+        robot_name: Name of the KUKA robot model
+        directory: Store directory
+        payloads: Payload in kg per variant
+        time_points: Time points of the sample trajectory
+        duration: Trajectory duration in seconds
+        dtype: Stored torque dtype
+        chunk_size: Time points per computed chunk
+        workers: Worker processes, one per CPU (at most one per variant) by
+            default; 1 runs in this process
+
+    Returns:
+        The store, opened read-only
+    """
+    robot = get_robot_by_name(robot_name)
+    if robot is None:
+        raise ValueError(f"Robot {robot_name} not found")
+    payloads = np.asarray(payloads, dtype=float)
+    attrs = {'robot': robot_name, 'duration': duration, 'method': 'rigid_body'}
+    try:
+        store = ResultStore(directory)
+        if (store.attrs != attrs or store.variants != len(payloads) or len(store.coord('time')) != time_points
+                or not np.array_equal(store['payload'][:], payloads)):
+            raise ValueError(f"{directory} holds a different workspace study")
+        store.close()
+    except FileNotFoundError:
+        store = ResultStore.create(directory, len(payloads),
+                                   {'payload': ((), np.float64), 'tau': ((time_points, robot.dof), dtype)},
+                                   coords={'time': np.linspace(0, duration, time_points)}, attrs=attrs)
+        store.write('payload', slice(None), payloads)
+        store.close()
+
+    workers = workers or min(len(payloads), os.cpu_count() or 1)
+    parts = [p for p in np.array_split(np.arange(len(payloads)), max(workers, 1)) if len(p)]
+    jobs = [(directory, part, chunk_size) for part in parts]
+    if workers <= 1 or len(jobs) <= 1:
+        for job in jobs:
+            _study_variants(job)
+    else:
+        with model_process_pool(len(jobs)) as pool:
+            list(pool.map(_study_variants, jobs))
+    return ResultStore(directory)
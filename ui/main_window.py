@@ -1,18 +1,28 @@
 from PyQt5.QtWidgets import (QWidget, QLabel, QLineEdit, QPushButton, QVBoxLayout, 
                              QHBoxLayout, QGroupBox, QGridLayout, QFrame, QSplitter,
                              QComboBox, QTabWidget, QTextEdit, QMessageBox, QFileDialog,
-                             QProgressBar, QSlider, QSpinBox, QDoubleSpinBox)
+                             QProgressBar, QSlider, QSpinBox, QDoubleSpinBox, QCheckBox)
 from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtGui import QFont, QPalette, QColor, QIcon
 from logic.newton_euler import calculate_newton_euler_torque
 from logic.lagrange import calculate_lagrange, calculate_lagrange_numerical
 from graphics.plotter import PlotWidget
 from graphics.robot_visualizer import RobotVisualizer
-from robots.kuka_robots import get_available_robots, get_robot_by_name
+from graphics.trajectory_player import TrajectoryPlayer
+from robots.kuka_robots import get_available_robots, get_robot_by_name, get_robot_torque_limits
+from robots.configuration_index import get_configuration_index
+from robots.torque_envelope import get_torque_envelope
 from robots.kuka_dynamics import (calculate_kuka_newton_euler, calculate_kuka_lagrange,
                                  calculate_kuka_kinetic_energy, calculate_kuka_potential_energy,
-                                 get_kuka_robot_info, calculate_kuka_workspace_torques)
+                                 get_kuka_robot_info, generate_kuka_sample_trajectory)
+from robots.workspace_stream import stream_kuka_workspace_torques, run_pipeline, StatisticsStage, EnvelopeStage
+from robots.kuka_kinematics import calculate_kuka_forward_kinematics
 from utils.export_utils import RobotResultsExporter
+from utils.history import get_analysis_history
+from utils.telemetry import TelemetryMonitor, SocketTelemetrySource, ReplayTelemetrySource
+from utils.profiling import (enable_profiling, disable_profiling, is_profiling_enabled, reset_profiling,
+                             get_profile_stats, export_profile_jsonl, export_profile_flamegraph)
+import sqlite3
 import numpy as np
 
 class MainWindow(QWidget):
@@ -42,6 +52,9 @@ class MainWindow(QWidget):
         main_layout.addWidget(splitter)
         self.setLayout(main_layout)
         
+        robot = get_robot_by_name(self.robot_combo.currentText())
+        self.set_joint_count(robot.dof if robot else 6)
+        
     def create_control_panel(self):
         panel = QFrame()
         panel.setFrameStyle(QFrame.Box)
@@ -326,55 +339,87 @@ class MainWindow(QWidget):
         group = QGroupBox("KUKA Newton-Euler Analysis")
         group.setFont(QFont("Arial", 12, QFont.Bold))
         
-        layout = QGridLayout()
+        layout = QVBoxLayout()
+        self.joint_input_layout = QGridLayout()
         
         # Başlık satırı ekle
-        layout.addWidget(QLabel("Axis"), 0, 0)
-        layout.addWidget(QLabel("Angle (rad)"), 0, 1)
-        layout.addWidget(QLabel("Velocity (rad/s)"), 0, 2)
-        layout.addWidget(QLabel("Acceleration (rad/s²)"), 0, 3)
+        self.joint_input_layout.addWidget(QLabel("Axis"), 0, 0)
+        self.joint_input_layout.addWidget(QLabel("Angle (rad)"), 0, 1)
+        self.joint_input_layout.addWidget(QLabel("Velocity (rad/s)"), 0, 2)
+        self.joint_input_layout.addWidget(QLabel("Acceleration (rad/s²)"), 0, 3)
         
-        # Her eksen için ayrı input alanları
+        # Her eksen için ayrı input alanları, robot seçimine göre gösterilir
+        self.joint_input_rows = []
         self.joint_angles_inputs = []
         self.joint_velocities_inputs = []
         self.joint_accelerations_inputs = []
         
         for i in range(6):
-            # Joint angle input
-            angle_input = QLineEdit()
-            angle_input.setPlaceholderText(f"Axis {i+1} angle value (0-360°)")
-            angle_input.setText("0")
-            angle_input.setStyleSheet("QLineEdit { padding: 8px; border: 2px solid #bdc3c7; border-radius: 5px; }")
-            self.joint_angles_inputs.append(angle_input)
-            
-            # Joint velocity input
-            velocity_input = QLineEdit()
-            velocity_input.setPlaceholderText(f"Axis {i+1} angular velocity value")
-            velocity_input.setText("0")
-            velocity_input.setStyleSheet("QLineEdit { padding: 8px; border: 2px solid #bdc3c7; border-radius: 5px; }")
-            self.joint_velocities_inputs.append(velocity_input)
-            
-            # Joint acceleration input
-            acceleration_input = QLineEdit()
-            acceleration_input.setPlaceholderText(f"Axis {i+1} angular acceleration value")
-            acceleration_input.setText("0")
-            acceleration_input.setStyleSheet("QLineEdit { padding: 8px; border: 2px solid #bdc3c7; border-radius: 5px; }")
-            self.joint_accelerations_inputs.append(acceleration_input)
-            
-            # Layout'a ekle
-            layout.addWidget(QLabel(f"Axis {i+1}:"), i+1, 0)
-            layout.addWidget(angle_input, i+1, 1)
-            layout.addWidget(velocity_input, i+1, 2)
-            layout.addWidget(acceleration_input, i+1, 3)
+            self.add_joint_input_row(i)
         
         # Açıklama metni ekle
         info_text = QLabel("Angle: Joint angle (in radians)\nVelocity: Joint angular velocity (rad/s)\nAcceleration: Joint angular acceleration (rad/s²)")
         info_text.setStyleSheet("color: #7f8c8d; font-size: 10px; margin-top: 10px;")
-        layout.addWidget(info_text, 7, 0, 1, 4)
+        layout.addLayout(self.joint_input_layout)
+        layout.addWidget(info_text)
         
         group.setLayout(layout)
         return group
     
+    def add_joint_input_row(self, i):
+        """Add the angle, velocity and acceleration inputs of axis i+1"""
+        # Joint angle input
+        angle_input = QLineEdit()
+        angle_input.setPlaceholderText(f"Axis {i+1} angle value (0-360°)")
+        angle_input.setText("0")
+        angle_input.setStyleSheet("QLineEdit { padding: 8px; border: 2px solid #bdc3c7; border-radius: 5px; }")
+        self.joint_angles_inputs.append(angle_input)
+        
+        # Joint velocity input
+        velocity_input = QLineEdit()
+        velocity_input.setPlaceholderText(f"Axis {i+1} angular velocity value")
+        velocity_input.setText("0")
+        velocity_input.setStyleSheet("QLineEdit { padding: 8px; border: 2px solid #bdc3c7; border-radius: 5px; }")
+        self.joint_velocities_inputs.append(velocity_input)
+        
+        # Joint acceleration input
+        acceleration_input = QLineEdit()
+        acceleration_input.setPlaceholderText(f"Axis {i+1} angular acceleration value")
+        acceleration_input.setText("0")
+        acceleration_input.setStyleSheet("QLineEdit { padding: 8px; border: 2px solid #bdc3c7; border-radius: 5px; }")
+        self.joint_accelerations_inputs.append(acceleration_input)
+        
+        # Layout'a ekle
+        label = QLabel(f"Axis {i+1}:")
+        self.joint_input_layout.addWidget(label, i+1, 0)
+        self.joint_input_layout.addWidget(angle_input, i+1, 1)
+        self.joint_input_layout.addWidget(velocity_input, i+1, 2)
+        self.joint_input_layout.addWidget(acceleration_input, i+1, 3)
+        self.joint_input_rows.append((label, angle_input, velocity_input, acceleration_input))
+    
+    def set_joint_count(self, dof):
+        """Show one input row and one slider per joint of the selected robot"""
+        while len(self.joint_input_rows) < dof:
+            self.add_joint_input_row(len(self.joint_input_rows))
+        while len(self.joint_sliders) < dof:
+            self.add_joint_slider(len(self.joint_sliders))
+        
+        for i, row in enumerate(self.joint_input_rows):
+            for widget in row:
+                widget.setVisible(i < dof)
+        for i, (label, slider) in enumerate(zip(self.joint_labels, self.joint_sliders)):
+            label.setVisible(i < dof)
+            slider.setVisible(i < dof)
+        self.joint_count = dof
+    
+    def read_joint_inputs(self):
+        """Angles, velocities and accelerations entered for the selected robot's joints"""
+        n = self.joint_count
+        angles = [float(w.text()) for w in self.joint_angles_inputs[:n]]
+        velocities = [float(w.text()) for w in self.joint_velocities_inputs[:n]]
+        accelerations = [float(w.text()) for w in self.joint_accelerations_inputs[:n]]
+        return angles, velocities, accelerations
+    
     def create_robot_max_values_group(self):
         group = QGroupBox("Selected Robot Max Values")
         group.setFont(QFont("Arial", 12, QFont.Bold))
@@ -533,6 +578,14 @@ class MainWindow(QWidget):
         export_tab = self.create_export_tab()
         results_tab.addTab(export_tab, "Export")
         
+        # Live telemetry tab
+        live_tab = self.create_live_monitor_tab()
+        results_tab.addTab(live_tab, "Live Monitor")
+        
+        # Performance tab
+        performance_tab = self.create_performance_tab()
+        results_tab.addTab(performance_tab, "Performance")
+        
         layout.addWidget(results_tab)
         
         panel.setLayout(layout)
@@ -877,19 +930,27 @@ class MainWindow(QWidget):
         """Handle robot selection change"""
         selected_robot = self.robot_combo.currentText()
         if selected_robot:
+            self.set_joint_count(get_robot_by_name(selected_robot).dof)
             self.update_robot_info_display(selected_robot)
+            # Prebuilt configuration index (python -m robots.configuration_index), if any
+            self.robot_visualizer.reachability_index = get_configuration_index(selected_robot, build=False)
             # --- YENİ: Robotun eksen başına tork değerlerini grafikle çiz ---
             from robots.kuka_dynamics import get_kuka_robot_info
             import numpy as np
             info = get_kuka_robot_info(selected_robot)
             static_torques = info['static_torques']
+            # Worst case over the joint limits at rated payload (searched once, then cached)
+            envelope = get_torque_envelope(selected_robot, float(info['max_payload']), workers=1)
             joints = np.arange(1, len(static_torques)+1)
             self.robot_specs_plot.figure.clear()
             ax = self.robot_specs_plot.figure.add_subplot(1, 1, 1)
-            ax.bar(joints, static_torques, color='#e74c3c', label='Static Torque (Nm)')
+            ax.bar(joints - 0.2, envelope.max_torque, width=0.4, color='#e74c3c',
+                   label=f"Max Static Torque, {info['max_payload']:g} kg (Nm)")
+            ax.bar(joints + 0.2, np.abs(static_torques), width=0.4, color='#3498db',
+                   label='Static Torque at Zero Pose (Nm)')
             ax.set_xlabel('Joint No')
             ax.set_ylabel('Torque (Nm)')
-            ax.set_title('Joint Base Torque Values (Newton-Euler)')
+            ax.set_title('Joint Static Torque Values (Newton-Euler)')
             ax.legend()
             ax.grid(True, alpha=0.3)
             self.robot_specs_plot.figure.tight_layout()
@@ -905,9 +966,9 @@ class MainWindow(QWidget):
 • Repeatability: {info['repeatability']} mm<br>
 • Total Mass: {info['total_mass']:.2f} kg<br>
 • Total Inertia: {info['total_inertia']:.4f} kg·m²<br><br>
-<b>Max Torque Values (Nm):</b><br>
+<b>Max Torque Values (Nm, worst static case over the joint limits at {info['max_payload']:g} kg):</b><br>
 """
-            for i, torque in enumerate(static_torques):
+            for i, torque in enumerate(envelope.max_torque):
                 max_info_text += f"• Joint {i+1}: {torque:.2f} Nm<br>"
             
             self.robot_max_info_label.setText(max_info_text)
@@ -975,9 +1036,7 @@ Link {i+1}:
                 return
             
             # Parse input values from new input fields
-            angles = [float(self.joint_angles_inputs[i].text()) for i in range(6)]
-            velocities = [float(self.joint_velocities_inputs[i].text()) for i in range(6)]
-            accelerations = [float(self.joint_accelerations_inputs[i].text()) for i in range(6)]
+            angles, velocities, accelerations = self.read_joint_inputs()
             
             # Calculate torques
             torques = calculate_kuka_newton_euler(selected_robot, angles, velocities, accelerations)
@@ -1009,6 +1068,8 @@ Link {i+1}:
             
             # Store analysis data for export
             self.current_analysis_data = {
+                'analysis_type': 'newton_euler',
+                'inputs': {'angles': angles, 'velocities': velocities, 'accelerations': accelerations},
                 'robot_specs': get_kuka_robot_info(selected_robot),
                 'torque_analysis': {
                     'newton_euler': torques,
@@ -1016,6 +1077,7 @@ Link {i+1}:
                 },
                 'warnings': violations
             }
+            self.record_analysis_history(selected_robot)
             
         except Exception as e:
             self.results_text.setText(f"Error in KUKA Newton-Euler calculation: {str(e)}")
@@ -1031,15 +1093,13 @@ Link {i+1}:
                 return
             
             # Parse input values from new input fields
-            angles = [float(self.joint_angles_inputs[i].text()) for i in range(6)]
-            velocities = [float(self.joint_velocities_inputs[i].text()) for i in range(6)]
-            accelerations = [float(self.joint_accelerations_inputs[i].text()) for i in range(6)]
+            angles, velocities, accelerations = self.read_joint_inputs()
             
             # Calculate torques
             torques = calculate_kuka_lagrange(selected_robot, angles, velocities, accelerations)
             
             # Calculate energies
-            kinetic_energy = calculate_kuka_kinetic_energy(selected_robot, velocities)
+            kinetic_energy = calculate_kuka_kinetic_energy(selected_robot, angles, velocities)
             potential_energy = calculate_kuka_potential_energy(selected_robot, angles)
             
             # Display results
@@ -1074,6 +1134,8 @@ Link {i+1}:
             
             # Store analysis data for export
             self.current_analysis_data = {
+                'analysis_type': 'lagrange',
+                'inputs': {'angles': angles, 'velocities': velocities, 'accelerations': accelerations},
                 'robot_specs': get_kuka_robot_info(selected_robot),
                 'torque_analysis': {
                     'newton_euler': [],
@@ -1086,6 +1148,7 @@ Link {i+1}:
                 },
                 'warnings': violations
             }
+            self.record_analysis_history(selected_robot)
             
         except Exception as e:
             self.results_text.setText(f"Error in KUKA Lagrange calculation: {str(e)}")
@@ -1099,31 +1162,74 @@ Link {i+1}:
                 self.results_text.setText("Please select a KUKA robot first.")
                 return
             
-            # Calculate workspace torques
-            time, torque_arrays = calculate_kuka_workspace_torques(selected_robot)
-            newton_euler_torques = torque_arrays[0]
-            lagrange_torques = torque_arrays[1]
+            # Stream the workspace torques through statistics, plot envelope and playback stages
+            robot = get_robot_by_name(selected_robot)
+            limits = get_robot_torque_limits(selected_robot)
+            threshold = limits if len(limits) == robot.dof else None
+            statistics = StatisticsStage(threshold)
+            envelope = EnvelopeStage()
+            times, frames = [], []
+            def playback_stage(chunk):
+                times.append(chunk.time)
+                frames.append(calculate_kuka_forward_kinematics(selected_robot, chunk.q))
+            time_points = run_pipeline(stream_kuka_workspace_torques(selected_robot), statistics, envelope,
+                                       playback_stage)
+            
+            envelope_time, traces = envelope.traces()
+            self.main_plot.plot_workspace_analysis(envelope_time, traces['newton_euler'], traces['lagrange'])
+            
+            # Playback frames come from one batched forward kinematics call per chunk
+            time = np.concatenate(times)
+            self.playback_frames = np.concatenate(frames)
+            self.robot_visualizer.start_playback(selected_robot)
+            self.trajectory_player.load(time, self.playback_frames)
+            self.playback_slider.setEnabled(True)
+            self.play_button.setEnabled(True)
             
             # Display results
             result_text = f"KUKA Workspace Analysis Results:\n"
             result_text += f"Robot: {selected_robot}\n"
             result_text += f"Simulation Time: 10 seconds\n"
-            result_text += f"Time Points: {len(time)}\n\n"
+            result_text += f"Time Points: {time_points}\n\n"
             
             # Calculate statistics
-            ne_max_torques = np.max(newton_euler_torques, axis=0)
-            lag_max_torques = np.max(lagrange_torques, axis=0)
+            ne_stats = statistics.statistics['newton_euler']
+            lag_stats = statistics.statistics['lagrange']
+            ne_max_torques = ne_stats.max
+            lag_max_torques = lag_stats.max
             
             result_text += f"Maximum Torques (Newton-Euler):\n"
-            for i, torque in enumerate(ne_max_torques):
-                result_text += f"  Joint {i+1}: {torque:.4f} Nm\n"
+            for i, (torque, rms) in enumerate(zip(ne_max_torques, ne_stats.rms)):
+                result_text += f"  Joint {i+1}: {torque:.4f} Nm (RMS {rms:.4f} Nm)\n"
             
             result_text += f"\nMaximum Torques (Lagrange):\n"
-            for i, torque in enumerate(lag_max_torques):
-                result_text += f"  Joint {i+1}: {torque:.4f} Nm\n"
+            for i, (torque, rms) in enumerate(zip(lag_max_torques, lag_stats.rms)):
+                result_text += f"  Joint {i+1}: {torque:.4f} Nm (RMS {rms:.4f} Nm)\n"
+            
+            if threshold is not None:
+                result_text += f"\nTime Above Torque Limit (Newton-Euler / Lagrange):\n"
+                for i, (ne_time, lag_time) in enumerate(zip(ne_stats.time_above, lag_stats.time_above)):
+                    result_text += f"  Joint {i+1}: {ne_time:.2f} s / {lag_time:.2f} s\n"
             
             self.results_text.setText(result_text)
             
+            # Store analysis data for export
+            self.current_analysis_data = {
+                'analysis_type': 'workspace',
+                'inputs': {'time_points': time_points, 'duration': 10.0},
+                'robot_specs': get_kuka_robot_info(selected_robot),
+                'torque_analysis': {
+                    'newton_euler': ne_max_torques.tolist(),
+                    'lagrange': lag_max_torques.tolist()
+                },
+                'torque_statistics': {
+                    'newton_euler': ne_stats.summary(),
+                    'lagrange': lag_stats.summary()
+                },
+                'warnings': []
+            }
+            self.record_analysis_history(selected_robot)
+            
             # Update result label
             max_ne_torque = np.max(ne_max_torques)
             max_lag_torque = np.max(lag_max_torques)
@@ -1145,51 +1251,131 @@ Link {i+1}:
         joint_control_group.setFont(QFont("Arial", 10, QFont.Bold))
         
         joint_layout = QGridLayout()
+        self.joint_slider_layout = joint_layout
         
         self.joint_sliders = []
         self.joint_labels = []
         
         for i in range(6):
-            # Joint label
-            label = QLabel(f"Joint {i+1}: 0°")
-            self.joint_labels.append(label)
-            
-            # Joint slider
-            slider = QSlider(Qt.Horizontal)
-            slider.setRange(-180, 180)
-            slider.setValue(0)
-            slider.setStyleSheet("""
-                QSlider::groove:horizontal {
-                    border: 1px solid #bdc3c7;
-                    height: 8px;
-                    background: #ecf0f1;
-                    border-radius: 4px;
-                }
-                QSlider::handle:horizontal {
-                    background: #3498db;
-                    border: 1px solid #2980b9;
-                    width: 18px;
-                    margin: -2px 0;
-                    border-radius: 9px;
-                }
-                QSlider::handle:horizontal:hover {
-                    background: #2980b9;
-                }
-            """)
-            
-            slider.valueChanged.connect(lambda value, idx=i: self.update_joint_angle(idx, value))
-            self.joint_sliders.append(slider)
-            
-            joint_layout.addWidget(label, i, 0)
-            joint_layout.addWidget(slider, i, 1)
+            self.add_joint_slider(i)
         
         joint_control_group.setLayout(joint_layout)
         layout.addWidget(joint_control_group)
+        layout.addWidget(self.create_playback_group())
         layout.addWidget(self.robot_viz_widget)
         
         tab.setLayout(layout)
         return tab
     
+    def add_joint_slider(self, i):
+        """Add the angle slider of joint i+1"""
+        # Joint label
+        label = QLabel(f"Joint {i+1}: 0°")
+        self.joint_labels.append(label)
+        
+        # Joint slider
+        slider = QSlider(Qt.Horizontal)
+        slider.setRange(-180, 180)
+        slider.setValue(0)
+        slider.setStyleSheet("""
+            QSlider::groove:horizontal {
+                border: 1px solid #bdc3c7;
+                height: 8px;
+                background: #ecf0f1;
+                border-radius: 4px;
+            }
+            QSlider::handle:horizontal {
+                background: #3498db;
+                border: 1px solid #2980b9;
+                width: 18px;
+                margin: -2px 0;
+                border-radius: 9px;
+            }
+            QSlider::handle:horizontal:hover {
+                background: #2980b9;
+            }
+        """)
+        
+        slider.valueChanged.connect(lambda value, idx=i: self.update_joint_angle(idx, value))
+        self.joint_sliders.append(slider)
+        
+        self.joint_slider_layout.addWidget(label, i, 0)
+        self.joint_slider_layout.addWidget(slider, i, 1)
+    
+    def create_playback_group(self):
+        group = QGroupBox("Trajectory Playback")
+        group.setFont(QFont("Arial", 10, QFont.Bold))
+        
+        layout = QHBoxLayout()
+        
+        self.trajectory_player = TrajectoryPlayer(fps=30, parent=self)
+        self.trajectory_player.frame_changed.connect(self.on_playback_frame)
+        self.trajectory_player.playing_changed.connect(
+            lambda playing: self.play_button.setText("Pause" if playing else "Play"))
+        
+        self.play_button = QPushButton("Play")
+        self.play_button.setEnabled(False)
+        self.play_button.clicked.connect(self.trajectory_player.toggle)
+        self.play_button.setStyleSheet("""
+            QPushButton {
+                background-color: #27ae60;
+                color: white;
+                padding: 6px 12px;
+                border: none;
+                border-radius: 5px;
+                font-weight: bold;
+            }
+            QPushButton:hover {
+                background-color: #229954;
+            }
+            QPushButton:disabled {
+                background-color: #95a5a6;
+            }
+        """)
+        
+        # Time scrubbing, 1000 steps over the whole trajectory
+        self.playback_slider = QSlider(Qt.Horizontal)
+        self.playback_slider.setRange(0, 1000)
+        self.playback_slider.setEnabled(False)
+        self.playback_slider.valueChanged.connect(self.on_playback_slider_moved)
+        
+        self.playback_time_label = QLabel("t = 0.00 s")
+        
+        self.playback_speed_input = QDoubleSpinBox()
+        self.playback_speed_input.setRange(0.1, 10.0)
+        self.playback_speed_input.setSingleStep(0.1)
+        self.playback_speed_input.setValue(1.0)
+        self.playback_speed_input.setSuffix(" x")
+        self.playback_speed_input.valueChanged.connect(self.trajectory_player.set_speed)
+        
+        layout.addWidget(self.play_button)
+        layout.addWidget(self.playback_slider, stretch=1)
+        layout.addWidget(self.playback_time_label)
+        layout.addWidget(QLabel("Speed:"))
+        layout.addWidget(self.playback_speed_input)
+        
+        group.setLayout(layout)
+        return group
+    
+    def on_playback_frame(self, index, t):
+        """Render a playback frame and sync the time slider and torque cursor"""
+        frames = self.playback_frames
+        self.robot_visualizer.draw_playback_frame(frames[index], frames[:index + 1, -1])
+        self.main_plot.set_time_cursor(t)
+        self.playback_time_label.setText(f"t = {t:.2f} s")
+        
+        player = self.trajectory_player
+        duration = player.end_time - player.start_time
+        if duration > 0:
+            self.playback_slider.blockSignals(True)
+            self.playback_slider.setValue(int(round(1000 * (t - player.start_time) / duration)))
+            self.playback_slider.blockSignals(False)
+    
+    def on_playback_slider_moved(self, value):
+        """Scrub the trajectory to the slider position"""
+        player = self.trajectory_player
+        player.seek(player.start_time + (player.end_time - player.start_time) * value / 1000)
+    
     def create_export_tab(self):
         tab = QWidget()
         layout = QVBoxLayout()
@@ -1276,31 +1462,241 @@ Link {i+1}:
         tab.setLayout(layout)
         return tab
     
+    def create_live_monitor_tab(self):
+        tab = QWidget()
+        layout = QVBoxLayout()
+        
+        source_group = QGroupBox("Telemetry Source")
+        source_group.setFont(QFont("Arial", 10, QFont.Bold))
+        source_layout = QHBoxLayout()
+        
+        self.live_source_combo = QComboBox()
+        self.live_source_combo.addItems(["Replay Sample Trajectory", "UDP Socket", "Unix Socket"])
+        
+        # host:port for UDP, file path for Unix sockets
+        self.live_address_input = QLineEdit("127.0.0.1:5005")
+        
+        self.live_button = QPushButton("Start Monitoring")
+        self.live_button.clicked.connect(self.toggle_live_monitor)
+        self.live_button.setStyleSheet("""
+            QPushButton {
+                background-color: #27ae60;
+                color: white;
+                padding: 8px;
+                border: none;
+                border-radius: 5px;
+                font-weight: bold;
+            }
+            QPushButton:hover {
+                background-color: #229954;
+            }
+        """)
+        
+        source_layout.addWidget(self.live_source_combo)
+        source_layout.addWidget(self.live_address_input, stretch=1)
+        source_layout.addWidget(self.live_button)
+        source_group.setLayout(source_layout)
+        layout.addWidget(source_group)
+        
+        self.live_plot = PlotWidget()
+        layout.addWidget(self.live_plot, stretch=1)
+        
+        self.live_status = QLabel("Live monitoring stopped.")
+        self.live_status.setStyleSheet("""
+            QLabel {
+                padding: 10px;
+                background-color: #ecf0f1;
+                border: 2px solid #bdc3c7;
+                border-radius: 5px;
+                font-family: 'Courier New';
+            }
+        """)
+        layout.addWidget(self.live_status)
+        
+        # Rolling plots refresh at a bounded rate, independent of packet rate
+        self.live_monitor = None
+        self.live_timer = QTimer(self)
+        self.live_timer.setInterval(100)
+        self.live_timer.timeout.connect(self.update_live_monitor)
+        
+        tab.setLayout(layout)
+        return tab
+    
+    def toggle_live_monitor(self):
+        """Start or stop the live telemetry monitor"""
+        if self.live_monitor is not None:
+            self.live_timer.stop()
+            self.live_monitor.stop()
+            self.live_monitor = None
+            self.live_button.setText("Start Monitoring")
+            self.live_status.setText("Live monitoring stopped.")
+            return
+        
+        try:
+            selected_robot = self.robot_combo.currentText()
+            if not selected_robot:
+                self.live_status.setText("Please select a KUKA robot first.")
+                return
+            
+            source_type = self.live_source_combo.currentText()
+            address = self.live_address_input.text().strip()
+            if source_type == "UDP Socket":
+                host, port = address.rsplit(':', 1)
+                source = SocketTelemetrySource((host, int(port)))
+            elif source_type == "Unix Socket":
+                source = SocketTelemetrySource(address)
+            else:
+                # 1 kHz replay of the workspace sample trajectory
+                source = ReplayTelemetrySource(*generate_kuka_sample_trajectory(selected_robot, 10001))
+            
+            self.live_monitor = TelemetryMonitor(selected_robot, source)
+            self.live_monitor.start()
+            self.live_timer.start()
+            self.live_button.setText("Stop Monitoring")
+        except Exception as e:
+            self.live_monitor = None
+            self.live_status.setText(f"Failed to start live monitoring: {str(e)}")
+    
+    def update_live_monitor(self):
+        """Refresh the rolling torque plot and status from the live monitor"""
+        monitor = self.live_monitor
+        if monitor is None:
+            return
+        
+        # Last 10 seconds at 1 kHz
+        time, torques = monitor.snapshot(10000)
+        self.live_plot.plot_live_torques(time, torques)
+        
+        summary = monitor.summary()
+        status = f"Robot: {monitor.robot_name}   Samples: {summary['samples']}   "
+        status += f"Batch latency: {summary['last_latency'] * 1000:.2f} ms\n"
+        status += "Peak |τ| (Nm): " + ", ".join(f"{t:.1f}" for t in summary['peak_torques']) + "\n"
+        status += "Limit violations: " + ", ".join(str(c) for c in summary['violation_counts'])
+        self.live_status.setText(status)
+    
+    def closeEvent(self, event):
+        """Stop the live monitor so its socket is closed and unlinked"""
+        self.live_timer.stop()
+        if self.live_monitor is not None:
+            # TelemetryMonitor.stop also closes the telemetry source
+            self.live_monitor.stop()
+            self.live_monitor = None
+        super().closeEvent(event)
+    
+    def create_performance_tab(self):
+        tab = QWidget()
+        layout = QVBoxLayout()
+        
+        controls_group = QGroupBox("Profiling")
+        controls_group.setFont(QFont("Arial", 10, QFont.Bold))
+        controls_layout = QHBoxLayout()
+        
+        self.profiling_checkbox = QCheckBox("Enable profiling")
+        self.profiling_checkbox.setChecked(is_profiling_enabled())
+        self.profiling_checkbox.toggled.connect(self.toggle_profiling)
+        
+        reset_button = QPushButton("Reset")
+        reset_button.clicked.connect(self.reset_performance_stats)
+        
+        jsonl_button = QPushButton("Export JSONL")
+        jsonl_button.clicked.connect(lambda: self.export_performance_stats('jsonl'))
+        
+        flamegraph_button = QPushButton("Export Flame Graph")
+        flamegraph_button.clicked.connect(lambda: self.export_performance_stats('flamegraph'))
+        
+        controls_layout.addWidget(self.profiling_checkbox)
+        controls_layout.addStretch()
+        controls_layout.addWidget(reset_button)
+        controls_layout.addWidget(jsonl_button)
+        controls_layout.addWidget(flamegraph_button)
+        controls_group.setLayout(controls_layout)
+        layout.addWidget(controls_group)
+        
+        self.performance_text = QTextEdit()
+        self.performance_text.setReadOnly(True)
+        self.performance_text.setStyleSheet("""
+            QTextEdit {
+                background-color: #ecf0f1;
+                border: 2px solid #bdc3c7;
+                border-radius: 5px;
+                padding: 10px;
+                font-family: 'Courier New';
+                font-size: 11px;
+            }
+        """)
+        self.performance_text.setPlaceholderText("Enable profiling and run an analysis to see per-function timings.")
+        layout.addWidget(self.performance_text)
+        
+        self.performance_timer = QTimer(self)
+        self.performance_timer.setInterval(1000)
+        self.performance_timer.timeout.connect(self.update_performance_stats)
+        if is_profiling_enabled():
+            self.performance_timer.start()
+        
+        tab.setLayout(layout)
+        return tab
+    
+    def toggle_profiling(self, enabled):
+        """Turn hot-path profiling on or off"""
+        if enabled:
+            enable_profiling()
+            self.performance_timer.start()
+        else:
+            disable_profiling()
+            self.performance_timer.stop()
+        self.update_performance_stats()
+    
+    def reset_performance_stats(self):
+        reset_profiling()
+        self.update_performance_stats()
+    
+    def update_performance_stats(self):
+        """Show per-function profiling statistics"""
+        rows = get_profile_stats()
+        text = f"{'Function':<48} {'Calls':>8} {'Total ms':>10} {'Mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'Max size':>9}\n"
+        text += "-" * 118 + "\n"
+        for row in rows:
+            name = row['function'].split('.', 1)[-1] if len(row['function']) > 48 else row['function']
+            text += (f"{name[-48:]:<48} {row['calls']:>8} {row['total_s'] * 1e3:>10.2f} "
+                     f"{row['mean_s'] * 1e3:>9.3f} {row['p50_s'] * 1e3:>9.3f} {row['p95_s'] * 1e3:>9.3f} "
+                     f"{row['p99_s'] * 1e3:>9.3f} {row['max_size']:>9}\n")
+        if not rows:
+            text += "No calls recorded.\n"
+        self.performance_text.setText(text)
+    
+    def export_performance_stats(self, format_type):
+        """Export profiling statistics as JSONL or collapsed flame-graph stacks"""
+        try:
+            if format_type == 'jsonl':
+                filename, _ = QFileDialog.getSaveFileName(self, "Export Profile", "profile.jsonl", "JSONL (*.jsonl)")
+                if filename:
+                    export_profile_jsonl(filename)
+            else:
+                filename, _ = QFileDialog.getSaveFileName(self, "Export Flame Graph", "profile.folded", "Folded stacks (*.folded)")
+                if filename:
+                    export_profile_flamegraph(filename)
+            if filename:
+                QMessageBox.information(self, "Export Success", f"Profile exported successfully to:\n{filename}")
+        except Exception as e:
+            QMessageBox.critical(self, "Export Error", f"Failed to export profile: {str(e)}")
+    
     def update_joint_angle(self, joint_idx, value):
         """Update joint angle and redraw robot"""
         # Update label
         self.joint_labels[joint_idx].setText(f"Joint {joint_idx+1}: {value}°")
         
         # Convert to radians
-        joint_angles = [np.radians(self.joint_sliders[i].value()) for i in range(6)]
+        joint_angles = [np.radians(slider.value()) for slider in self.joint_sliders[:self.joint_count]]
         
         # Get selected robot
         selected_robot = self.robot_combo.currentText()
         if selected_robot:
-            # Draw robot
-            self.robot_visualizer.draw_kuka_robot(selected_robot, joint_angles)
+            # Move the joint; only the distal links are recomputed and redrawn
+            self.robot_visualizer.update_joint_angle(selected_robot, joint_angles, joint_idx)
     
     def check_safety_limits(self, robot_name, torques):
         """Check if torques exceed safety limits"""
-        # KUKA robot torque limits (approximate)
-        limits = {
-            'KR3 R540': [50, 50, 20, 20, 10, 10],
-            'KR6 R900': [100, 100, 50, 50, 20, 20],
-            'KR10 R1100': [150, 150, 80, 80, 30, 30],
-            'KR16 R1610': [200, 200, 120, 120, 50, 50]
-        }
-        
-        robot_limits = limits.get(robot_name, [100] * 6)
+        robot_limits = get_robot_torque_limits(robot_name)
         violations = []
         
         for i, (torque, limit) in enumerate(zip(torques, robot_limits)):
@@ -1309,6 +1705,16 @@ Link {i+1}:
         
         return violations
     
+    def record_analysis_history(self, robot_name):
+        """Add the current analysis to the analysis history"""
+        self.current_history_id = None
+        try:
+            data = self.current_analysis_data
+            self.current_history_id = get_analysis_history().record(robot_name, data['analysis_type'], data)
+        except (sqlite3.Error, OSError, ValueError):
+            # The history is a convenience, an analysis never fails because of it
+            pass
+    
     def export_results(self, format_type):
         """Export analysis results"""
         try:
@@ -1329,6 +1735,9 @@ Link {i+1}:
                 QMessageBox.warning(self, "Export Error", "Unsupported export format.")
                 return
             
+            if getattr(self, 'current_history_id', None) is not None:
+                get_analysis_history().set_source(self.current_history_id, filename)
+            
             # Update status
             self.export_status.setText(f"Exported successfully to: {filename}")
             self.export_status.setStyleSheet("""
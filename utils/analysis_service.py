@@ -0,0 +1,178 @@
+# utils/analysis_service.py
+
+import argparse
+import asyncio
+import json
+import numpy as np
+from typing import Any, Dict, List, Tuple
+from robots.kuka_robots import get_robot_by_name
+from robots.kuka_dynamics import (calculate_kuka_newton_euler_batch, calculate_kuka_lagrange_batch,
+                                  calculate_kuka_kinetic_energy_batch, calculate_kuka_potential_energy_batch,
+                                  calculate_kuka_jacobian_batch, calculate_kuka_rigid_body_torques_batch)
+
+# Public method name -> (batch function, parameter names)
+SERVICE_METHODS = {
+    'calculate_kuka_newton_euler': (calculate_kuka_newton_euler_batch,
+                                    ('joint_angles', 'joint_velocities', 'joint_accelerations')),
+    'calculate_kuka_lagrange': (calculate_kuka_lagrange_batch,
+                                ('joint_angles', 'joint_velocities', 'joint_accelerations')),
+    'calculate_kuka_kinetic_energy': (calculate_kuka_kinetic_energy_batch,
+                                      ('joint_angles', 'joint_velocities')),
+    'calculate_kuka_potential_energy': (calculate_kuka_potential_energy_batch, ('joint_angles',)),
+    'calculate_kuka_jacobian': (calculate_kuka_jacobian_batch, ('joint_angles',)),
+    'calculate_kuka_rigid_body_torques': (calculate_kuka_rigid_body_torques_batch,
+                                          ('joint_angles', 'joint_velocities', 'joint_accelerations'))
+}
+
+class RequestBatcher:
+    """
+    Coalesces concurrent single-point requests into vectorized batch calls.
+
+    Requests for the same method and robot that arrive within `window`
+    seconds of the first one are stacked and evaluated with a single call
+    to the batch function; each caller gets its own row of the result.
+    """
+
+    def __init__(self, window: float = 0.002, max_batch: int = 4096):
+        self.window = window
+        self.max_batch = max_batch
+        self._pending: Dict[Tuple[str, str], List[Tuple[List[np.ndarray], asyncio.Future]]] = {}
+        self._timers: Dict[Tuple[str, str], asyncio.TimerHandle] = {}
+
+    async def submit(self, method: str, robot_name: str, args: List[np.ndarray]) -> Any:
+        """Queue one single-point evaluation and wait for its result"""
+        loop = asyncio.get_running_loop()
+        key = (method, robot_name)
+        future = loop.create_future()
+        batch = self._pending.setdefault(key, [])
+        batch.append((args, future))
+
+        if len(batch) >= self.max_batch:
+            self._flush(key)
+        elif key not in self._timers:
+            self._timers[key] = loop.call_later(self.window, self._flush, key)
+        return await future
+
+    def _flush(self, key: Tuple[str, str]):
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._pending.pop(key, [])
+        if not batch:
+            return
+
+        method, robot_name = key
+        function, _ = SERVICE_METHODS[method]
+        try:
+            stacked = [np.stack(column) for column in zip(*(args for args, _ in batch))]
+            results = function(robot_name, *stacked)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result.tolist() if isinstance(result, np.ndarray) else float(result))
+
+class AnalysisService:
+    """
+    Localhost JSON-RPC 2.0 service over newline-delimited JSON on TCP.
+
+    Each line is one request, e.g.
+    {"jsonrpc": "2.0", "id": 1, "method": "calculate_kuka_newton_euler",
+     "params": {"robot_name": "KR6 R900", "joint_angles": [...], ...}}
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 8765, window: float = 0.002):
+        self.host = host
+        self.port = port
+        self.batcher = RequestBatcher(window)
+        self.server = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        return self.server
+
+    async def serve_forever(self):
+        if self.server is None:
+            await self.start()
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        write_lock = asyncio.Lock()
+        tasks = set()
+
+        async def respond(line: bytes):
+            response = await self.handle_request(line)
+            async with write_lock:
+                writer.write(json.dumps(response).encode('utf-8') + b'\n')
+                await writer.drain()
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                # Requests on one connection run concurrently so they can be batched
+                task = asyncio.create_task(respond(line))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            writer.close()
+
+    async def handle_request(self, line: bytes) -> Dict[str, Any]:
+        """Evaluate one JSON-RPC request line and build the response"""
+        request_id = None
+        try:
+            request = json.loads(line)
+        except ValueError:
+            return self._error(None, -32700, "Parse error")
+        try:
+            request_id = request.get('id')
+            method = request.get('method')
+            params = request.get('params', {})
+            if method not in SERVICE_METHODS:
+                return self._error(request_id, -32601, f"Method {method} not found")
+
+            robot_name = params.get('robot_name')
+            robot = get_robot_by_name(robot_name)
+            if robot is None:
+                return self._error(request_id, -32602, f"Robot {robot_name} not found")
+
+            _, names = SERVICE_METHODS[method]
+            args = []
+            for name in names:
+                value = np.asarray(params.get(name), dtype=float)
+                if value.shape != (robot.dof,):
+                    return self._error(request_id, -32602, f"{name} must be a list of {robot.dof} numbers")
+                args.append(value)
+
+            result = await self.batcher.submit(method, robot_name, args)
+            return {'jsonrpc': '2.0', 'id': request_id, 'result': result}
+        except (ValueError, TypeError) as e:
+            return self._error(request_id, -32602, str(e))
+        except Exception as e:
+            return self._error(request_id, -32603, str(e))
+
+    def _error(self, request_id, code: int, message: str) -> Dict[str, Any]:
+        return {'jsonrpc': '2.0', 'id': request_id, 'error': {'code': code, 'message': message}}
+
+def main():
+    parser = argparse.ArgumentParser(description="KUKA dynamics analysis service (localhost JSON-RPC)")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--window', type=float, default=0.002, help="Batching window in seconds")
+    args = parser.parse_args()
+
+    service = AnalysisService(port=args.port, window=args.window)
+    print(f"Serving KUKA dynamics on 127.0.0.1:{args.port}")
+    asyncio.run(service.serve_forever())
+
+if __name__ == "__main__":
+    main()
@@ -2,13 +2,22 @@
 
 import json
 import csv
+import numpy as np
 from datetime import datetime
 from typing import Dict, List, Any
+from utils.profiling import profiled
+
+def _to_builtin(value: Any) -> Any:
+    """JSON fallback for NumPy scalars and arrays (e.g. float32 results)"""
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
 
 class RobotResultsExporter:
     def __init__(self):
         self.timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     
+    @profiled
     def export_to_json(self, robot_name: str, analysis_data: Dict[str, Any], filename: str = None) -> str:
         """Export robot analysis results to JSON format"""
         if filename is None:
@@ -21,10 +30,11 @@ class RobotResultsExporter:
         }
         
         with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(export_data, f, indent=2, ensure_ascii=False)
+            json.dump(export_data, f, indent=2, ensure_ascii=False, default=_to_builtin)
         
         return filename
     
+    @profiled
     def export_to_csv(self, robot_name: str, analysis_data: Dict[str, Any], filename: str = None) -> str:
         """Export robot analysis results to CSV format"""
         if filename is None:
@@ -75,6 +85,7 @@ class RobotResultsExporter:
         
         return filename
     
+    @profiled
     def export_to_txt(self, robot_name: str, analysis_data: Dict[str, Any], filename: str = None) -> str:
         """Export robot analysis results to human-readable text format"""
         if filename is None:
@@ -137,15 +148,22 @@ class RobotResultsExporter:
             # Summary
             f.write("SUMMARY:\n")
             f.write("-" * 30 + "\n")
-            if 'torque_analysis' in analysis_data:
-                ne_torques = torques.get('newton_euler', [])
-                lag_torques = torques.get('lagrange', [])
-                if ne_torques:
-                    max_ne = max(abs(t) for t in ne_torques)
-                    f.write(f"Max Newton-Euler Torque: {max_ne:.4f} Nm\n")
-                if lag_torques:
-                    max_lag = max(abs(t) for t in lag_torques)
-                    f.write(f"Max Lagrange Torque: {max_lag:.4f} Nm\n")
+            # Streamed statistics of long analyses if present, else the per-joint torques
+            statistics = analysis_data.get('torque_statistics', {})
+            if 'torque_analysis' in analysis_data or statistics:
+                torques = analysis_data.get('torque_analysis', {})
+                for key, label in (('newton_euler', "Newton-Euler"), ('lagrange', "Lagrange")):
+                    if key in statistics:
+                        summary = statistics[key]
+                        peak = max(max(abs(lo), abs(hi)) for lo, hi in zip(summary['min'], summary['max']))
+                        f.write(f"Max {label} Torque: {peak:.4f} Nm\n")
+                        f.write(f"Max {label} RMS Torque: {max(summary['rms']):.4f} Nm\n")
+                        if 'time_above' in summary:
+                            f.write(f"{label} Time Above Limit: {max(summary['time_above']):.2f} s\n")
+                    elif len(torques.get(key, [])):
+                        values = torques[key]
+                        peak = float(np.max(np.abs(values)))
+                        f.write(f"Max {label} Torque: {peak:.4f} Nm\n")
             
             f.write("=" * 60 + "\n")
             f.write("Analysis completed successfully.\n")
@@ -153,6 +171,7 @@ class RobotResultsExporter:
         
         return filename
     
+    @profiled
     def create_analysis_report(self, robot_name: str, newton_euler_torques: List[float], 
                               lagrange_torques: List[float], energy_data: Dict[str, float] = None,
                               warnings: List[str] = None) -> Dict[str, Any]:
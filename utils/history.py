@@ -0,0 +1,441 @@
+# utils/history.py
+"""
+Queryable history of analyses in SQLite.
+
+Every recorded analysis is one row of `analyses` (robot, analysis type,
+input hash, timestamp, overall peak torque and the JSON summary) plus one
+row per joint in `joint_peaks` (peak |τ|, torque limit, whether it was
+exceeded). Both tables are indexed for the usual questions, e.g. all runs
+of a robot in a time range, runs with a given input hash, or runs where
+one joint exceeded its limit:
+
+    history = get_analysis_history()
+    history.query(robot='KR10 R1100', exceeding_joint=2, since=datetime.now() - timedelta(days=30))
+
+Bulk arrays (torque time series, ...) are stored with the run: as .npy
+blobs in `arrays` up to BLOB_LIMIT bytes, larger ones as external .npy
+files next to the database.
+
+Older exports (robot_analysis_*.json / .txt) can be imported with
+import_export_file.
+
+Usage (from the repository root):
+    python -m utils.history --import robot_analysis_*.txt
+    python -m utils.history --robot "KR10*" --exceeding-joint 2 --since 2025-07-01
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import re
+import sqlite3
+import sys
+import numpy as np
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from robots.model_registry import model_slug
+
+HISTORY_VERSION = 1
+# Persistent user data; unlike the model cache it is not safe to delete
+DEFAULT_DATA_DIR = os.path.join(os.path.expanduser('~'), '.kuka_dynamics_studio')
+BLOB_LIMIT = 1 << 20  # arrays above 1 MB go to external files
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS analyses (
+    id INTEGER PRIMARY KEY,
+    robot TEXT NOT NULL,
+    analysis_type TEXT NOT NULL,
+    input_hash TEXT NOT NULL,
+    created REAL NOT NULL,
+    dof INTEGER NOT NULL,
+    peak_torque REAL,
+    exceeded INTEGER NOT NULL DEFAULT 0,
+    source TEXT,
+    summary TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS analyses_robot_created ON analyses (robot, created);
+CREATE INDEX IF NOT EXISTS analyses_type_created ON analyses (analysis_type, created);
+CREATE INDEX IF NOT EXISTS analyses_input_hash ON analyses (input_hash);
+CREATE INDEX IF NOT EXISTS analyses_created ON analyses (created);
+CREATE TABLE IF NOT EXISTS joint_peaks (
+    analysis_id INTEGER NOT NULL REFERENCES analyses (id) ON DELETE CASCADE,
+    joint INTEGER NOT NULL,
+    peak_torque REAL NOT NULL,
+    torque_limit REAL,
+    exceeded INTEGER NOT NULL,
+    PRIMARY KEY (analysis_id, joint)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS joint_peaks_exceeded ON joint_peaks (joint, exceeded, analysis_id);
+CREATE INDEX IF NOT EXISTS joint_peaks_peak ON joint_peaks (joint, peak_torque);
+CREATE TABLE IF NOT EXISTS arrays (
+    analysis_id INTEGER NOT NULL REFERENCES analyses (id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    data BLOB,
+    path TEXT,
+    PRIMARY KEY (analysis_id, name)
+);
+"""
+
+@dataclass
+class AnalysisRecord:
+    id: int
+    robot: str
+    analysis_type: str
+    input_hash: str
+    created: datetime
+    peak_torques: np.ndarray  # (dof,) Nm, |τ|
+    torque_limits: np.ndarray  # (dof,) Nm, NaN if unknown
+    exceeded_joints: List[int]  # 1-based
+    source: Optional[str]
+    summary: Dict[str, Any] = field(repr=False)
+
+def input_hash(robot_name: str, analysis_type: str, inputs: Any) -> str:
+    """Stable hash of an analysis request (arrays are hashed by dtype, shape and bytes)"""
+    def canonical(value):
+        if isinstance(value, np.ndarray):
+            digest = hashlib.sha1(np.ascontiguousarray(value).tobytes()).hexdigest()
+            return {'dtype': value.dtype.str, 'shape': list(value.shape), 'sha1': digest}
+        if isinstance(value, dict):
+            return {str(k): canonical(v) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [canonical(v) for v in value]
+        if isinstance(value, np.generic):
+            return value.item()
+        return value
+    text = json.dumps([robot_name, analysis_type, canonical(inputs)], sort_keys=True)
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+def peak_torques_from_analysis(analysis_data: Dict[str, Any]) -> Optional[np.ndarray]:
+    """Per-joint peak |τ| over all methods of an analysis dict (streamed statistics preferred)"""
+    statistics = analysis_data.get('torque_statistics') or {}
+    peaks = [np.maximum(np.abs(s['min']), np.abs(s['max'])) for s in statistics.values()]
+    if not peaks:
+        torques = analysis_data.get('torque_analysis') or {}
+        peaks = [np.abs(np.asarray(t, dtype=float)) for t in torques.values() if len(t)]
+    if not peaks:
+        return None
+    dof = max(len(p) for p in peaks)
+    out = np.zeros(dof)
+    for p in peaks:
+        out[:len(p)] = np.maximum(out[:len(p)], p)
+    return out
+
+def _to_builtin(value: Any) -> Any:
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+class AnalysisHistory:
+    """
+    SQLite analysis history
+
+    Args:
+        path: Database file, created on first use
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.array_dir = os.path.splitext(path)[0] + '_arrays'
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._connection = sqlite3.connect(path)
+        self._connection.execute('PRAGMA foreign_keys = ON')
+        self._connection.execute('PRAGMA journal_mode = WAL')
+        version = self._connection.execute('PRAGMA user_version').fetchone()[0]
+        if version not in (0, HISTORY_VERSION):
+            raise ValueError(f"{path} has history version {version}, expected {HISTORY_VERSION}")
+        with self._connection:
+            self._connection.executescript(_SCHEMA)
+            self._connection.execute(f'PRAGMA user_version = {HISTORY_VERSION}')
+
+    def close(self):
+        self._connection.close()
+
+    def __enter__(self) -> 'AnalysisHistory':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def record(self, robot_name: str, analysis_type: str, analysis_data: Dict[str, Any], inputs: Any = None,
+               peak_torques=None, torque_limits=None, arrays: Optional[Dict[str, np.ndarray]] = None,
+               created: Optional[datetime] = None, source: Optional[str] = None) -> int:
+        """
+        Add an analysis
+
+        Args:
+            robot_name: Name of the KUKA robot model
+            analysis_type: e.g. 'newton_euler', 'lagrange', 'workspace'
+            analysis_data: Analysis dict as given to RobotResultsExporter
+            inputs: Analysis inputs for the input hash, by default
+                analysis_data['inputs']
+            peak_torques: Per-joint peak |τ| in Nm, by default taken from analysis_data
+            torque_limits: Per-joint limits in Nm, by default the robot's
+            arrays: Bulk arrays kept with the run
+            created: Run time, now by default
+            source: File the run was exported to or imported from
+
+        Returns:
+            Analysis id
+        """
+        if inputs is None:
+            inputs = analysis_data.get('inputs')
+        peaks = (np.abs(np.asarray(peak_torques, dtype=float)) if peak_torques is not None
+                 else peak_torques_from_analysis(analysis_data))
+        peaks = np.zeros(0) if peaks is None else peaks
+        if torque_limits is None:
+            from robots.kuka_robots import get_robot_torque_limits
+            torque_limits = get_robot_torque_limits(robot_name)
+        limits = np.full(len(peaks), np.nan)
+        known = np.asarray(torque_limits, dtype=float)[:len(peaks)]
+        limits[:len(known)] = known
+        exceeded = peaks > limits  # NaN limits compare False
+        created = created or datetime.now()
+        summary = json.dumps(analysis_data, default=_to_builtin, ensure_ascii=False)
+
+        with self._connection:
+            cursor = self._connection.execute(
+                'INSERT INTO analyses (robot, analysis_type, input_hash, created, dof, peak_torque, exceeded, '
+                'source, summary) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (robot_name, analysis_type, input_hash(robot_name, analysis_type, inputs), created.timestamp(),
+                 len(peaks), float(peaks.max()) if len(peaks) else None, int(exceeded.any()), source, summary))
+            analysis_id = cursor.lastrowid
+            self._connection.executemany(
+                'INSERT INTO joint_peaks (analysis_id, joint, peak_torque, torque_limit, exceeded) '
+                'VALUES (?, ?, ?, ?, ?)',
+                [(analysis_id, j + 1, float(peaks[j]), None if np.isnan(limits[j]) else float(limits[j]),
+                  int(exceeded[j])) for j in range(len(peaks))])
+            for name, values in (arrays or {}).items():
+                self._connection.execute('INSERT INTO arrays (analysis_id, name, data, path) VALUES (?, ?, ?, ?)',
+                                         (analysis_id, name) + self._store_array(analysis_id, name, values))
+        return analysis_id
+
+    def _store_array(self, analysis_id: int, name: str, values) -> tuple:
+        """(blob, None) for small arrays, (None, relative path) for external .npy files"""
+        values = np.asarray(values)
+        if values.nbytes <= BLOB_LIMIT:
+            buffer = io.BytesIO()
+            np.save(buffer, values, allow_pickle=False)
+            return buffer.getvalue(), None
+        os.makedirs(self.array_dir, exist_ok=True)
+        filename = f"{analysis_id}_{model_slug(name)}.npy"
+        temporary = os.path.join(self.array_dir, f'{filename}.{os.getpid()}.tmp')
+        with open(temporary, 'wb') as f:
+            np.save(f, values, allow_pickle=False)
+        os.replace(temporary, os.path.join(self.array_dir, filename))
+        return None, filename
+
+    def load_array(self, analysis_id: int, name: str, mmap: bool = True) -> np.ndarray:
+        """A stored array of a run; external files are memory-mapped by default"""
+        row = self._connection.execute('SELECT data, path FROM arrays WHERE analysis_id = ? AND name = ?',
+                                       (analysis_id, name)).fetchone()
+        if row is None:
+            raise KeyError(f"No array {name} for analysis {analysis_id}")
+        data, path = row
+        if data is not None:
+            return np.load(io.BytesIO(data), allow_pickle=False)
+        return np.load(os.path.join(self.array_dir, path), mmap_mode='r' if mmap else None, allow_pickle=False)
+
+    def array_names(self, analysis_id: int) -> List[str]:
+        return [row[0] for row in self._connection.execute(
+            'SELECT name FROM arrays WHERE analysis_id = ? ORDER BY name', (analysis_id,))]
+
+    def query(self, robot: Optional[str] = None, analysis_type: Optional[str] = None,
+              since: Optional[datetime] = None, until: Optional[datetime] = None,
+              input_hash: Optional[str] = None, exceeding_joint: Optional[int] = None,
+              exceeded: Optional[bool] = None, min_peak: Optional[float] = None,
+              limit: Optional[int] = None) -> List[AnalysisRecord]:
+        """
+        Recorded analyses matching all given filters, newest first
+
+        Args:
+            robot: Robot name; a trailing '*' matches a prefix (e.g. 'KR10*')
+            analysis_type: Analysis type
+            since, until: Time range of the runs (until excluded)
+            input_hash: Runs with identical inputs
+            exceeding_joint: 1-based joint that exceeded its torque limit
+            exceeded: Runs with (True) or without (False) any exceeded limit
+            min_peak: Smallest overall peak |τ| in Nm
+            limit: Maximum number of records
+        """
+        clauses, params = [], []
+        if robot is not None:
+            if robot.endswith('*'):
+                clauses.append("a.robot >= ? AND a.robot < ?")
+                params += [robot[:-1], robot[:-1] + '\U0010ffff']
+            else:
+                clauses.append('a.robot = ?')
+                params.append(robot)
+        if analysis_type is not None:
+            clauses.append('a.analysis_type = ?')
+            params.append(analysis_type)
+        if since is not None:
+            clauses.append('a.created >= ?')
+            params.append(since.timestamp())
+        if until is not None:
+            clauses.append('a.created < ?')
+            params.append(until.timestamp())
+        if input_hash is not None:
+            clauses.append('a.input_hash = ?')
+            params.append(input_hash)
+        if exceeding_joint is not None:
+            clauses.append('a.id IN (SELECT analysis_id FROM joint_peaks WHERE joint = ? AND exceeded = 1)')
+            params.append(int(exceeding_joint))
+        if exceeded is not None:
+            clauses.append('a.exceeded = ?')
+            params.append(int(exceeded))
+        if min_peak is not None:
+            clauses.append('a.peak_torque >= ?')
+            params.append(float(min_peak))
+        sql = ('SELECT a.id, a.robot, a.analysis_type, a.input_hash, a.created, a.source, a.summary FROM analyses a'
+               + (' WHERE ' + ' AND '.join(clauses) if clauses else '') + ' ORDER BY a.created DESC, a.id DESC')
+        if limit is not None:
+            sql += f' LIMIT {int(limit)}'
+        rows = self._connection.execute(sql, params).fetchall()
+        return self._records(rows)
+
+    def _records(self, rows) -> List[AnalysisRecord]:
+        if not rows:
+            return []
+        ids = [row[0] for row in rows]
+        peaks: Dict[int, list] = {i: [] for i in ids}
+        for start in range(0, len(ids), 500):
+            part = ids[start:start + 500]
+            for analysis_id, joint, peak, limit, exceeded in self._connection.execute(
+                    f"SELECT analysis_id, joint, peak_torque, torque_limit, exceeded FROM joint_peaks "
+                    f"WHERE analysis_id IN ({','.join('?' * len(part))}) ORDER BY analysis_id, joint", part):
+                peaks[analysis_id].append((peak, np.nan if limit is None else limit, exceeded, joint))
+        return [AnalysisRecord(
+            id=analysis_id, robot=robot, analysis_type=analysis_type, input_hash=hash_, created=datetime.fromtimestamp(created),
+            peak_torques=np.array([p[0] for p in peaks[analysis_id]]),
+            torque_limits=np.array([p[1] for p in peaks[analysis_id]]),
+            exceeded_joints=[p[3] for p in peaks[analysis_id] if p[2]],
+            source=source, summary=json.loads(summary))
+            for analysis_id, robot, analysis_type, hash_, created, source, summary in rows]
+
+    def get(self, analysis_id: int) -> AnalysisRecord:
+        rows = self._connection.execute(
+            'SELECT id, robot, analysis_type, input_hash, created, source, summary FROM analyses WHERE id = ?',
+            (analysis_id,)).fetchall()
+        if not rows:
+            raise KeyError(f"No analysis {analysis_id}")
+        return self._records(rows)[0]
+
+    def latest(self, robot_name: str, analysis_type: str, inputs: Any) -> Optional[AnalysisRecord]:
+        """Most recent run with the same inputs, e.g. to reuse its results"""
+        records = self.query(input_hash=input_hash(robot_name, analysis_type, inputs), limit=1)
+        return records[0] if records else None
+
+    def set_source(self, analysis_id: int, source: str):
+        """Remember the file a run was exported to"""
+        with self._connection:
+            self._connection.execute('UPDATE analyses SET source = ? WHERE id = ?', (source, analysis_id))
+
+    def delete(self, analysis_id: int):
+        """Remove a run with its arrays (external files included)"""
+        paths = [row[0] for row in self._connection.execute(
+            'SELECT path FROM arrays WHERE analysis_id = ? AND path IS NOT NULL', (analysis_id,))]
+        with self._connection:
+            self._connection.execute('DELETE FROM analyses WHERE id = ?', (analysis_id,))
+        for path in paths:
+            try:
+                os.remove(os.path.join(self.array_dir, path))
+            except FileNotFoundError:
+                pass
+
+    def import_export_file(self, filename: str) -> int:
+        """Record a robot_analysis_*.json or .txt export written by RobotResultsExporter"""
+        if filename.endswith('.json'):
+            with open(filename, 'r', encoding='utf-8') as f:
+                export = json.load(f)
+            robot_name = export['robot_name']
+            created = datetime.fromisoformat(export['analysis_timestamp'])
+            analysis_data = export['analysis_data']
+        elif filename.endswith('.txt'):
+            robot_name, created, analysis_data = _parse_text_export(filename)
+        else:
+            raise ValueError(f"Unsupported export file {filename}")
+        return self.record(robot_name, analysis_data.get('analysis_type') or _analysis_type(analysis_data),
+                           analysis_data, created=created, source=os.path.abspath(filename))
+
+def _analysis_type(analysis_data: Dict[str, Any]) -> str:
+    """Best guess for exports written before the type was recorded"""
+    if 'torque_statistics' in analysis_data:
+        return 'workspace'
+    torques = analysis_data.get('torque_analysis') or {}
+    methods = [method for method, values in torques.items() if len(values)]
+    return methods[0] if len(methods) == 1 else 'combined'
+
+def _parse_text_export(filename: str):
+    """(robot, timestamp, analysis dict) of a TXT export"""
+    robot_name, created = None, None
+    torques: Dict[str, list] = {}
+    energy: Dict[str, float] = {}
+    section = method = None
+    with open(filename, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.rstrip('\n')
+            if line.startswith('Robot Model:'):
+                robot_name = line.split(':', 1)[1].strip()
+            elif line.startswith('Analysis Date:'):
+                created = datetime.strptime(line.split(':', 1)[1].strip(), '%Y-%m-%d %H:%M:%S')
+            elif line.endswith(':') and line.isupper():
+                section = line[:-1]
+            elif section == 'TORQUE ANALYSIS' and line in ('Newton-Euler Method:', 'Lagrange Method:'):
+                method = 'newton_euler' if line.startswith('Newton') else 'lagrange'
+                torques[method] = []
+            elif section == 'TORQUE ANALYSIS' and method and re.match(r'\s+Joint \d+:', line):
+                torques[method].append(float(line.split(':', 1)[1].split()[0]))
+            elif section == 'ENERGY ANALYSIS' and ':' in line:
+                key, value = line.split(':', 1)
+                energy[key.strip()] = float(value.split()[0])
+    if robot_name is None:
+        raise ValueError(f"{filename} is not a robot analysis export")
+    return robot_name, created, {'torque_analysis': torques, 'energy_analysis': energy}
+
+def get_data_dir() -> str:
+    """Directory of persistent user data, KUKA_DATA_DIR or DEFAULT_DATA_DIR"""
+    return os.environ.get('KUKA_DATA_DIR', DEFAULT_DATA_DIR)
+
+def default_history_path() -> str:
+    return os.path.join(get_data_dir(), 'history.sqlite')
+
+_history: Optional[AnalysisHistory] = None
+
+def get_analysis_history() -> AnalysisHistory:
+    """Process-wide history in the data directory"""
+    global _history
+    if _history is None:
+        _history = AnalysisHistory(default_history_path())
+    return _history
+
+def format_record(record: AnalysisRecord) -> str:
+    exceeded = f", exceeded joints {record.exceeded_joints}" if record.exceeded_joints else ""
+    peak = f"{record.peak_torques.max():.2f} Nm" if len(record.peak_torques) else "-"
+    return (f"{record.id:6d}  {record.created:%Y-%m-%d %H:%M:%S}  {record.robot:<12} {record.analysis_type:<14} "
+            f"peak {peak}{exceeded}")
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Query or fill the analysis history")
+    parser.add_argument('--database', help="History database (default: history.sqlite in KUKA_DATA_DIR)")
+    parser.add_argument('--import', dest='imports', nargs='*', default=[], help="Export files to record")
+    parser.add_argument('--robot', help="Robot name, trailing * for a prefix")
+    parser.add_argument('--type', dest='analysis_type')
+    parser.add_argument('--since', type=datetime.fromisoformat, help="ISO date/time")
+    parser.add_argument('--until', type=datetime.fromisoformat, help="ISO date/time")
+    parser.add_argument('--exceeding-joint', type=int, help="1-based joint over its torque limit")
+    parser.add_argument('--limit', type=int, default=50)
+    args = parser.parse_args(argv)
+
+    with AnalysisHistory(args.database or default_history_path()) as history:
+        for filename in args.imports:
+            print(f"Imported {filename} as {history.import_export_file(filename)}")
+        for record in history.query(args.robot, args.analysis_type, args.since, args.until,
+                                    exceeding_joint=args.exceeding_joint, limit=args.limit):
+            print(format_record(record))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,48 @@
+# utils/precision.py
+
+import numpy as np
+from contextlib import contextmanager
+
+# Floating point types the batch paths can compute in
+SUPPORTED_DTYPES = {
+    'float64': np.float64,
+    'float32': np.float32
+}
+
+class _PrecisionPolicy:
+    dtype = np.float64
+
+_policy = _PrecisionPolicy()
+
+def resolve_dtype(dtype=None) -> type:
+    """Explicit dtype if given, otherwise the global compute dtype"""
+    if dtype is None:
+        return _policy.dtype
+    dtype = np.dtype(dtype).type
+    if dtype not in SUPPORTED_DTYPES.values():
+        raise ValueError(f"Unsupported compute dtype {np.dtype(dtype).name}")
+    return dtype
+
+def get_compute_dtype() -> type:
+    return _policy.dtype
+
+def set_compute_dtype(dtype):
+    """
+    Set the dtype used by batch dynamics, kinematics and export paths
+    when no explicit dtype is passed ('float64' or 'float32')
+    """
+    _policy.dtype = resolve_dtype(dtype)
+
+@contextmanager
+def compute_dtype(dtype):
+    """Temporarily switch the global compute dtype"""
+    previous = _policy.dtype
+    set_compute_dtype(dtype)
+    try:
+        yield
+    finally:
+        _policy.dtype = previous
+
+def as_compute_array(values, dtype=None) -> np.ndarray:
+    """Convert values to an array of the (resolved) compute dtype without copying if possible"""
+    return np.asarray(values, dtype=resolve_dtype(dtype))
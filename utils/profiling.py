@@ -0,0 +1,156 @@
+# utils/profiling.py
+
+import functools
+import json
+import random
+import threading
+import time as clock
+from typing import Any, Dict, List
+
+class _ProfilerState:
+    enabled = False
+
+_state = _ProfilerState()
+_lock = threading.Lock()
+_local = threading.local()
+
+# Latency samples kept per function for percentiles (reservoir sampling)
+RESERVOIR_SIZE = 10000
+
+class CallStats:
+    """Aggregated timings of one instrumented function"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.max_size = 0
+        self.total_size = 0
+        self.samples: List[float] = []
+
+    def add(self, elapsed: float, size: int):
+        self.calls += 1
+        self.total_time += elapsed
+        self.max_time = max(self.max_time, elapsed)
+        self.max_size = max(self.max_size, size)
+        self.total_size += size
+        if len(self.samples) < RESERVOIR_SIZE:
+            self.samples.append(elapsed)
+        else:
+            slot = random.randrange(self.calls)
+            if slot < RESERVOIR_SIZE:
+                self.samples[slot] = elapsed
+
+    def percentile(self, q: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(int(q / 100 * len(ordered)), len(ordered) - 1)]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'function': self.name,
+            'calls': self.calls,
+            'total_s': self.total_time,
+            'mean_s': self.total_time / self.calls if self.calls else 0.0,
+            'p50_s': self.percentile(50),
+            'p95_s': self.percentile(95),
+            'p99_s': self.percentile(99),
+            'max_s': self.max_time,
+            'max_size': self.max_size,
+            'mean_size': self.total_size / self.calls if self.calls else 0.0
+        }
+
+_stats: Dict[str, CallStats] = {}
+# Collapsed call stack "outer;inner" -> self time in seconds
+_stacks: Dict[str, float] = {}
+
+def enable_profiling():
+    _state.enabled = True
+
+def disable_profiling():
+    _state.enabled = False
+
+def is_profiling_enabled() -> bool:
+    return _state.enabled
+
+def reset_profiling():
+    with _lock:
+        _stats.clear()
+        _stacks.clear()
+
+def _argument_size(args, kwargs) -> int:
+    """Element count of the largest array-like argument"""
+    size = 0
+    for value in list(args) + list(kwargs.values()):
+        n = getattr(value, 'size', None)
+        if not isinstance(n, int):
+            try:
+                n = len(value) if not isinstance(value, (str, bytes, dict)) else 0
+            except TypeError:
+                n = 0
+        size = max(size, n)
+    return size
+
+def profiled(function):
+    """
+    Record call count, latency and argument size of a function while
+    profiling is enabled; a single flag check when it is not.
+    """
+    name = f"{function.__module__}.{function.__qualname__}"
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        if not _state.enabled:
+            return function(*args, **kwargs)
+
+        stack = getattr(_local, 'stack', None)
+        if stack is None:
+            stack = _local.stack = []
+        # Each frame is [name, time spent in instrumented children]
+        frame = [name, 0.0]
+        stack.append(frame)
+        started = clock.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            elapsed = clock.perf_counter() - started
+            stack.pop()
+            if stack:
+                stack[-1][1] += elapsed
+            path = ';'.join(f[0] for f in stack) + (';' if stack else '') + name
+            size = _argument_size(args, kwargs)
+            with _lock:
+                stats = _stats.get(name)
+                if stats is None:
+                    stats = _stats[name] = CallStats(name)
+                stats.add(elapsed, size)
+                _stacks[path] = _stacks.get(path, 0.0) + max(elapsed - frame[1], 0.0)
+
+    return wrapper
+
+def get_profile_stats() -> List[Dict[str, Any]]:
+    """Per-function statistics, most total time first"""
+    with _lock:
+        rows = [stats.to_dict() for stats in _stats.values()]
+    return sorted(rows, key=lambda row: row['total_s'], reverse=True)
+
+def export_profile_jsonl(filename: str) -> str:
+    """Write one JSON object per instrumented function"""
+    with open(filename, 'w', encoding='utf-8') as f:
+        for row in get_profile_stats():
+            f.write(json.dumps(row) + "\n")
+    return filename
+
+def export_profile_flamegraph(filename: str) -> str:
+    """
+    Write collapsed stacks ("outer;inner <microseconds>") of self time,
+    the input format of flamegraph.pl, speedscope and inferno
+    """
+    with _lock:
+        stacks = dict(_stacks)
+    with open(filename, 'w', encoding='utf-8') as f:
+        for path, seconds in sorted(stacks.items()):
+            f.write(f"{path} {max(int(round(seconds * 1e6)), 1)}\n")
+    return filename
@@ -0,0 +1,286 @@
+# utils/result_store.py
+"""
+Out-of-core result store for sweep-scale arrays.
+
+Every array of a store has a leading variant axis, e.g. torques of shape
+(variants, time, dof). Arrays are split along that axis into chunk files
+of chunk_variants variants, each a preallocated .npy that is memory-mapped
+on access, so reading a slice touches only the pages it needs and no
+array is ever loaded as a whole.
+
+Worker processes open the same store with mode 'r+' and write disjoint
+variant (or variant × time) regions concurrently; nothing but the chunk
+files is written after creation. A per-array completion mask records the
+variants whose data is in.
+
+Layout:
+    index.json                 shapes, dtypes, chunking and attributes (written last)
+    coords/<name>.npy          small coordinate arrays, e.g. time
+    <array>/chunk_000000.npy   variants [0, chunk_variants)
+    <array>/complete.npy       uint8 completion mask over the variants
+
+Example:
+    store = ResultStore.create(path, variants=1000, arrays={'tau': ((10**5, 6), 'float32')},
+                               coords={'time': time})
+    ResultStore(path, 'r+').write('tau', (k, slice(0, 5000)), tau_chunk)
+    ResultStore(path).read('tau', variants=[3, 7], time=(2.0, 4.0), joints=1)
+"""
+
+import json
+import os
+import shutil
+import numpy as np
+from typing import Any, Dict, Optional, Tuple
+
+STORE_VERSION = 1
+CHUNK_BYTES = 64 * 2**20  # target size of one chunk file
+
+ArraySpec = Tuple[Tuple[int, ...], Any]  # per-variant shape and dtype
+
+class StoredArray:
+    """One array of a store, indexed like an ndarray of shape (variants,) + tail"""
+
+    def __init__(self, store: 'ResultStore', name: str):
+        spec = store.index['arrays'][name]
+        self.store = store
+        self.name = name
+        self.dtype = np.dtype(spec['dtype'])
+        self.shape = (store.variants,) + tuple(spec['shape'])
+        self.chunk_variants = store.index['chunk_variants']
+        self._chunks: Dict[int, np.memmap] = {}
+
+    def __len__(self) -> int:
+        return self.shape[0]
+
+    def _tail_shape(self, rest: tuple) -> Tuple[int, ...]:
+        """Shape of one variant indexed by rest (computed on a zero-stride view)"""
+        return np.broadcast_to(np.zeros((), dtype=self.dtype), self.shape[1:])[rest].shape
+
+    def _chunk(self, k: int) -> np.memmap:
+        if k not in self._chunks:
+            path = os.path.join(self.store.directory, self.name, f'chunk_{k:06d}.npy')
+            self._chunks[k] = np.load(path, mmap_mode=self.store.mode)
+        return self._chunks[k]
+
+    def _split(self, start: int, stop: int):
+        """(chunk, local start, local stop, offset into the range) of a contiguous variant range"""
+        size = self.chunk_variants
+        for k in range(start // size, (stop - 1) // size + 1 if stop > start else start // size):
+            lo, hi = max(start, k * size), min(stop, (k + 1) * size)
+            yield k, lo - k * size, hi - k * size, lo - start
+
+    def __getitem__(self, key) -> np.ndarray:
+        key = key if isinstance(key, tuple) else (key,)
+        first, rest = key[0], key[1:]
+        if isinstance(first, (int, np.integer)):
+            k, local = divmod(int(first) % len(self), self.chunk_variants)
+            return np.array(self._chunk(k)[(local,) + rest])
+        if isinstance(first, slice) and first.step in (None, 1):
+            start, stop, _ = first.indices(len(self))
+            parts = [self._chunk(k)[(slice(lo, hi),) + rest] for k, lo, hi, _ in self._split(start, max(start, stop))]
+            if not parts:
+                return np.empty((0,) + self._tail_shape(rest), dtype=self.dtype)
+            return np.concatenate(parts)
+        # Variant lists and masks, in the requested order
+        index = np.arange(len(self))[first]
+        chunk = index // self.chunk_variants
+        parts = {k: self._chunk(k)[(index[chunk == k] - k * self.chunk_variants,) + rest] for k in np.unique(chunk)}
+        out = np.empty((len(index),) + self._tail_shape(rest), dtype=self.dtype)
+        for k, values in parts.items():
+            out[chunk == k] = values
+        return out
+
+    def __setitem__(self, key, values):
+        key = key if isinstance(key, tuple) else (key,)
+        first, rest = key[0], key[1:]
+        if isinstance(first, (int, np.integer)):
+            start = int(first) % len(self)
+            values = np.broadcast_to(values, self._tail_shape(rest))[None]
+            first = slice(start, start + 1)
+        if not isinstance(first, slice) or first.step not in (None, 1):
+            raise ValueError("Stores are written in contiguous variant ranges")
+        start, stop, _ = first.indices(len(self))
+        stop = max(start, stop)
+        values = np.broadcast_to(values, (stop - start,) + self._tail_shape(rest))
+        for k, lo, hi, offset in self._split(start, stop):
+            chunk = self._chunk(k)
+            chunk[(slice(lo, hi),) + rest] = values[offset:offset + hi - lo]
+            chunk.flush()
+
+    def close(self):
+        for chunk in self._chunks.values():
+            if self.store.mode == 'r+':
+                chunk.flush()
+        self._chunks.clear()
+
+class ResultStore:
+    """
+    Open an existing store
+
+    Args:
+        directory: Store directory
+        mode: 'r' to read, 'r+' to write regions
+    """
+
+    def __init__(self, directory: str, mode: str = 'r'):
+        if mode not in ('r', 'r+'):
+            raise ValueError(f"Unsupported store mode {mode}")
+        with open(os.path.join(directory, 'index.json'), 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        if index.get('version') != STORE_VERSION:
+            raise ValueError(f"{directory} has store version {index.get('version')}, expected {STORE_VERSION}")
+        self.directory = directory
+        self.mode = mode
+        self.index = index
+        self.variants = index['variants']
+        self.attrs = index.get('attrs', {})
+        self._arrays: Dict[str, StoredArray] = {}
+        self._coords: Dict[str, np.ndarray] = {}
+        self._complete: Dict[str, np.memmap] = {}
+
+    @classmethod
+    def create(cls, directory: str, variants: int, arrays: Dict[str, ArraySpec],
+               coords: Optional[Dict[str, np.ndarray]] = None, attrs: Optional[Dict[str, Any]] = None,
+               chunk_variants: Optional[int] = None, overwrite: bool = False) -> 'ResultStore':
+        """
+        Create and preallocate a store, then open it for writing
+
+        Args:
+            directory: Store directory
+            variants: Length of the leading variant axis
+            arrays: name -> (per-variant shape, dtype)
+            coords: Coordinate arrays, e.g. {'time': (T,)} for axis 1
+            attrs: JSON-serializable metadata
+            chunk_variants: Variants per chunk file, by default about CHUNK_BYTES
+                of the largest array
+            overwrite: Replace an existing store
+
+        Returns:
+            ResultStore opened with mode 'r+'
+        """
+        if os.path.exists(os.path.join(directory, 'index.json')):
+            if not overwrite:
+                raise FileExistsError(f"{directory} already holds a result store")
+            shutil.rmtree(directory)
+        specs = {name: (tuple(int(n) for n in shape), np.dtype(dtype)) for name, (shape, dtype) in arrays.items()}
+        if chunk_variants is None:
+            row = max([int(np.prod(shape)) * dtype.itemsize for shape, dtype in specs.values()] + [1])
+            chunk_variants = max(1, CHUNK_BYTES // row)
+        chunk_variants = int(min(chunk_variants, max(variants, 1)))
+
+        os.makedirs(os.path.join(directory, 'coords'), exist_ok=True)
+        for name, values in (coords or {}).items():
+            np.save(os.path.join(directory, 'coords', f'{name}.npy'), np.asarray(values))
+        for name, (shape, dtype) in specs.items():
+            os.makedirs(os.path.join(directory, name), exist_ok=True)
+            for k, start in enumerate(range(0, variants, chunk_variants)):
+                rows = min(chunk_variants, variants - start)
+                # Preallocated (sparse where the file system allows) so writers never resize a file
+                np.lib.format.open_memmap(os.path.join(directory, name, f'chunk_{k:06d}.npy'), mode='w+',
+                                          dtype=dtype, shape=(rows,) + shape).flush()
+            np.save(os.path.join(directory, name, 'complete.npy'), np.zeros(variants, dtype=np.uint8))
+
+        index = {
+            'version': STORE_VERSION,
+            'variants': int(variants),
+            'chunk_variants': chunk_variants,
+            'arrays': {name: {'shape': list(shape), 'dtype': dtype.str} for name, (shape, dtype) in specs.items()},
+            'coords': sorted(coords or {}),
+            'attrs': attrs or {}
+        }
+        temporary = os.path.join(directory, f'index.json.{os.getpid()}.tmp')
+        with open(temporary, 'w', encoding='utf-8') as f:
+            json.dump(index, f, indent=2)
+        os.replace(temporary, os.path.join(directory, 'index.json'))
+        return cls(directory, 'r+')
+
+    @property
+    def names(self):
+        return list(self.index['arrays'])
+
+    def __getitem__(self, name: str) -> StoredArray:
+        if name not in self.index['arrays']:
+            raise KeyError(f"No array {name} in {self.directory}")
+        if name not in self._arrays:
+            self._arrays[name] = StoredArray(self, name)
+        return self._arrays[name]
+
+    def coord(self, name: str) -> np.ndarray:
+        if name not in self._coords:
+            self._coords[name] = np.load(os.path.join(self.directory, 'coords', f'{name}.npy'), mmap_mode='r')
+        return self._coords[name]
+
+    def write(self, name: str, key, values, complete: Optional[bool] = None):
+        """
+        Write a region of an array
+
+        Args:
+            name: Array name
+            key: Variant index or contiguous slice, optionally followed by
+                indices into the per-variant axes
+            values: Values broadcastable to the region
+            complete: Mark the variants complete; by default when whole
+                variants were written
+        """
+        if self.mode != 'r+':
+            raise ValueError(f"{self.directory} is open read-only")
+        self[name][key] = values
+        key = key if isinstance(key, tuple) else (key,)
+        if complete if complete is not None else len(key) == 1:
+            self.mark_complete(name, key[0])
+
+    def _completion(self, name: str) -> np.memmap:
+        if name not in self._complete:
+            self._complete[name] = np.load(os.path.join(self.directory, name, 'complete.npy'), mmap_mode=self.mode)
+        return self._complete[name]
+
+    def mark_complete(self, name: str, variants):
+        mask = self._completion(name)
+        mask[variants] = 1
+        mask.flush()
+
+    def complete(self, name: str) -> np.ndarray:
+        """Boolean mask of the variants whose data is complete"""
+        return np.array(self._completion(name), dtype=bool)
+
+    def read(self, name: str, variants=slice(None), time=None, joints=None) -> np.ndarray:
+        """
+        Slice an array of shape (variants, time, ..., joints)
+
+        Args:
+            name: Array name
+            variants: Variant index, slice, list or mask
+            time: (start, stop) in units of the 'time' coordinate (stop
+                excluded), or a slice of time steps
+            joints: Index or list of indices into the last axis
+
+        Returns:
+            Selected values, axes in the order (variants, time, ..., joints)
+            with scalar selections dropped
+        """
+        key = (variants,)
+        if time is not None:
+            if not isinstance(time, slice):
+                coordinate = self.coord('time')
+                time = slice(int(np.searchsorted(coordinate, time[0], side='left')),
+                             int(np.searchsorted(coordinate, time[1], side='left')))
+            key = (variants, time)
+        values = self[name][key]
+        # Joints are taken separately so that the selections stay orthogonal
+        return values if joints is None else np.take(values, joints, axis=-1)
+
+    def close(self):
+        for array in self._arrays.values():
+            array.close()
+        self._arrays.clear()
+        for mask in self._complete.values():
+            if self.mode == 'r+':
+                mask.flush()
+        self._complete.clear()
+        self._coords.clear()
+
+    def __enter__(self) -> 'ResultStore':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
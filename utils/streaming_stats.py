@@ -0,0 +1,207 @@
+# utils/streaming_stats.py
+"""
+Per-joint summary statistics accumulated chunk by chunk.
+
+A StreamingStatistics object consumes (n, dof) result chunks and keeps
+only O(dof) state: count, min, max, mean and the centred sum of squares
+(Chan's parallel update), the time spent with |value| above a threshold
+and a relative-error quantile sketch. Accumulators built by separate
+workers over disjoint chunks merge into the statistics of the whole run,
+independent of chunk size and order (up to floating point rounding of the
+mean).
+
+The sketch bins |value| logarithmically with a relative width of
+2·SKETCH_ACCURACY, separately for each sign, so a percentile is within
+SKETCH_ACCURACY (relative) of the exact sample percentile for magnitudes
+between SKETCH_MIN and SKETCH_MAX; smaller magnitudes count as zero and
+larger ones fall into the outermost bin. Percentiles are also clipped to
+the exact min and max.
+"""
+
+import numpy as np
+from typing import Dict, Optional, Sequence
+
+SKETCH_ACCURACY = 0.01
+SKETCH_MIN = 1e-9
+SKETCH_MAX = 1e9
+
+_GAMMA = (1.0 + SKETCH_ACCURACY) / (1.0 - SKETCH_ACCURACY)
+_LOG_GAMMA = np.log(_GAMMA)
+_OFFSET = int(np.floor(np.log(SKETCH_MIN) / _LOG_GAMMA))
+# Magnitude bins per sign; bin i covers (γ^(i+offset-1), γ^(i+offset)]
+_BINS = int(np.ceil(np.log(SKETCH_MAX) / _LOG_GAMMA)) - _OFFSET + 1
+
+class StreamingStatistics:
+    """
+    Running per-joint statistics of (n, dof) chunks
+
+    Args:
+        dof: Number of columns (joints)
+        threshold: Threshold on |value| for time_above, scalar or (dof,);
+            None disables it
+    """
+
+    def __init__(self, dof: int, threshold=None):
+        self.dof = int(dof)
+        self.threshold = None if threshold is None else np.broadcast_to(
+            np.asarray(threshold, dtype=float), (self.dof,)).copy()
+        self.count = 0
+        self.duration = 0.0
+        self._min = np.full(self.dof, np.inf)
+        self._max = np.full(self.dof, -np.inf)
+        self._mean = np.zeros(self.dof)
+        self._m2 = np.zeros(self.dof)
+        self._time_above = np.zeros(self.dof)
+        # Sketch bins ordered by value: negative magnitudes descending, zero, positive ascending
+        self._sketch = np.zeros((self.dof, 2 * _BINS + 1), dtype=np.int64)
+
+    def update(self, values, dt=1.0) -> 'StreamingStatistics':
+        """
+        Add a chunk of samples
+
+        Args:
+            values: Samples, shape (n, dof) or (dof,)
+            dt: Duration of each sample in seconds, scalar or (n,); the
+                default counts samples
+
+        Returns:
+            self
+        """
+        x = np.asarray(values, dtype=float)
+        x = x.reshape(-1, self.dof) if x.ndim == 1 else x
+        if x.shape[1] != self.dof:
+            raise ValueError(f"Expected {self.dof} columns, got {x.shape[1]}")
+        n = len(x)
+        if n == 0:
+            return self
+        dt = np.broadcast_to(np.asarray(dt, dtype=float), (n,))
+
+        np.minimum(self._min, x.min(axis=0), out=self._min)
+        np.maximum(self._max, x.max(axis=0), out=self._max)
+        mean = x.mean(axis=0)
+        self._combine_moments(n, mean, ((x - mean) ** 2).sum(axis=0))
+        self.duration += float(dt.sum())
+        if self.threshold is not None:
+            self._time_above += dt @ (np.abs(x) > self.threshold)
+
+        bins = _sketch_bins(x) + np.arange(self.dof) * self._sketch.shape[1]
+        self._sketch += np.bincount(bins.ravel(), minlength=self._sketch.size).reshape(self._sketch.shape)
+        return self
+
+    def _combine_moments(self, n: int, mean: np.ndarray, m2: np.ndarray):
+        total = self.count + n
+        delta = mean - self._mean
+        self._mean += delta * (n / total)
+        self._m2 += m2 + delta ** 2 * (self.count * n / total)
+        self.count = total
+
+    def merge(self, other: 'StreamingStatistics') -> 'StreamingStatistics':
+        """Fold in an accumulator over disjoint samples (e.g. from another worker); returns self"""
+        if other.dof != self.dof:
+            raise ValueError(f"Cannot merge statistics of {other.dof} and {self.dof} columns")
+        if not _same_threshold(self.threshold, other.threshold):
+            raise ValueError("Cannot merge statistics with different thresholds")
+        if other.count == 0:
+            return self
+        np.minimum(self._min, other._min, out=self._min)
+        np.maximum(self._max, other._max, out=self._max)
+        self._combine_moments(other.count, other._mean, other._m2)
+        self.duration += other.duration
+        self._time_above += other._time_above
+        self._sketch += other._sketch
+        return self
+
+    @property
+    def min(self) -> np.ndarray:
+        return self._min.copy()
+
+    @property
+    def max(self) -> np.ndarray:
+        return self._max.copy()
+
+    @property
+    def peak(self) -> np.ndarray:
+        """Largest |value| per joint"""
+        return np.maximum(np.abs(self._min), np.abs(self._max))
+
+    @property
+    def mean(self) -> np.ndarray:
+        return self._mean.copy() if self.count else np.full(self.dof, np.nan)
+
+    @property
+    def std(self) -> np.ndarray:
+        return np.sqrt(self._m2 / self.count) if self.count else np.full(self.dof, np.nan)
+
+    @property
+    def rms(self) -> np.ndarray:
+        return np.sqrt(self._m2 / self.count + self._mean ** 2) if self.count else np.full(self.dof, np.nan)
+
+    @property
+    def time_above(self) -> np.ndarray:
+        """Time (sum of sample durations) with |value| above the threshold, per joint"""
+        if self.threshold is None:
+            raise ValueError("No threshold set")
+        return self._time_above.copy()
+
+    def percentile(self, q) -> np.ndarray:
+        """
+        Approximate percentiles from the sketch
+
+        Args:
+            q: Percentile or sequence of percentiles in [0, 100]
+
+        Returns:
+            Values, shape (dof,) or (len(q), dof)
+        """
+        qs = np.atleast_1d(np.asarray(q, dtype=float))
+        if np.any((qs < 0) | (qs > 100)):
+            raise ValueError("Percentiles must be in [0, 100]")
+        if self.count == 0:
+            out = np.full((len(qs), self.dof), np.nan)
+        else:
+            cumulative = np.cumsum(self._sketch, axis=1)
+            # Rank of the nearest sample at or below the percentile (as in np.percentile 'lower')
+            ranks = np.floor(qs / 100.0 * (self.count - 1)).astype(np.int64)
+            out = np.empty((len(qs), self.dof))
+            for j in range(self.dof):
+                bins = np.searchsorted(cumulative[j], ranks, side='right')
+                out[:, j] = _bin_values(bins)
+            out = np.clip(out, self._min, self._max)
+            out[qs == 0] = self._min
+            out[qs == 100] = self._max
+        return out[0] if np.ndim(q) == 0 else out
+
+    def summary(self, percentiles: Sequence[float] = (50.0, 95.0, 99.0)) -> Dict[str, object]:
+        """Statistics as plain lists, e.g. for export"""
+        data = {
+            'count': self.count,
+            'duration': self.duration,
+            'min': self.min.tolist(),
+            'max': self.max.tolist(),
+            'mean': self.mean.tolist(),
+            'rms': self.rms.tolist(),
+            'percentiles': {f'{p:g}': self.percentile(p).tolist() for p in percentiles}
+        }
+        if self.threshold is not None:
+            data['threshold'] = self.threshold.tolist()
+            data['time_above'] = self.time_above.tolist()
+        return data
+
+def _sketch_bins(x: np.ndarray) -> np.ndarray:
+    """Sketch bin of every sample, same shape as x"""
+    magnitude = np.abs(x)
+    with np.errstate(divide='ignore'):
+        index = np.ceil(np.log(np.clip(magnitude, SKETCH_MIN, SKETCH_MAX)) / _LOG_GAMMA).astype(np.int64) - _OFFSET
+    index = np.clip(index, 1, _BINS)
+    return np.where(magnitude < SKETCH_MIN, _BINS, _BINS + np.sign(x).astype(np.int64) * index)
+
+def _bin_values(bins: np.ndarray) -> np.ndarray:
+    """Representative value of sketch bins (within SKETCH_ACCURACY of every sample in them)"""
+    index = bins - _BINS
+    magnitude = 2.0 * _GAMMA ** (np.abs(index) + _OFFSET) / (_GAMMA + 1.0)
+    return np.where(index == 0, 0.0, np.sign(index) * magnitude)
+
+def _same_threshold(a: Optional[np.ndarray], b: Optional[np.ndarray]) -> bool:
+    if a is None or b is None:
+        return a is None and b is None
+    return np.array_equal(a, b)
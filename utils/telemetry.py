@@ -0,0 +1,263 @@
+# utils/telemetry.py
+
+import os
+import socket
+import stat
+import struct
+import threading
+import time as clock
+import numpy as np
+from typing import Optional, Tuple, Union
+from robots.kuka_robots import get_robot_by_name, get_robot_torque_limits
+from robots.kuka_dynamics import calculate_kuka_newton_euler_batch, calculate_kuka_lagrange_batch
+from utils.precision import resolve_dtype
+
+def joint_state_struct(dof: int = 6) -> struct.Struct:
+    """
+    Binary layout of one joint-state packet: little-endian doubles
+    [timestamp, q_1..q_dof, qd_1..qd_dof, qdd_1..qdd_dof]
+    """
+    return struct.Struct(f'<{1 + 3 * dof}d')
+
+def encode_joint_state(timestamp: float, joint_angles, joint_velocities,
+                       joint_accelerations) -> bytes:
+    """Pack one joint state into a telemetry packet"""
+    dof = len(joint_angles)
+    return joint_state_struct(dof).pack(timestamp, *joint_angles, *joint_velocities, *joint_accelerations)
+
+class RingBuffer:
+    """Fixed-size preallocated ring buffer of fixed-width float rows"""
+
+    def __init__(self, capacity: int, width: int, dtype=np.float64):
+        self.data = np.zeros((capacity, width), dtype=dtype)
+        self.capacity = capacity
+        self.total = 0  # rows written since creation
+
+    def __len__(self) -> int:
+        return min(self.total, self.capacity)
+
+    def extend(self, rows: np.ndarray):
+        """Append rows, overwriting the oldest ones when full"""
+        rows = rows[-self.capacity:]
+        n = len(rows)
+        start = self.total % self.capacity
+        first = min(n, self.capacity - start)
+        self.data[start:start + first] = rows[:first]
+        self.data[:n - first] = rows[first:]
+        self.total += n
+
+    def latest(self, n: Optional[int] = None) -> np.ndarray:
+        """Copy of the newest n rows (all stored rows by default), oldest first"""
+        size = len(self)
+        n = size if n is None else min(n, size)
+        end = self.total % self.capacity
+        if n <= end:
+            return self.data[end - n:end].copy()
+        return np.concatenate([self.data[self.capacity - (n - end):], self.data[:end]])
+
+def _remove_stale_socket(path: str):
+    """Unlink a Unix socket file nobody is bound to any more (other files are left alone)"""
+    try:
+        if not stat.S_ISSOCK(os.stat(path).st_mode):
+            return
+    except FileNotFoundError:
+        return
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    try:
+        probe.connect(path)
+    except ConnectionRefusedError:
+        os.unlink(path)
+    finally:
+        probe.close()
+
+class SocketTelemetrySource:
+    """
+    Non-blocking joint-state receiver on a local datagram socket.
+
+    A (host, port) address opens a UDP socket, a string address opens a
+    Unix datagram socket at that path; the path is removed on close, and a
+    stale socket file left by a crashed receiver is replaced.
+    """
+
+    def __init__(self, address: Union[Tuple[str, int], str], dof: int = 6):
+        self.packet = joint_state_struct(dof)
+        self.path = address if isinstance(address, str) else None
+        if self.path is not None:
+            _remove_stale_socket(self.path)
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        else:
+            self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        # Room for a few seconds of 1 kHz packets if the reader stalls
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
+        self.sock.bind(address)
+        self.sock.setblocking(False)
+        self._scratch = bytearray(self.packet.size)
+
+    def read(self, max_packets: int = 1000) -> np.ndarray:
+        """Drain up to max_packets pending packets into a (n, 1 + 3*dof) array"""
+        rows = []
+        for _ in range(max_packets):
+            try:
+                size = self.sock.recv_into(self._scratch)
+            except (BlockingIOError, InterruptedError):
+                break
+            if size == self.packet.size:
+                rows.append(self.packet.unpack(self._scratch))
+        return np.array(rows, dtype=float).reshape(len(rows), self.packet.size // 8)
+
+    def close(self):
+        self.sock.close()
+        if self.path is not None:
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+
+class ReplayTelemetrySource:
+    """
+    Stand-in telemetry source replaying a recorded or generated trajectory
+    at wall-clock speed, for testing the live pipeline without a robot
+    """
+
+    def __init__(self, time, joint_angles, joint_velocities, joint_accelerations,
+                 speed: float = 1.0, loop: bool = True):
+        time = np.asarray(time, dtype=float)
+        self.offsets = time - time[0]
+        self.rows = np.column_stack([self.offsets, joint_angles, joint_velocities, joint_accelerations])
+        # One lap lasts the trajectory plus one sample step
+        step = self.offsets[1] if len(time) > 1 else 1.0
+        self.period = self.offsets[-1] + step
+        self.speed = speed
+        self.loop = loop
+        self._clock_start = clock.perf_counter()
+        self._emitted = 0  # rows emitted so far, counted across laps
+
+    def read(self, max_packets: int = 1000) -> np.ndarray:
+        """Rows whose time stamps have elapsed since the last read"""
+        n = len(self.rows)
+        elapsed = (clock.perf_counter() - self._clock_start) * self.speed
+        if self.loop:
+            laps, rest = divmod(elapsed, self.period)
+            due = int(laps) * n + int(np.searchsorted(self.offsets, rest, side='right'))
+        else:
+            due = int(np.searchsorted(self.offsets, elapsed, side='right'))
+
+        index = np.arange(self._emitted, min(due, self._emitted + max_packets))
+        self._emitted += len(index)
+        chunk = self.rows[index % n]
+        # Keep time stamps increasing across laps
+        chunk[:, 0] += (index // n) * self.period
+        return chunk
+
+    def close(self):
+        pass
+
+class TelemetryMonitor:
+    """
+    Online inverse dynamics and limit checking over a joint-state stream.
+
+    Packets are drained from the source in micro-batches; each batch is
+    pushed through the vectorized dynamics in one call, and joint states
+    and torques are kept in preallocated ring buffers for rolling plots.
+    """
+
+    def __init__(self, robot_name: str, source, capacity: int = 60000,
+                 method: str = 'newton_euler', max_batch: int = 1000, dtype=None):
+        """
+        Args:
+            robot_name: Name of the KUKA robot model
+            source: Object with read(max_packets) -> (n, 1 + 3*dof) array
+            capacity: Samples kept in the ring buffers (60 s at 1 kHz)
+            method: 'newton_euler' or 'lagrange'
+            max_batch: Upper bound of packets processed per micro-batch
+            dtype: Compute and storage dtype, defaults to the global compute dtype
+        """
+        robot = get_robot_by_name(robot_name)
+        if robot is None:
+            raise ValueError(f"Robot {robot_name} not found")
+        if method not in ('newton_euler', 'lagrange'):
+            raise ValueError(f"Unknown dynamics method {method}")
+
+        self.robot_name = robot_name
+        self.dof = robot.dof
+        self.source = source
+        self.max_batch = max_batch
+        self.dynamics = (calculate_kuka_newton_euler_batch if method == 'newton_euler'
+                         else calculate_kuka_lagrange_batch)
+        self.limits = np.array(get_robot_torque_limits(robot_name), dtype=float)
+
+        self.dtype = resolve_dtype(dtype)
+        # Time stamps stay float64, float32 cannot resolve 1 ms over long sessions
+        self.states = RingBuffer(capacity, 1 + 3 * self.dof)
+        self.torques = RingBuffer(capacity, self.dof, self.dtype)
+        self.torque_time = RingBuffer(capacity, 1)
+        self.peak_torques = np.zeros(self.dof)
+        self.violation_counts = np.zeros(self.dof, dtype=np.int64)
+        self.last_latency = 0.0  # seconds spent on the last micro-batch
+
+        self._lock = threading.Lock()
+        self._thread = None
+        self._running = False
+
+    def poll(self) -> int:
+        """Process one micro-batch of pending packets, returns its size"""
+        rows = self.source.read(self.max_batch)
+        if not len(rows):
+            return 0
+
+        started = clock.perf_counter()
+        d = self.dof
+        tau = self.dynamics(self.robot_name, rows[:, 1:1 + d], rows[:, 1 + d:1 + 2 * d], rows[:, 1 + 2 * d:],
+                            dtype=self.dtype)
+        exceeded = np.abs(tau) > self.limits
+
+        with self._lock:
+            self.states.extend(rows)
+            self.torque_time.extend(rows[:, :1])
+            self.torques.extend(tau)
+            np.maximum(self.peak_torques, np.abs(tau).max(axis=0), out=self.peak_torques)
+            self.violation_counts += exceeded.sum(axis=0)
+        self.last_latency = clock.perf_counter() - started
+        return len(rows)
+
+    def start(self, idle_sleep: float = 0.001):
+        """Run poll() in a background thread until stop()"""
+        if self._running:
+            return
+        self._running = True
+
+        def run():
+            while self._running:
+                if not self.poll():
+                    clock.sleep(idle_sleep)
+
+        self._thread = threading.Thread(target=run, name=f"telemetry-{self.robot_name}", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.source.close()
+
+    def snapshot(self, samples: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Copy of the newest torque samples
+
+        Returns:
+            Tuple of (time, torques) with torques of shape (n, dof)
+        """
+        with self._lock:
+            time = self.torque_time.latest(samples)
+            torques = self.torques.latest(samples)
+        return time[:, 0], torques
+
+    def summary(self) -> dict:
+        with self._lock:
+            return {
+                'samples': self.states.total,
+                'peak_torques': self.peak_torques.tolist(),
+                'violation_counts': self.violation_counts.tolist(),
+                'last_latency': self.last_latency
+            }